@@ -0,0 +1,147 @@
+"""
+Cache de resultados para RecommendationViewSet.
+
+Las respuestas se guardan bajo una clave canónica de la consulta
+(conceptos ordenados, author_id, alpha, beta, filtros por atributo,
+order_by, limit) que además incluye la versión de los modelos cargados, de modo
+que al publicar un nuevo artefacto las entradas antiguas dejan de usarse
+automáticamente.
+
+Hay dos niveles:
+    1. LRU en memoria del proceso, acotado por cantidad de entradas.
+    2. (Opcional) backend compartido entre procesos usando el framework de
+       cache de Django (locmem, file, redis, ...).
+
+Configuración en settings.RECOMMENDATION_CACHE:
+    {
+        'ENABLED': True,
+        'MAX_ENTRIES': 1024,     # tamaño del LRU local
+        'SHARED_ALIAS': None,    # alias de settings.CACHES (ej. 'default')
+        'TIMEOUT': 3600,         # segundos en el backend compartido
+    }
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+DEFAULT_CONFIG = {
+    'ENABLED': True,
+    'MAX_ENTRIES': 1024,
+    'SHARED_ALIAS': None,
+    'TIMEOUT': 3600,
+}
+
+KEY_PREFIX = 'recommendation'
+
+
+def canonical_key(concept_vector, author_id, alpha, beta, country_code, order_by, limit, model_versions,
+                  filters=None):
+    """
+    Clave canónica de una consulta de recomendación.
+
+    El orden de los conceptos y los duplicados no cambian el resultado,
+    por lo que se normalizan; la clave final es un hash estable.
+    """
+    concept_ids = sorted({c['id'] for c in (concept_vector or [])})
+    payload = {
+        'concepts': concept_ids,
+        'author_id': (author_id or '').strip(),
+        'alpha': float(alpha),
+        'beta': float(beta),
+        'country_code': country_code or '',
+        'filters': {name: value for name, value in (filters or {}).items() if value not in (None, '')},
+        'order_by': order_by,
+        'limit': int(limit),
+        'models': list(model_versions),
+    }
+    digest = hashlib.sha1(
+        json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    ).hexdigest()
+    return f'{KEY_PREFIX}:{digest}'
+
+
+class LRUCache:
+    """Cache LRU thread-safe acotado por cantidad de entradas."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RecommendationCache:
+    """LRU local con un backend compartido opcional (framework de cache de Django)."""
+
+    def __init__(self, config=None):
+        config = {**DEFAULT_CONFIG, **(config or {})}
+        self.enabled = config['ENABLED']
+        self.timeout = config['TIMEOUT']
+        self.shared_alias = config['SHARED_ALIAS']
+        self.local = LRUCache(config['MAX_ENTRIES'])
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias] if self.shared_alias else None
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+
+        value = self.local.get(key)
+        if value is not None:
+            return value
+
+        if self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value)
+        return value
+
+    def set(self, key, value):
+        if not self.enabled:
+            return
+        self.local.set(key, value)
+        if self.shared is not None:
+            self.shared.set(key, value, timeout=self.timeout)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_recommendation_cache():
+    """Instancia única por proceso, configurada desde settings."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = RecommendationCache(getattr(settings, 'RECOMMENDATION_CACHE', None))
+    return _cache
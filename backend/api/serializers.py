@@ -127,6 +127,24 @@ class GetRecommendationsRequestSerializer(serializers.Serializer):
         default='',
         allow_blank=True
     )
+    institution_type = serializers.CharField(
+        required=False,
+        default='',
+        allow_blank=True,
+        help_text="Tipo de la última institución del autor (ej: education)"
+    )
+    min_works_count = serializers.IntegerField(
+        required=False,
+        allow_null=True,
+        default=None,
+        min_value=0
+    )
+    min_cited_by_count = serializers.IntegerField(
+        required=False,
+        allow_null=True,
+        default=None,
+        min_value=0
+    )
     order_by = serializers.ChoiceField( 
         choices=['sim', 'works', 'cites'],
         required=False,
@@ -0,0 +1,227 @@
+"""
+Modelos sintéticos para los tests del recomendador.
+
+Se escriben en un directorio temporal con el mismo formato que los archivos
+legacy de producción (concept_mapping.pkl, author_concept_matrix.npz,
+X_full.npz, itemknn_best.npz, cf_U_als.npy, ...), por lo que los tests no
+dependen de recommender/files ni de la base de datos.
+"""
+
+import contextlib
+import io
+import os
+import pickle
+import shutil
+import tempfile
+from unittest import mock
+
+import numpy as np
+from scipy.sparse import csr_matrix, random as sparse_random, save_npz
+from sklearn.preprocessing import normalize
+from django.test import SimpleTestCase
+
+from recommender.artifacts import artifact_dir
+from recommender.author_attributes import AuthorAttributes
+from recommender.authors import AuthorDictionary
+from recommender.content_based.queries import ContentBasedQueries
+from recommender.hybrid_recommender import HybridRecommender
+from recommender.ItemKNN.queries import ItemKNNQueries
+from recommender.matrix_factorization.queries import MFQueries
+
+N_AUTHORS = 240
+N_CONCEPTS = 30
+N_CF_ONLY = 20
+
+
+def author_key(i):
+    return f'https://openalex.org/A{i}'
+
+
+def concept_key(j):
+    return f'https://openalex.org/C{j}'
+
+
+def write_legacy_files(files_dir, seed=7):
+    """
+    Escribe un modelo sintético en formato legacy: content-based sobre
+    N_AUTHORS autores y ItemKNN/MF sobre un subconjunto en otro orden más
+    N_CF_ONLY autores que solo están en los motores colaborativos.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Content-based (algunas filas quedan vacías)
+    author_ids = np.array([author_key(i) for i in range(N_AUTHORS)], dtype=object)
+    tf = sparse_random(N_AUTHORS, N_CONCEPTS, density=0.12, format='csr', dtype=np.float32, random_state=seed)
+    save_npz(os.path.join(files_dir, 'author_concept_matrix.npz'), normalize(tf, norm='l2', axis=1))
+    np.save(os.path.join(files_dir, 'cb_author_ids.npy'), author_ids, allow_pickle=True)
+    # Works distintos: sin empates entre autores sin conceptos en común
+    np.save(os.path.join(files_dir, 'cb_author_work_counts.npy'), (rng.permutation(N_AUTHORS) + 1).astype(np.int32))
+    np.save(os.path.join(files_dir, 'cb_idf_vector.npy'), (1 + rng.random(N_CONCEPTS)).astype(np.float32))
+    with open(os.path.join(files_dir, 'concept_mapping.pkl'), 'wb') as f:
+        pickle.dump({concept_key(j): j for j in range(N_CONCEPTS)}, f)
+
+    # Colaborativos
+    cf_authors = [author_key(i) for i in range(N_AUTHORS - 1, 39, -1)]
+    cf_authors += [author_key(N_AUTHORS + i) for i in range(N_CF_ONLY)]
+    idx_to_author = dict(enumerate(cf_authors))
+    n = len(cf_authors)
+
+    pairs = rng.integers(0, n, size=(6 * n, 2))
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    X = csr_matrix((np.ones(len(pairs), dtype=np.float32), (pairs[:, 0], pairs[:, 1])), shape=(n, n))
+    X = ((X + X.T) > 0).astype(np.float32).tocsr()
+    save_npz(os.path.join(files_dir, 'X_full.npz'), X)
+    np.save(os.path.join(files_dir, 'idx_to_author.npy'), idx_to_author, allow_pickle=True)
+
+    columns = normalize(X, norm='l2', axis=0)
+    similarity = (columns.T @ columns).tocsr()
+    similarity.setdiag(0)
+    similarity.eliminate_zeros()
+    np.savez(
+        os.path.join(files_dir, 'itemknn_best.npz'),
+        data=similarity.data, indices=similarity.indices, indptr=similarity.indptr,
+        shape=np.array(similarity.shape), K=np.array(50),
+    )
+
+    np.save(os.path.join(files_dir, 'cf_idx_to_author.npy'), idx_to_author, allow_pickle=True)
+    np.save(os.path.join(files_dir, 'cf_U_als.npy'), rng.standard_normal((n, 8)).astype(np.float32))
+    return cf_authors
+
+
+def author_pool(n_authors, seed):
+    """Filas sintéticas de mv_recommendation_author_pool: {author_id: (concept_ids, concept_tfs)}."""
+    rng = np.random.default_rng(seed)
+    pool = {}
+    for i in range(n_authors):
+        concepts = rng.choice(N_CONCEPTS + 2, size=rng.integers(0, 6), replace=False)
+        # Conceptos fuera del mapeo (índices >= N_CONCEPTS) se ignoran
+        pool[author_key(i)] = (
+            [concept_key(j) for j in concepts],
+            rng.integers(1, 6, size=len(concepts)).tolist(),
+        )
+    return pool
+
+
+def pool_reader(pool):
+    """Reemplazo de iter_author_pool que recorre pool ordenado por author_id."""
+    def iter_author_pool(chunk_size=5000):
+        rows = [(author_id, *pool[author_id]) for author_id in sorted(pool)]
+        for start in range(0, len(rows), chunk_size):
+            yield rows[start:start + chunk_size]
+    return iter_author_pool
+
+
+def coauthorship_source(rows):
+    """
+    Reemplazo de la vista de coautorías (MvIaCoauthorshipLatam) que entrega
+    rows: lista de tuplas (coauthor_1, coauthor_2, shared_works).
+    """
+    class QuerySet:
+        def values_list(self, *fields):
+            return self
+
+        def iterator(self, chunk_size=None):
+            return iter(rows)
+
+    class Source:
+        objects = QuerySet()
+
+        class _meta:
+            db_table = 'test_coauthorship'
+
+    return Source
+
+
+def random_coauthorships(n_rows, n_authors, seed=0):
+    """Pares de coautoría con duplicados, pares invertidos, autolazos y NULL."""
+    rng = np.random.default_rng(seed)
+    ids = rng.integers(0, n_authors, size=(n_rows, 2))
+    counts = rng.integers(0, 6, size=n_rows).tolist()
+    counts[3] = None
+    rows = [(author_key(a), author_key(b), c) for (a, b), c in zip(ids.tolist(), counts)]
+    return rows + [(b, a, c) for a, b, c in rows[:30]] + rows[:10]
+
+
+def random_queries(n_queries, seed=3):
+    """Consultas de 1 a 5 conceptos (algunas con conceptos desconocidos)."""
+    rng = np.random.default_rng(seed)
+    queries = []
+    for _ in range(n_queries):
+        size = rng.integers(1, 6)
+        queries.append([{'id': concept_key(j)} for j in rng.choice(N_CONCEPTS + 3, size, replace=False)])
+    return queries
+
+
+def quiet():
+    """Silencia los prints de progreso de los builders."""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+class LegacyModelTestCase(SimpleTestCase):
+    """
+    Base: modelos sintéticos legacy en un directorio temporal, con los
+    motores, el diccionario de autores y los atributos apuntando a él.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.files_dir = tempfile.mkdtemp(prefix='recommender-tests-')
+        cls.cf_authors = write_legacy_files(cls.files_dir)
+
+        files_dir = cls.files_dir
+        cls.patches = [
+            mock.patch.object(ContentBasedQueries, '_models_dir', staticmethod(lambda: files_dir)),
+            mock.patch.object(
+                AuthorDictionary, '_root_dir', staticmethod(lambda: artifact_dir(files_dir, 'authors'))
+            ),
+            mock.patch.object(
+                AuthorAttributes, '_root_dir',
+                staticmethod(lambda: artifact_dir(files_dir, 'author_attributes'))
+            ),
+            mock.patch.object(HybridRecommender, 'CF_TIMEOUT', 0),
+        ]
+        for patch in cls.patches:
+            patch.start()
+        cls.reset_caches()
+
+    @classmethod
+    def tearDownClass(cls):
+        for patch in cls.patches:
+            patch.stop()
+        cls.reset_caches()
+        shutil.rmtree(cls.files_dir, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def reset_caches(cls):
+        """Los motores se vuelven a cargar en el próximo uso."""
+        for engine in (ContentBasedQueries, ItemKNNQueries, MFQueries, AuthorDictionary, AuthorAttributes):
+            engine._cache = None
+        AuthorAttributes._last_missing_check = None
+
+    @classmethod
+    def load_legacy(cls):
+        cls.reset_caches()
+        ContentBasedQueries._cache = ContentBasedQueries._load_legacy_files(cls.files_dir)
+        ItemKNNQueries._cache = ItemKNNQueries._load_legacy_files(cls.files_dir)
+        MFQueries._cache = MFQueries._load_legacy_files(cls.files_dir)
+
+    def assertSameRanking(self, ids, scores, reference, k):
+        """
+        Top-k igual al prefijo de reference (dict id -> score ordenado
+        descendente): mismos scores en orden, y cada id con su score de
+        referencia (entre empatados en el borde puede elegir otros).
+        """
+        expected = np.array(list(reference.values())[:k])
+        self.assertEqual(len(ids), len(expected))
+        np.testing.assert_allclose(scores, expected, atol=1e-6)
+        for author, score in zip(np.asarray(ids).tolist(), np.asarray(scores).tolist()):
+            self.assertAlmostEqual(reference[author], score, delta=1e-6)
+
+
+def copy_legacy_files(source_dir, files_dir):
+    """Copia los archivos legacy (sin artefactos) a otro directorio."""
+    for name in os.listdir(source_dir):
+        if name != 'artifacts':
+            shutil.copy(os.path.join(source_dir, name), files_dir)
@@ -0,0 +1,98 @@
+import calendar
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+import numpy as np
+from scipy.sparse import random as sparse_random
+
+from api.tests.fixtures import LegacyModelTestCase, copy_legacy_files, quiet, random_queries
+from recommender.artifacts import (
+    Artifact, ArtifactWriter, CompactCSR, _new_version, artifact_dir, current_version,
+)
+from recommender.content_based.queries import ContentBasedQueries
+from recommender.ItemKNN.queries import ItemKNNQueries
+from recommender.matrix_factorization.queries import MFQueries
+
+
+class ArtifactRoundTripTests(LegacyModelTestCase):
+
+    def test_writer_and_reader_round_trip(self):
+        root = os.path.join(self.files_dir, 'artifacts', 'roundtrip')
+        matrix = sparse_random(20, 7, density=0.3, format='csr', dtype=np.float32, random_state=1)
+        strings = ['b', 'a', 'https://openalex.org/A10', 'c']
+
+        writer = ArtifactWriter(root)
+        writer.add_array('values', np.arange(10, dtype=np.int64))
+        writer.add_strings('ids', strings)
+        writer.add_csr('matrix', matrix)
+        writer.add_compact_csr('compact', CompactCSR.from_csr(matrix, 'float32'))
+        writer.set_meta(K=5)
+        version = writer.commit()
+
+        artifact = Artifact.open(root)
+        self.assertEqual(current_version(root), version)
+        self.assertEqual(artifact.meta['K'], 5)
+        np.testing.assert_array_equal(artifact.array('values'), np.arange(10))
+        table = artifact.strings('ids')
+        self.assertEqual(table.keys_at(np.arange(len(strings))), strings)
+        self.assertEqual(table['c'], 3)
+        self.assertNotIn('d', table)
+        self.assertEqual((artifact.csr('matrix') != matrix).nnz, 0)
+        self.assertEqual((artifact.matrix('compact').to_csr() != matrix).nnz, 0)
+
+        # Una nueva versión reemplaza CURRENT y las antiguas se eliminan
+        newer = ArtifactWriter(root)
+        newer.add_array('values', np.zeros(3))
+        self.assertEqual(newer.commit(keep=1), current_version(root))
+        self.assertFalse(os.path.exists(os.path.join(root, version)))
+
+    def test_versions_use_utc_timestamps(self):
+        # 2025-04-06 02:30 UTC: en Chile la hora local retrocede de 00:00 a 23:00
+        now = calendar.timegm((2025, 4, 6, 2, 30, 0))
+        with mock.patch('recommender.artifacts.time.time', side_effect=[now, now + 3600]):
+            first, second = _new_version(), _new_version()
+        self.assertTrue(first.startswith('20250406T023000.000Z-'))
+        self.assertTrue(second.startswith('20250406T033000.000Z-'))
+        self.assertLess(first, second)
+
+    def test_engine_artifacts_match_legacy_files(self):
+        from recommender.content_based.vector_builder import export_artifact as export_cb
+        from recommender.ItemKNN.load_data import export_artifact as export_itemknn
+        from recommender.matrix_factorization.load_data import export_artifact as export_mf
+
+        self.load_legacy()
+        queries = random_queries(10)
+        legacy_cb = [ContentBasedQueries.get_top_k(q, 15) for q in queries]
+        legacy_knn = [ItemKNNQueries.get_top_k(a, 15) for a in self.cf_authors[::17]]
+        legacy_mf = [MFQueries.get_top_k(a, 15) for a in self.cf_authors[::17]]
+
+        files_dir = tempfile.mkdtemp(prefix='recommender-export-')
+        try:
+            copy_legacy_files(self.files_dir, files_dir)
+            with quiet():
+                export_cb(files_dir)
+                export_itemknn(files_dir, top_m=10, n_jobs=1)
+                export_mf(files_dir, neighbour_top_m=10, n_jobs=1)
+
+            ContentBasedQueries._cache = ContentBasedQueries._load_artifact(artifact_dir(files_dir, 'content_based'))
+            ItemKNNQueries._cache = ItemKNNQueries._load_artifact(artifact_dir(files_dir, 'itemknn'))
+            MFQueries._cache = MFQueries._load_artifact(artifact_dir(files_dir, 'mf'))
+
+            for query, (ids, scores) in zip(queries, legacy_cb):
+                got_ids, got_scores = ContentBasedQueries.get_top_k(query, 15)
+                np.testing.assert_array_equal(got_ids, ids)
+                np.testing.assert_allclose(got_scores, scores, atol=1e-6)
+            for author, (ids, scores) in zip(self.cf_authors[::17], legacy_knn):
+                np.testing.assert_allclose(ItemKNNQueries.get_top_k(author, 15)[1], scores, atol=1e-6)
+            for author, (ids, scores) in zip(self.cf_authors[::17], legacy_mf):
+                np.testing.assert_allclose(MFQueries.get_top_k(author, 15)[1], scores, atol=1e-6)
+
+            # Los ids globales publicados son los del diccionario
+            dictionary = Artifact.open(artifact_dir(files_dir, 'authors')).strings('author_ids')
+            global_ids = ItemKNNQueries._cache['global_ids']
+            self.assertEqual(dictionary.keys_at(global_ids), self.cf_authors)
+        finally:
+            shutil.rmtree(files_dir, ignore_errors=True)
+            self.reset_caches()
@@ -0,0 +1,90 @@
+import shutil
+from unittest import mock
+
+import numpy as np
+
+from api.tests.fixtures import N_AUTHORS, LegacyModelTestCase, author_key, quiet, random_queries
+from recommender.artifacts import artifact_dir
+from recommender.author_attributes import AuthorAttributes, build_author_attributes
+from recommender.authors import AuthorDictionary, build_author_dictionary
+from recommender.hybrid_recommender import HybridRecommender
+
+
+class FakeQuerySet(list):
+    """Lo mínimo del ORM que usa build_author_attributes."""
+
+    def filter(self, **lookups):
+        return self
+
+    def values(self, *fields):
+        return self
+
+    def values_list(self, *fields):
+        return self
+
+    def iterator(self, chunk_size=None):
+        return iter(self)
+
+
+def fake_models(authors, institutions):
+    author_model = mock.Mock(objects=FakeQuerySet(authors))
+    institution_model = mock.Mock(objects=FakeQuerySet(institutions))
+    return mock.patch.multiple('api.models', MvLatamAuthor=author_model, Institution=institution_model)
+
+
+class AuthorAttributeFilterTests(LegacyModelTestCase):
+
+    def setUp(self):
+        self.load_legacy()
+
+    def test_attribute_filters_without_artifact(self):
+        # Sin artefacto de atributos los filtros se aplican en la base de datos
+        self.assertFalse(AuthorAttributes.available())
+        self.assertIsNone(AuthorAttributes.mask(country_code='CL'))
+        self.assertIsNotNone(AuthorAttributes.active_filters(country_code='CL'))
+        self.assertIsNone(AuthorAttributes.active_filters(country_code='', institution_type=''))
+
+    def test_filters_are_applied_inside_the_engines(self):
+        rng = np.random.default_rng(8)
+        # Solo algunos autores están en mv_latam_authors
+        rows = [
+            (author_key(i), rng.choice(['CL', 'AR', None]), f'I{i % 3}', int(rng.integers(0, 40)), 0)
+            for i in range(0, N_AUTHORS, 2)
+        ]
+        institutions = [('I0', 'education'), ('I1', 'company'), ('I2', None)]
+        try:
+            with quiet():
+                build_author_dictionary(self.files_dir)
+                with fake_models(rows, institutions):
+                    build_author_attributes(self.files_dir)
+            self.reset_caches()
+            self.load_legacy()
+
+            allowed = AuthorAttributes.mask(country_code='CL', min_works_count=10)
+            expected = {
+                author_id for author_id, country, _, works, _ in rows if country == 'CL' and works >= 10
+            }
+            self.assertEqual(set(AuthorDictionary.keys_at(np.flatnonzero(allowed))), expected)
+            self.assertIs(AuthorAttributes.mask(country_code='CL', min_works_count=10), allowed)
+            education = AuthorAttributes.mask(institution_type='education')
+            self.assertEqual(
+                set(AuthorDictionary.keys_at(np.flatnonzero(education))),
+                {author_id for author_id, _, institution, _, _ in rows if institution == 'I0'}
+            )
+
+            # El top-k filtrado es el prefijo permitido del ranking completo
+            query = random_queries(1, seed=12)[0]
+            for author in (None, self.cf_authors[4]):
+                ids, hybrid, _, _ = HybridRecommender.get_top_k(query, author, k=None, fusion='full')
+                reference = [i for i in ids.tolist() if allowed[i]]
+                filtered, scores, _, _ = HybridRecommender.get_top_k(
+                    query, author, k=5, fusion='full', allowed=allowed
+                )
+                self.assertTrue(all(allowed[filtered]))
+                self.assertEqual(len(filtered), min(5, len(reference)))
+                full_scores = dict(zip(ids.tolist(), hybrid.tolist()))
+                np.testing.assert_allclose(scores, [full_scores[i] for i in reference[:5]], atol=1e-6)
+        finally:
+            shutil.rmtree(artifact_dir(self.files_dir, 'authors'), ignore_errors=True)
+            shutil.rmtree(artifact_dir(self.files_dir, 'author_attributes'), ignore_errors=True)
+            self.reset_caches()
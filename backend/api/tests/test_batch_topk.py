@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+from scipy.sparse import load_npz
+
+from api.tests.fixtures import LegacyModelTestCase, quiet
+from recommender.ItemKNN import neighbours as itemknn_neighbours
+from recommender.ItemKNN.trainer import cosine_similarity_top_k
+from recommender.ItemKNN.queries import ItemKNNQueries
+from recommender.matrix_factorization import neighbours as mf_neighbours
+from recommender.matrix_factorization.queries import MFQueries
+
+
+class BatchTopKTests(LegacyModelTestCase):
+    """Los bloques repartidos en procesos dan lo mismo que en el proceso actual."""
+
+    def setUp(self):
+        self.load_legacy()
+
+    def assertSameArrays(self, first, second):
+        self.assertEqual(set(first), set(second))
+        for name in first:
+            np.testing.assert_array_equal(first[name], second[name], err_msg=name)
+
+    def test_parallel_similarity_matches_sequential(self):
+        X = load_npz(os.path.join(self.files_dir, 'X_full.npz'))
+        with quiet():
+            sequential = cosine_similarity_top_k(X, 6, block_size=50, n_jobs=1)
+            parallel = cosine_similarity_top_k(X, 6, block_size=50, n_jobs=2, work_dir=self.files_dir)
+
+        for part in ('indptr', 'indices', 'data'):
+            np.testing.assert_array_equal(getattr(sequential, part), getattr(parallel, part), err_msg=part)
+
+    def test_parallel_itemknn_neighbours_match_sequential(self):
+        cache = ItemKNNQueries._cache
+        with quiet():
+            sequential = itemknn_neighbours.build_neighbour_lists(
+                cache['X_full'], cache['similarity'], top_m=8, block_size=50, n_jobs=1
+            )
+            parallel = itemknn_neighbours.build_neighbour_lists(
+                cache['X_full'], cache['similarity'], top_m=8, block_size=50, n_jobs=2,
+                work_dir=self.files_dir
+            )
+        self.assertSameArrays(sequential, parallel)
+
+    def test_mf_neighbours_match_full_sort(self):
+        U = MFQueries._cache['U']
+        with quiet():
+            sequential = mf_neighbours.build_neighbour_lists(U, top_m=8, block_size=50, n_jobs=1)
+            parallel = mf_neighbours.build_neighbour_lists(
+                U, top_m=8, block_size=50, n_jobs=2, work_dir=self.files_dir
+            )
+        self.assertSameArrays(sequential, parallel)
+
+        MFQueries._cache.update(sequential)
+        MFQueries._cache['neighbour_top_m'] = 8
+        for author_idx in range(0, len(self.cf_authors), 23):
+            # Referencia: producto interno denso sin el propio autor
+            scores = U @ U[author_idx]
+            scores[author_idx] = -np.inf
+            valid = np.flatnonzero(np.isfinite(scores))
+            low, high = scores[valid].min(), scores[valid].max()
+            order = valid[np.argsort(-scores[valid], kind='stable')]
+            reference = {int(i): (scores[i] - low) / (high - low) for i in order}
+
+            # k <= top_m sale de las listas; k mayor cae al cálculo por bloques
+            for k in (1, 8, 40):
+                ids, got = MFQueries.get_top_k(self.cf_authors[author_idx], k)
+                self.assertSameRanking(ids, got, reference, k)
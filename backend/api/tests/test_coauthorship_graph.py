@@ -0,0 +1,57 @@
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import load_npz
+
+from api.tests.fixtures import LegacyModelTestCase, coauthorship_source, quiet, random_coauthorships
+from recommender.ItemKNN.load_data import build_author_knn_data
+
+
+def reference_graph(rows, use_log_weight):
+    """Matriz y pares únicos acumulados par a par (como el builder original)."""
+    rows = [(a, b, c or 0) for a, b, c in rows if a != b]
+    authors = sorted({a for a, _, _ in rows} | {b for _, b, _ in rows})
+    index = {a: i for i, a in enumerate(authors)}
+
+    matrix = np.zeros((len(authors), len(authors)))
+    unique = {}
+    for a, b, count in rows:
+        w = np.log1p(count) if use_log_weight else count
+        i, j = index[a], index[b]
+        matrix[i, j] += w
+        matrix[j, i] += w
+        unique.setdefault((min(i, j), max(i, j)), count)
+
+    pairs = pd.DataFrame(
+        [(authors[i], authors[j], float(count)) for (i, j), count in unique.items()],
+        columns=['pair_min', 'pair_max', 'count']
+    )
+    return authors, matrix, pairs
+
+
+class CoauthorshipGraphTests(LegacyModelTestCase):
+
+    def test_vectorized_build_matches_reference(self):
+        rows = random_coauthorships(3000, 400)
+        for use_log_weight in (True, False):
+            output_dir = tempfile.mkdtemp(prefix='recommender-knn-data-')
+            try:
+                with quiet():
+                    build_author_knn_data(
+                        output_dir, use_log_weight=use_log_weight,
+                        source=coauthorship_source(rows), chunk_size=700
+                    )
+                authors, matrix, pairs = reference_graph(rows, use_log_weight)
+
+                R = load_npz(f'{output_dir}/author_author_matrix.npz')
+                self.assertEqual(R.indices.dtype, np.int32)
+                self.assertEqual(R.indptr.dtype, np.int32)
+                np.testing.assert_allclose(R.toarray(), matrix, atol=1e-5)
+
+                idx_to_author = np.load(f'{output_dir}/idx_to_author.npy', allow_pickle=True).item()
+                self.assertEqual([idx_to_author[i] for i in range(len(authors))], authors)
+                pd.testing.assert_frame_equal(pd.read_pickle(f'{output_dir}/df_pairs_unique.pkl'), pairs)
+            finally:
+                shutil.rmtree(output_dir, ignore_errors=True)
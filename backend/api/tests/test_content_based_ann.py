@@ -0,0 +1,43 @@
+import shutil
+import tempfile
+
+import numpy as np
+
+from api.tests.fixtures import LegacyModelTestCase, copy_legacy_files, quiet, random_queries
+from recommender.artifacts import artifact_dir
+from recommender.content_based.queries import ContentBasedQueries
+from recommender.content_based.vector_builder import export_artifact
+
+
+class ContentBasedANNTests(LegacyModelTestCase):
+
+    def test_probing_every_list_matches_exact_search(self):
+        files_dir = tempfile.mkdtemp(prefix='recommender-cb-ann-')
+        try:
+            copy_legacy_files(self.files_dir, files_dir)
+            with quiet():
+                export_artifact(files_dir, ann_lists=8)
+            cache = ContentBasedQueries._load_artifact(artifact_dir(files_dir, 'content_based'))
+            n_lists = len(cache['ann_centroids'])
+
+            # Cada autor con conceptos aparece en exactamente una lista
+            matrix = cache['author_matrix']
+            np.testing.assert_array_equal(
+                np.sort(cache['ann_list_authors']), np.flatnonzero(np.diff(matrix.indptr) > 0)
+            )
+
+            for query in random_queries(15, seed=9):
+                exact_ids, exact_scores = ContentBasedQueries.get_top_k(
+                    query, 10, approximate=False, cache=cache
+                )
+                ids, scores = ContentBasedQueries.get_top_k(
+                    query, 10, approximate=True, n_probe=n_lists, cache=cache
+                )
+                np.testing.assert_allclose(scores, exact_scores, atol=1e-6)
+                np.testing.assert_array_equal(ids, exact_ids)
+
+                # Con menos listas el resultado sigue teniendo k autores
+                ids, _ = ContentBasedQueries.get_top_k(query, 10, approximate=True, n_probe=1, cache=cache)
+                self.assertEqual(len(ids), 10)
+        finally:
+            shutil.rmtree(files_dir, ignore_errors=True)
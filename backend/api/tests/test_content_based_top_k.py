@@ -0,0 +1,37 @@
+import numpy as np
+
+from api.tests.fixtures import N_AUTHORS, LegacyModelTestCase, random_queries
+from recommender.content_based.queries import ContentBasedQueries
+
+
+class ContentBasedTopKTests(LegacyModelTestCase):
+
+    def setUp(self):
+        self.load_legacy()
+
+    def test_top_k_matches_full_sort(self):
+        cache = ContentBasedQueries._cache
+        matrix = cache['author_matrix']
+        work_counts = cache['author_work_counts'].astype(float)
+        confidence = ContentBasedQueries.CONFIDENCE_PARAM
+        allowed = np.random.default_rng(0).random(N_AUTHORS) < 0.3
+
+        for query in random_queries(25):
+            # Referencia: similitud densa, smoothing, Min-Max y orden completo
+            user_vector = ContentBasedQueries.create_user_vector(
+                query, cache['n_concepts'], cache['concept_to_index'], cache['idf_vector']
+            )
+            similarities = np.asarray((matrix @ user_vector.T).todense()).ravel()
+            smoothed = (confidence * similarities.mean() + work_counts * similarities) / (confidence + work_counts)
+            spread = smoothed.max() - smoothed.min()
+            normalized = (smoothed - smoothed.min()) / spread if spread > 1e-8 else np.zeros_like(smoothed)
+            order = np.argsort(-normalized, kind='stable')
+            reference = {int(i): normalized[i] for i in order}
+
+            for k in (1, 10, 50, None):
+                ids, scores = ContentBasedQueries.get_top_k(query, k)
+                self.assertSameRanking(ids, scores, reference, k or N_AUTHORS)
+
+            filtered = {i: s for i, s in reference.items() if allowed[i]}
+            ids, scores = ContentBasedQueries.get_top_k(query, 10, allowed=allowed)
+            self.assertSameRanking(ids, scores, filtered, 10)
@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+import numpy as np
+from scipy.sparse import load_npz
+
+from api.tests.fixtures import (
+    N_CONCEPTS, LegacyModelTestCase, author_key, author_pool, concept_key, pool_reader, quiet,
+)
+from recommender.artifacts import Artifact, artifact_dir
+from recommender.content_based import vector_builder
+
+
+def reference_model(pool):
+    """TF-IDF autor a autor, como el entrenamiento original (celda a celda)."""
+    author_ids = sorted(pool)
+    tf = np.zeros((len(author_ids), N_CONCEPTS))
+    doc_freq = np.zeros(N_CONCEPTS)
+    work_counts = []
+    for row, author_id in enumerate(author_ids):
+        concept_ids, concept_tfs = pool[author_id]
+        work_counts.append(sum(concept_tfs))
+        present = set()
+        for position, concept_id in enumerate(concept_ids):
+            count = concept_tfs[position] if position < len(concept_tfs) else 0
+            j = int(concept_id.rsplit('C', 1)[1])
+            if j >= N_CONCEPTS:
+                continue
+            # La última aparición del concepto define su TF
+            tf[row, j] = 1.0 + np.log(count) if count > 0 else 0.0
+            if count > 0:
+                present.add(j)
+        for j in present:
+            doc_freq[j] += 1
+
+    idf = np.log((len(author_ids) + 1) / (doc_freq + 1.0)) + 1.0
+    tfidf = tf * idf
+    norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+    return author_ids, tfidf / np.where(norms > 0, norms, 1.0), idf, np.array(work_counts)
+
+
+class ContentBasedTrainingTests(LegacyModelTestCase):
+
+    def test_chunked_training_matches_reference(self):
+        pool = author_pool(130, seed=5)
+        # Casos borde: conceptos repetidos, TF faltantes, TF 0 y autor vacío
+        pool[author_key(500)] = ([concept_key(1), concept_key(2), concept_key(1)], [3, 2, 4])
+        pool[author_key(501)] = ([concept_key(3), concept_key(4)], [2])
+        pool[author_key(502)] = ([concept_key(5), concept_key(6)], [0, 1])
+        pool[author_key(503)] = (None, None)
+
+        files_dir = tempfile.mkdtemp(prefix='recommender-train-')
+        try:
+            shutil.copy(os.path.join(self.files_dir, 'concept_mapping.pkl'), files_dir)
+            with mock.patch.object(vector_builder, 'iter_author_pool', pool_reader(pool)), quiet():
+                vector_builder.train_model(files_dir, chunk_size=17)
+
+            pool[author_key(503)] = ([], [])
+            author_ids, matrix, idf, work_counts = reference_model(pool)
+
+            artifact = Artifact.open(artifact_dir(files_dir, 'content_based'))
+            self.assertEqual(artifact.strings('author_ids').keys(), author_ids)
+            np.testing.assert_allclose(artifact.csr('author_matrix').toarray(), matrix, atol=1e-6)
+            np.testing.assert_allclose(artifact.array('idf_vector'), idf, rtol=1e-6)
+            np.testing.assert_array_equal(artifact.array('author_work_counts'), work_counts)
+
+            # Los archivos legacy contienen el mismo modelo
+            legacy = load_npz(os.path.join(files_dir, 'author_concept_matrix.npz'))
+            self.assertEqual((legacy != artifact.csr('author_matrix')).nnz, 0)
+        finally:
+            shutil.rmtree(files_dir, ignore_errors=True)
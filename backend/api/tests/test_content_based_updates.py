@@ -0,0 +1,121 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+import numpy as np
+
+from api.tests.fixtures import (
+    N_AUTHORS, LegacyModelTestCase, author_key, author_pool, pool_reader, quiet, random_queries,
+)
+from recommender.artifacts import Artifact, artifact_dir
+from recommender.content_based import incremental, vector_builder
+from recommender.content_based.queries import ContentBasedQueries
+from recommender.hybrid_recommender import HybridRecommender
+
+
+class ContentBasedUpdateTests(LegacyModelTestCase):
+
+    def train(self, files_dir, pool, update=False):
+        reader = pool_reader(pool)
+        with mock.patch.object(vector_builder, 'iter_author_pool', reader), \
+                mock.patch.object(incremental, 'iter_author_pool', reader), quiet():
+            if update:
+                incremental.update_model(files_dir, chunk_size=50, idf_tolerance=0.0)
+            else:
+                vector_builder.train_model(files_dir, chunk_size=50)
+        return Artifact.open(artifact_dir(files_dir, 'content_based'))
+
+    def test_update_model_matches_full_rebuild(self):
+        before = author_pool(150, seed=1)
+        after = dict(before)
+        rng = np.random.default_rng(2)
+        for author_id in rng.choice(sorted(before), 20, replace=False):
+            del after[author_id]
+        changed = author_pool(150, seed=3)
+        for author_id in rng.choice(sorted(after), 15, replace=False):
+            after[author_id] = changed[author_id]
+        after.update({author_key(1000 + i): row for i, row in enumerate(author_pool(25, seed=4).values())})
+
+        dirs = [tempfile.mkdtemp(prefix='recommender-update-') for _ in range(2)]
+        try:
+            for files_dir in dirs:
+                shutil.copy(os.path.join(self.files_dir, 'concept_mapping.pkl'), files_dir)
+            self.train(dirs[0], before)
+            updated = self.train(dirs[0], after, update=True)
+            rebuilt = self.train(dirs[1], after)
+
+            self.assertEqual(updated.meta['n_removed'], 20)
+            self.assertEqual(updated.meta['n_new'], 25)
+            rebuilt_ids = rebuilt.strings('author_ids').keys()
+            self.assertEqual(sorted(updated.strings('author_ids').keys()), rebuilt_ids)
+
+            # Mismas filas por autor (el update deja los nuevos al final)
+            rows = updated.strings('author_ids').index_of(rebuilt_ids)
+            np.testing.assert_allclose(
+                updated.csr('author_matrix')[rows].toarray(), rebuilt.csr('author_matrix').toarray(),
+                atol=1e-6
+            )
+            self.assertEqual((updated.csr('tf_matrix')[rows] != rebuilt.csr('tf_matrix')).nnz, 0)
+            np.testing.assert_array_equal(
+                updated.array('author_work_counts')[rows], rebuilt.array('author_work_counts')
+            )
+            np.testing.assert_array_equal(updated.array('doc_freq'), rebuilt.array('doc_freq'))
+            np.testing.assert_allclose(updated.array('idf_vector'), rebuilt.array('idf_vector'), rtol=1e-6)
+        finally:
+            for files_dir in dirs:
+                shutil.rmtree(files_dir, ignore_errors=True)
+
+    def test_reload_during_request_uses_one_version(self):
+        query = random_queries(1, seed=6)[0]
+        try:
+            with quiet():
+                vector_builder.export_artifact(self.files_dir)
+            self.reset_caches()
+            expected = HybridRecommender.get_top_k(query, None, k=20)
+            v1 = ContentBasedQueries.snapshot()
+
+            # Versión compactada: se eliminan la mitad de los autores, así
+            # que las filas de v1 apuntan a otros autores en v2
+            kept = np.arange(0, N_AUTHORS, 2)
+            v1_matrix = v1['author_matrix']
+
+            def publish_compacted():
+                with quiet():
+                    version = vector_builder.save_artifact(
+                        self.files_dir,
+                        concept_ids=v1['concept_to_index'].keys(),
+                        author_ids=v1['author_ids'].keys_at(kept),
+                        author_matrix=v1_matrix[kept],
+                        idf=v1['idf_vector'],
+                        work_counts=v1['author_work_counts'][kept],
+                    )
+                ContentBasedQueries._last_version_check = 0.0
+                return version
+
+            original = ContentBasedQueries.get_top_k
+            published = []
+
+            def get_top_k(*args, **kwargs):
+                result = original(*args, **kwargs)
+                if not published:
+                    published.append(publish_compacted())
+                return result
+
+            with mock.patch.object(ContentBasedQueries, 'get_top_k', get_top_k):
+                ids, hybrid, cb, cf = HybridRecommender.get_top_k(query, None, k=20)
+
+            # La respuesta en curso sigue siendo la de v1...
+            np.testing.assert_array_equal(ids, expected[0])
+            np.testing.assert_allclose(hybrid, expected[1], atol=1e-6)
+
+            # ... y la siguiente consulta usa v2
+            self.assertEqual(ContentBasedQueries.model_version(), published[0])
+            ids, _, _, _ = HybridRecommender.get_top_k(query, None, k=20)
+            allowed = set(ContentBasedQueries.global_ids().tolist())
+            self.assertTrue(set(ids.tolist()) <= allowed)
+            self.assertEqual(len(allowed), len(kept))
+        finally:
+            shutil.rmtree(artifact_dir(self.files_dir, 'content_based'), ignore_errors=True)
+            shutil.rmtree(artifact_dir(self.files_dir, 'authors'), ignore_errors=True)
+            self.reset_caches()
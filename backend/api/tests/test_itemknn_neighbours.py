@@ -0,0 +1,39 @@
+import numpy as np
+
+from api.tests.fixtures import LegacyModelTestCase, quiet
+from recommender.ItemKNN.neighbours import build_neighbour_lists
+from recommender.ItemKNN.queries import ItemKNNQueries
+
+TOP_M = 8
+
+
+class ItemKNNNeighbourListTests(LegacyModelTestCase):
+
+    def setUp(self):
+        self.load_legacy()
+
+    def test_precomputed_lists_match_scoring(self):
+        cache = ItemKNNQueries._cache
+        authors = self.cf_authors[::7]
+        allowed = np.random.default_rng(4).random(len(self.cf_authors)) < 0.5
+        expected = {
+            (author, k, filtered): ItemKNNQueries.get_top_k(author, k, allowed=allowed if filtered else None)
+            for author in authors for k in (1, 5, TOP_M, 30, None) for filtered in (False, True)
+        }
+
+        with quiet():
+            cache.update(build_neighbour_lists(cache['X_full'], cache['similarity'], top_m=TOP_M, block_size=50))
+        cache['neighbour_top_m'] = TOP_M
+
+        # Las filas completas (o truncadas que alcanzan) se leen de las
+        # listas; el resto se puntúa y el resultado debe ser el mismo
+        for (author, k, filtered), (expected_ids, expected_scores) in expected.items():
+            full = dict(zip(*ItemKNNQueries.get_top_k(author, None, allowed=allowed if filtered else None)))
+            ids, scores = ItemKNNQueries.get_top_k(author, k, allowed=allowed if filtered else None)
+            np.testing.assert_allclose(scores, expected_scores, atol=1e-6)
+            self.assertEqual(len(ids), len(expected_ids))
+            for author_idx, score in zip(ids.tolist(), scores.tolist()):
+                self.assertAlmostEqual(full[author_idx], score, delta=1e-6)
+
+        # Las listas guardan a lo más TOP_M vecinos por autor
+        self.assertLessEqual(np.diff(cache['neighbour_indptr']).max(), TOP_M)
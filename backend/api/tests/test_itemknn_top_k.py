@@ -0,0 +1,42 @@
+import numpy as np
+
+from api.tests.fixtures import LegacyModelTestCase, quiet
+from recommender.ItemKNN.queries import ItemKNNQueries
+
+
+class ItemKNNTopKTests(LegacyModelTestCase):
+
+    def setUp(self):
+        self.load_legacy()
+
+    def reference(self, author_idx, allowed=None):
+        """Ranking completo denso: X_full[autor] @ similarity, coautores en 0."""
+        cache = ItemKNNQueries._cache
+        row = cache['X_full'][author_idx]
+        scores = np.asarray(row @ cache['similarity'].toarray()).ravel()
+        reached = np.flatnonzero(scores)
+        scores[row.indices] = 0.0
+        low, high = scores[reached].min(), scores[reached].max()
+        if allowed is not None:
+            reached = reached[allowed[reached]]
+        order = reached[np.argsort(-scores[reached], kind='stable')]
+        return {int(i): (scores[i] - low) / (high - low) for i in order}
+
+    def test_top_k_matches_full_sort(self):
+        allowed = np.random.default_rng(1).random(len(self.cf_authors)) < 0.5
+        for author_idx in range(0, len(self.cf_authors), 9):
+            author = self.cf_authors[author_idx]
+            reference = self.reference(author_idx)
+            for k in (1, 5, 30, None):
+                ids, scores = ItemKNNQueries.get_top_k(author, k)
+                self.assertSameRanking(ids, scores, reference, len(reference) if k is None else k)
+
+            filtered = self.reference(author_idx, allowed)
+            ids, scores = ItemKNNQueries.get_top_k(author, 10, allowed=allowed)
+            self.assertSameRanking(ids, scores, filtered, min(10, len(filtered)))
+
+    def test_unknown_author_returns_empty_arrays(self):
+        with quiet():
+            ids, scores = ItemKNNQueries.get_top_k('https://openalex.org/A-unknown', 10)
+        self.assertEqual(len(ids), 0)
+        self.assertEqual(len(scores), 0)
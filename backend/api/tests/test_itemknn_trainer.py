@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from scipy.sparse import load_npz
+from sklearn.preprocessing import normalize
+
+from api.tests.fixtures import LegacyModelTestCase, coauthorship_source, quiet, random_coauthorships
+from recommender.ItemKNN.load_data import build_author_knn_data
+from recommender.ItemKNN.neighbours import load_similarity
+from recommender.ItemKNN.trainer import (
+    build_csr, cosine_similarity_top_k, recall_ndcg_at_k, top_k_rows, train_itemknn, triple_loo_split,
+)
+
+
+class ItemKNNTrainerTests(LegacyModelTestCase):
+
+    def test_similarity_top_k_matches_dense_cosine(self):
+        X = load_npz(os.path.join(self.files_dir, 'X_full.npz'))
+        with quiet():
+            similarity = cosine_similarity_top_k(X, 6, block_size=50, n_jobs=1)
+
+        items = normalize(X.T.tocsr(), norm='l2', axis=1)
+        dense = (items @ items.T).toarray()
+        for row in range(X.shape[0]):
+            reached = dense[row][dense[row] != 0]
+            expected = -np.sort(-reached)[:6]
+            start, end = similarity.indptr[row], similarity.indptr[row + 1]
+            # Los K mayores en orden descendente (entre empates puede elegir otros)
+            np.testing.assert_allclose(similarity.data[start:end], expected, rtol=1e-5)
+            np.testing.assert_allclose(dense[row, similarity.indices[start:end]], expected, rtol=1e-5)
+
+        # Un K menor es un prefijo de cada fila
+        smaller = top_k_rows(similarity, 3)
+        self.assertTrue(smaller.has_sorted_indices)
+        self.assertEqual(smaller.nnz, np.minimum(np.diff(similarity.indptr), 3).sum())
+
+    def test_triple_loo_split_partitions_pairs(self):
+        rng = np.random.default_rng(0)
+        pairs = np.unique(np.sort(rng.integers(0, 60, size=(400, 2)), axis=1), axis=0)
+        pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+        train_idx, val_idx, test_idx = triple_loo_split(pairs[:, 0], pairs[:, 1], seed=1)
+
+        everything = np.concatenate([train_idx, val_idx, test_idx])
+        np.testing.assert_array_equal(np.sort(everything), np.arange(len(pairs)))
+        self.assertGreater(len(val_idx), 0)
+        self.assertGreater(len(test_idx), 0)
+
+        # Mismo split con la misma semilla
+        again = triple_loo_split(pairs[:, 0], pairs[:, 1], seed=1)
+        for first, second in zip((train_idx, val_idx, test_idx), again):
+            np.testing.assert_array_equal(first, second)
+
+    def test_recall_ndcg_at_k(self):
+        # Autor 0: relevantes {1, 2}, recomendados [1, 3]; autor 1: relevante {0}, recomendado [0]
+        X_gt = build_csr(np.array([0, 0]), np.array([1, 2]), 4)
+        indptr, ids = np.array([0, 2, 3]), np.array([1, 3, 0])
+        recall, ndcg = recall_ndcg_at_k(indptr, ids, np.array([0, 1]), X_gt, k=2)
+        self.assertAlmostEqual(recall, (0.5 + 1.0) / 2)
+        self.assertAlmostEqual(ndcg, (1.0 / (1.0 + 1 / np.log2(3)) + 1.0) / 2)
+
+    def test_train_itemknn_writes_loadable_model(self):
+        files_dir = tempfile.mkdtemp(prefix='recommender-itemknn-train-')
+        try:
+            source = coauthorship_source(random_coauthorships(1500, 150, seed=2))
+            with quiet():
+                build_author_knn_data(files_dir, source=source)
+                result = train_itemknn(files_dir, ks=(5, 10), sample_users_eval=50, block_size=40, n_jobs=1)
+
+            self.assertIn(result['best_k'], (5, 10))
+            self.assertEqual(set(result['validation']), {5, 10})
+            similarity, K = load_similarity(os.path.join(files_dir, 'itemknn_best.npz'))
+            X_full = load_npz(os.path.join(files_dir, 'X_full.npz'))
+            self.assertEqual(K, result['best_k'])
+            self.assertEqual(similarity.shape, X_full.shape)
+            self.assertLessEqual(np.diff(similarity.indptr).max(), K)
+        finally:
+            shutil.rmtree(files_dir, ignore_errors=True)
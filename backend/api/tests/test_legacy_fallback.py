@@ -0,0 +1,54 @@
+import shutil
+import tempfile
+
+import numpy as np
+
+from api.tests.fixtures import (
+    N_AUTHORS, N_CF_ONLY, LegacyModelTestCase, author_key, copy_legacy_files, quiet, random_queries,
+)
+from recommender.artifacts import Artifact, artifact_dir
+from recommender.authors import LEGACY_VERSION, AuthorDictionary, build_author_dictionary
+from recommender.content_based.queries import ContentBasedQueries
+from recommender.hybrid_recommender import HybridRecommender
+from recommender.ItemKNN.queries import ItemKNNQueries
+from recommender.matrix_factorization.queries import MFQueries
+
+
+class LegacyFallbackTests(LegacyModelTestCase):
+
+    def setUp(self):
+        self.load_legacy()
+
+    def test_in_memory_dictionary_without_artifact(self):
+        self.assertEqual(AuthorDictionary.model_version(), LEGACY_VERSION)
+        cb_ids = ContentBasedQueries.global_ids()
+        knn_ids = ItemKNNQueries.global_ids()
+        mf_ids = MFQueries.global_ids()
+
+        # Cada autor recibe un único id, compartido entre motores
+        self.assertEqual(AuthorDictionary.size(), N_AUTHORS + N_CF_ONLY)
+        self.assertEqual(AuthorDictionary.keys_at(cb_ids), [author_key(i) for i in range(N_AUTHORS)])
+        self.assertEqual(AuthorDictionary.keys_at(knn_ids), self.cf_authors)
+        np.testing.assert_array_equal(knn_ids, mf_ids)
+
+    def test_hybrid_recommendations_without_artifacts(self):
+        query = random_queries(1, seed=4)[0]
+        recommendations = HybridRecommender.get_recommendations(query, self.cf_authors[5], k=10)
+        self.assertEqual(len(recommendations), 10)
+        known = set(self.cf_authors) | {author_key(i) for i in range(N_AUTHORS)}
+        self.assertTrue(all(author in known for author, _, _, _ in recommendations))
+        hybrid = [score for _, score, _, _ in recommendations]
+        self.assertEqual(hybrid, sorted(hybrid, reverse=True))
+
+    def test_build_author_dictionary_from_legacy_files(self):
+        files_dir = tempfile.mkdtemp(prefix='recommender-dictionary-')
+        try:
+            copy_legacy_files(self.files_dir, files_dir)
+            with quiet():
+                version = build_author_dictionary(files_dir)
+            self.assertIsNotNone(version)
+            dictionary = Artifact.open(artifact_dir(files_dir, 'authors')).strings('author_ids')
+            self.assertEqual(len(dictionary), N_AUTHORS + N_CF_ONLY)
+            self.assertTrue(all(author in dictionary for author in self.cf_authors))
+        finally:
+            shutil.rmtree(files_dir, ignore_errors=True)
@@ -0,0 +1,69 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from api.tests.fixtures import quiet
+from recommender.ItemKNN.trainer import build_csr
+from recommender.graph_based.train_lightgcn import (
+    _bpr_step, build_normalized_adjacency, pair_keys, sample_bpr_batch, train_lightgcn,
+)
+
+
+def random_graph(n_authors, n_pairs, seed):
+    rng = np.random.default_rng(seed)
+    pairs = np.unique(np.sort(rng.integers(0, n_authors, size=(n_pairs, 2)), axis=1), axis=0)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    X = build_csr(pairs[:, 0], pairs[:, 1], n_authors).tocsr()
+    X.sort_indices()
+    return X
+
+
+class LightGCNTrainingTests(SimpleTestCase):
+
+    def test_bpr_gradient_matches_finite_differences(self):
+        X = random_graph(12, 30, seed=0)
+        A_hat = build_normalized_adjacency(X)
+        rng = np.random.default_rng(1)
+        E0 = rng.standard_normal((12, 3))
+        u, p, n = sample_bpr_batch(X, np.flatnonzero(np.diff(X.indptr)), 16, rng)
+
+        _, grad = _bpr_step(A_hat, E0, 2, u, p, n, reg_lambda=0.1)
+        numeric = np.zeros_like(E0)
+        eps = 1e-6
+        for index in np.ndindex(*E0.shape):
+            shifted = E0.copy()
+            shifted[index] += eps
+            plus = _bpr_step(A_hat, shifted, 2, u, p, n, 0.1)[0]
+            shifted[index] -= 2 * eps
+            minus = _bpr_step(A_hat, shifted, 2, u, p, n, 0.1)[0]
+            numeric[index] = (plus - minus) / (2 * eps)
+
+        np.testing.assert_allclose(grad, numeric, rtol=1e-4, atol=1e-7)
+
+    def test_sampled_triplets_are_valid(self):
+        X = random_graph(40, 200, seed=2)
+        users = np.flatnonzero(np.diff(X.indptr))
+        u, p, n = sample_bpr_batch(X, users, 500, np.random.default_rng(3), pair_keys(X))
+
+        self.assertTrue(np.all(X[u, p].A1 > 0))
+        self.assertTrue(np.all(X[u, n].A1 == 0))
+        self.assertTrue(np.all(n != u))
+
+    def test_unresolved_negatives_are_dropped(self):
+        # Autor 0 coautor de todos: no tiene negativos válidos
+        X = build_csr(np.zeros(9, dtype=np.int64), np.arange(1, 10), 10).tocsr()
+        X.sort_indices()
+        u, p, n = sample_bpr_batch(X, np.array([0, 1]), 200, np.random.default_rng(4), pair_keys(X))
+
+        self.assertGreater(len(u), 0)
+        self.assertNotIn(0, u.tolist())
+        self.assertTrue(np.all(X[u, n].A1 == 0) and np.all(n != u))
+
+    def test_train_lightgcn_returns_propagated_embeddings(self):
+        X = random_graph(60, 300, seed=5)
+        with quiet():
+            result = train_lightgcn(X, embedding_dim=8, n_layers=2, epochs=3, batch_size=64, batches_per_epoch=5)
+
+        self.assertEqual(result['embeddings'].shape, (60, 8))
+        self.assertEqual(result['embeddings'].dtype, np.float32)
+        self.assertEqual(len(result['history']), 3)
+        self.assertTrue(np.all(np.isfinite(result['history'])))
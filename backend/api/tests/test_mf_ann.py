@@ -0,0 +1,45 @@
+import shutil
+import tempfile
+
+import numpy as np
+
+from api.tests.fixtures import LegacyModelTestCase, copy_legacy_files, quiet
+from recommender.artifacts import artifact_dir
+from recommender.matrix_factorization.ann import augment
+from recommender.matrix_factorization.load_data import export_artifact
+from recommender.matrix_factorization.queries import MFQueries
+
+
+class MFANNTests(LegacyModelTestCase):
+
+    def test_augmented_rows_preserve_inner_product_order(self):
+        U = MFQueries._load_legacy_files(self.files_dir)['U']
+        augmented = augment(U)
+        np.testing.assert_allclose(np.linalg.norm(augmented, axis=1), 1.0, atol=1e-5)
+
+        query = U[3] / np.linalg.norm(U[3])
+        cosine = augmented[:, :-1] @ query
+        np.testing.assert_array_equal(np.argsort(-cosine, kind='stable'), np.argsort(-(U @ U[3]), kind='stable'))
+
+    def test_probing_every_list_matches_exact_search(self):
+        files_dir = tempfile.mkdtemp(prefix='recommender-mf-ann-')
+        try:
+            copy_legacy_files(self.files_dir, files_dir)
+            with quiet():
+                export_artifact(files_dir, ann_lists=6)
+            MFQueries._cache = MFQueries._load_artifact(artifact_dir(files_dir, 'mf'))
+            n_lists = len(MFQueries._cache['ann_centroids'])
+
+            for author in self.cf_authors[::13]:
+                exact_ids, exact_scores = MFQueries.get_top_k(author, 10, approximate=False, precomputed=False)
+                ids, scores = MFQueries.get_top_k(
+                    author, 10, approximate=True, n_probe=n_lists, precomputed=False
+                )
+                np.testing.assert_array_equal(ids, exact_ids)
+                np.testing.assert_allclose(scores, exact_scores, atol=1e-6)
+
+                ids, _ = MFQueries.get_top_k(author, 10, approximate=True, n_probe=1, precomputed=False)
+                self.assertLessEqual(len(ids), 10)
+        finally:
+            shutil.rmtree(files_dir, ignore_errors=True)
+            self.reset_caches()
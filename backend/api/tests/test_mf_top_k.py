@@ -0,0 +1,43 @@
+from unittest import mock
+
+import numpy as np
+
+from api.tests.fixtures import LegacyModelTestCase
+from recommender.matrix_factorization.factors import FactorMatrix
+from recommender.matrix_factorization.queries import MFQueries
+
+
+class MFTopKTests(LegacyModelTestCase):
+
+    def setUp(self):
+        self.load_legacy()
+
+    def reference(self, U, author_idx):
+        """Producto interno denso sin el propio autor, Min-Max y orden completo."""
+        scores = U @ U[author_idx]
+        scores[author_idx] = -np.inf
+        valid = np.flatnonzero(np.isfinite(scores))
+        low, high = scores[valid].min(), scores[valid].max()
+        order = valid[np.argsort(-scores[valid], kind='stable')]
+        return {int(i): (scores[i] - low) / (high - low) for i in order}
+
+    def test_top_k_matches_full_sort(self):
+        U = MFQueries._cache['U']
+        with mock.patch.object(MFQueries, 'BLOCK_SIZE', 37):
+            for author_idx in range(0, len(self.cf_authors), 23):
+                reference = self.reference(U, author_idx)
+                for k in (1, 8, 40, None):
+                    ids, scores = MFQueries.get_top_k(self.cf_authors[author_idx], k, precomputed=False)
+                    self.assertSameRanking(ids, scores, reference, k or len(reference))
+
+    def test_quantized_factors_keep_the_ranking(self):
+        U = np.asarray(MFQueries._cache['U'], dtype=np.float32)
+        with mock.patch.object(MFQueries, 'BLOCK_SIZE', 37):
+            for factor_dtype, tolerance in (('float32', 1e-6), ('float16', 1e-2), ('int8', 5e-2)):
+                MFQueries._cache['U'] = FactorMatrix.from_dense(U, factor_dtype)
+                for author_idx in range(0, len(self.cf_authors), 23):
+                    reference = self.reference(U, author_idx)
+                    ids, scores = MFQueries.get_top_k(self.cf_authors[author_idx], 10, precomputed=False)
+                    # Scores cercanos a los exactos de los mismos autores
+                    np.testing.assert_allclose(scores, [reference[i] for i in ids.tolist()], atol=tolerance)
+                    self.assertEqual(len(ids), 10)
@@ -0,0 +1,67 @@
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from api.tests.fixtures import quiet
+from recommender.ItemKNN.trainer import build_csr
+from recommender.matrix_factorization import training_test
+from recommender.matrix_factorization.training_test import grid_search, recommend_top_k, train_als
+
+
+def random_pairs(n_authors, n_pairs, seed):
+    rng = np.random.default_rng(seed)
+    pairs = np.unique(np.sort(rng.integers(0, n_authors, size=(n_pairs, 2)), axis=1), axis=0)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    return pairs[:, 0], pairs[:, 1]
+
+
+class MFTrainingTests(SimpleTestCase):
+
+    def test_recommend_top_k_matches_dense_scores(self):
+        rng = np.random.default_rng(0)
+        U = rng.standard_normal((50, 6)).astype(np.float32)
+        X_train = build_csr(*random_pairs(50, 120, seed=1), 50)
+        authors = np.arange(0, 50, 3)
+
+        scores = U[authors] @ U.T
+        scores[X_train[authors].nonzero()] = -np.inf
+        scores[np.arange(len(authors)), authors] = -np.inf
+
+        # Bloque de 7 filas por el presupuesto de memoria y bloque explícito
+        with mock.patch.object(training_test, 'SCORE_BLOCK_BYTES', 7 * 50 * 4):
+            budget = recommend_top_k(U, X_train, authors, k=5)
+        explicit = recommend_top_k(U, X_train, authors, k=5, batch_size=len(authors))
+
+        for indptr, ids in (budget, explicit):
+            np.testing.assert_array_equal(indptr, np.arange(0, 5 * len(authors) + 1, 5))
+            top = ids.reshape(len(authors), 5)
+            np.testing.assert_allclose(
+                np.take_along_axis(scores, top, axis=1), -np.sort(-scores, axis=1)[:, :5], rtol=1e-6
+            )
+
+    def test_grid_search_reports_each_config(self):
+        f_min, f_max = random_pairs(80, 400, seed=2)
+        X_train = build_csr(f_min[::2], f_max[::2], 80)
+        X_val = build_csr(f_min[1::2], f_max[1::2], 80)
+        val_sample = np.flatnonzero(np.diff(X_val.indptr))
+
+        with quiet():
+            grid = grid_search(
+                X_train, X_val, val_sample, factors_list=(4,), reg_list=(0.1,),
+                iterations=2, K=5, num_threads=1, n_jobs=1
+            )
+
+        self.assertEqual(len(grid), 1)
+        row = grid[0]
+        self.assertEqual((row['factors'], row['reg'], row['alpha']), (4, 0.1, 40.0))
+        self.assertGreaterEqual(row['ndcg'], 0.0)
+        self.assertLessEqual(row['recall'], 1.0)
+        self.assertGreater(row['max_rss_mb'], 0)
+
+    def test_train_als_factors_are_normalized(self):
+        X = build_csr(*random_pairs(60, 300, seed=3), 60)
+        U = train_als(X, factors=4, reg=0.1, alpha=10.0, iterations=2, num_threads=1)
+        self.assertEqual(U.shape, (60, 4))
+        self.assertEqual(U.dtype, np.float32)
+        np.testing.assert_allclose(np.linalg.norm(U, axis=1), 1.0, rtol=1e-5)
@@ -0,0 +1,55 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import load_npz
+
+from api.tests.fixtures import LegacyModelTestCase, coauthorship_source, quiet, random_coauthorships
+from recommender.ItemKNN.load_data import build_author_knn_data
+from recommender.ItemKNN.out_of_core import build_author_graph_out_of_core
+
+
+class OutOfCoreGraphTests(LegacyModelTestCase):
+
+    def test_out_of_core_build_matches_in_memory_build(self):
+        source = coauthorship_source(random_coauthorships(4000, 500, seed=1))
+        in_memory = tempfile.mkdtemp(prefix='recommender-knn-data-')
+        out_of_core = tempfile.mkdtemp(prefix='recommender-knn-ooc-')
+        try:
+            with quiet():
+                build_author_knn_data(in_memory, source=source, chunk_size=900)
+                build_author_graph_out_of_core(out_of_core, source=source, chunk_size=700, n_partitions=5)
+
+            R = load_npz(os.path.join(in_memory, 'author_author_matrix.npz'))
+            R_ooc = load_npz(os.path.join(out_of_core, 'author_author_matrix.npz'))
+            self.assertEqual(R.shape, R_ooc.shape)
+            np.testing.assert_array_equal(R.indptr, R_ooc.indptr)
+            np.testing.assert_array_equal(R.indices, R_ooc.indices)
+            np.testing.assert_allclose(R.data, R_ooc.data, rtol=1e-6)
+
+            idx_to_author = np.load(os.path.join(in_memory, 'idx_to_author.npy'), allow_pickle=True).item()
+            author_ids = np.load(os.path.join(out_of_core, 'author_ids.npy'))
+            self.assertEqual(
+                [a.decode('utf-8') for a in author_ids], [idx_to_author[i] for i in range(len(idx_to_author))]
+            )
+
+            # Mismos pares únicos (el orden depende de las particiones)
+            author_to_idx = {a: i for i, a in idx_to_author.items()}
+            pairs = pd.read_pickle(os.path.join(in_memory, 'df_pairs_unique.pkl'))
+            expected = sorted(
+                (author_to_idx[a], author_to_idx[b], c)
+                for a, b, c in zip(pairs['pair_min'], pairs['pair_max'], pairs['count'])
+            )
+            unique = np.load(os.path.join(out_of_core, 'pairs_unique.npz'))
+            got = sorted(zip(unique['pair_min'].tolist(), unique['pair_max'].tolist(), unique['count'].tolist()))
+            self.assertEqual(got, expected)
+
+            # Los bloques temporales se eliminan
+            self.assertEqual(
+                sorted(os.listdir(out_of_core)), ['author_author_matrix.npz', 'author_ids.npy', 'pairs_unique.npz']
+            )
+        finally:
+            shutil.rmtree(in_memory, ignore_errors=True)
+            shutil.rmtree(out_of_core, ignore_errors=True)
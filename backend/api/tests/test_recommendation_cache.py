@@ -0,0 +1,59 @@
+import shutil
+
+from api.recommendation_cache import canonical_key
+from api.tests.fixtures import LegacyModelTestCase, concept_key, quiet
+from recommender.artifacts import artifact_dir
+from recommender.authors import LEGACY_VERSION
+from recommender.content_based.queries import ContentBasedQueries
+from recommender.hybrid_recommender import HybridRecommender
+
+
+class RecommendationCacheKeyTests(LegacyModelTestCase):
+
+    def key(self, concepts, model_versions, **overrides):
+        params = dict(
+            concept_vector=concepts, author_id='A1', alpha=0.5, beta=0.5, country_code='CL',
+            order_by='sim', limit=20, model_versions=model_versions,
+        )
+        params.update(overrides)
+        return canonical_key(**params)
+
+    def test_key_ignores_concept_order_and_duplicates(self):
+        versions = [('content_based', 'v1')]
+        self.assertEqual(
+            self.key([{'id': 'C1'}, {'id': 'C2'}], versions),
+            self.key([{'id': 'C2'}, {'id': 'C1'}, {'id': 'C2'}], versions),
+        )
+
+    def test_key_includes_model_versions(self):
+        concepts = [{'id': 'C1'}]
+        base = self.key(concepts, [('content_based', 'v1'), ('itemknn', 'v1')])
+        self.assertNotEqual(base, self.key(concepts, [('content_based', 'v2'), ('itemknn', 'v1')]))
+        self.assertNotEqual(base, self.key(concepts, [('content_based', 'v1'), ('itemknn', 'v2')]))
+        self.assertNotEqual(
+            base,
+            self.key(concepts, [('content_based', 'v1'), ('itemknn', 'v1'), ('author_attributes', 'v1')])
+        )
+
+    def test_publishing_a_model_changes_the_key(self):
+        from recommender.content_based.vector_builder import export_artifact
+
+        self.load_legacy()
+        query = [{'id': concept_key(1)}]
+        versions = HybridRecommender.model_versions(query, self.cf_authors[0])
+        self.assertEqual(versions, [('content_based', LEGACY_VERSION), ('itemknn', LEGACY_VERSION)])
+        before = self.key(query, versions)
+
+        root = artifact_dir(self.files_dir, 'content_based')
+        try:
+            with quiet():
+                version = export_artifact(self.files_dir)
+            # Forzar la revisión de CURRENT
+            ContentBasedQueries._last_version_check = 0.0
+            versions = HybridRecommender.model_versions(query, self.cf_authors[0])
+            self.assertEqual(versions[0], ('content_based', version))
+            self.assertNotEqual(before, self.key(query, versions))
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+            shutil.rmtree(artifact_dir(self.files_dir, 'authors'), ignore_errors=True)
+            self.reset_caches()
@@ -0,0 +1,51 @@
+import numpy as np
+
+from api.tests.fixtures import LegacyModelTestCase, random_queries
+from recommender.authors import AuthorDictionary
+from recommender.content_based.queries import ContentBasedQueries
+from recommender.hybrid_recommender import HybridRecommender
+from recommender.ItemKNN.queries import ItemKNNQueries
+
+
+class ThresholdFusionTests(LegacyModelTestCase):
+
+    def setUp(self):
+        self.load_legacy()
+
+    def full_reference(self, query, author, alpha, beta, allowed=None):
+        ids, hybrid, cb, cf = HybridRecommender.get_top_k(
+            query, author, k=None, alpha=alpha, beta=beta, fusion='full', allowed=allowed
+        )
+        return (
+            dict(zip(ids.tolist(), hybrid.tolist())),
+            dict(zip(ids.tolist(), cb.tolist())),
+            dict(zip(ids.tolist(), cf.tolist())),
+        )
+
+    def test_threshold_fusion_matches_full_fusion(self):
+        queries = random_queries(8, seed=11)
+        for query, author in zip(queries, self.cf_authors[::25]):
+            for alpha, beta in ((0.5, 0.5), (0.8, 0.2), (0.0, 1.0)):
+                hybrid_ref, cb_ref, cf_ref = self.full_reference(query, author, alpha, beta)
+                for k in (1, 10, 40):
+                    ids, hybrid, cb, cf = HybridRecommender.get_top_k(
+                        query, author, k=k, alpha=alpha, beta=beta, fusion='threshold'
+                    )
+                    self.assertSameRanking(ids, hybrid, hybrid_ref, k)
+                    for global_id, cb_score, cf_score in zip(ids.tolist(), cb, cf):
+                        self.assertAlmostEqual(cb_ref[global_id], cb_score, delta=1e-6)
+                        self.assertAlmostEqual(cf_ref[global_id], cf_score, delta=1e-6)
+
+    def test_threshold_fusion_with_filter(self):
+        ContentBasedQueries.global_ids()
+        ItemKNNQueries.global_ids()
+        allowed = np.random.default_rng(5).random(AuthorDictionary.size()) < 0.4
+        query = random_queries(1, seed=2)[0]
+        author = self.cf_authors[3]
+
+        hybrid_ref, _, _ = self.full_reference(query, author, 0.5, 0.5, allowed)
+        self.assertTrue(all(allowed[i] for i in hybrid_ref))
+        ids, hybrid, _, _ = HybridRecommender.get_top_k(
+            query, author, k=10, fusion='threshold', allowed=allowed
+        )
+        self.assertSameRanking(ids, hybrid, hybrid_ref, 10)
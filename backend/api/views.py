@@ -4,11 +4,14 @@ from django.shortcuts import render
 from rest_framework import viewsets, generics, status
 from .models import Author, MvIaConcept, MvLatamAuthor, Institution, Work, MvLatamIaAuthorConcept, Concept, MvRecommendationAuthorPool, WorkAuthorship
 from .serializers import AuthorSerializer, RecommendationListSerializer, GetRecommendationsRequestSerializer, MvIaConceptSerializer, AuthorsAutocompleteSerializer, InstitutionSerializer, WorkSerializer
+from recommender.authors import AuthorDictionary
+from recommender.author_attributes import AuthorAttributes
 from recommender.hybrid_recommender import HybridRecommender
 from rest_framework.views import APIView
 from rest_framework.response import Response
 import math
 from recommender.content_based.queries import ContentBasedQueries
+from .recommendation_cache import canonical_key, get_recommendation_cache
 
 from django.db.models import Q, Subquery
 from django.db.models import Func, Value
@@ -186,10 +189,36 @@ class RecommendationViewSet(APIView):
         limit = validated_data.get('limit', 50)
         country_code = validated_data.get('country_code', '')
         order_by = validated_data.get('order_by', 'sim')
+        filters = {
+            'institution_type': validated_data.get('institution_type', ''),
+            'min_works_count': validated_data.get('min_works_count'),
+            'min_cited_by_count': validated_data.get('min_cited_by_count'),
+        }
+
+        # Máscara de autores permitidos (None si no hay filtros): se aplica
+        # dentro de cada motor antes del top-k. Sin artefacto de atributos
+        # los filtros se aplican después en la base de datos
+        allowed = AuthorAttributes.mask(country_code=country_code, **filters)
+        post_filter = allowed is None and AuthorAttributes.active_filters(country_code, **filters) is not None
+        model_versions = HybridRecommender.model_versions(user_input=concept_vector, author_id=author_id)
+        if allowed is not None:
+            model_versions.append(('author_attributes', AuthorAttributes.model_version()))
+
+        # -------------------------
+        # CACHE DE RESULTADOS
+        # -------------------------
+        # La clave incluye la versión de los modelos: al publicar nuevos
+        # artefactos las entradas anteriores dejan de usarse
+        cache_key = canonical_key(
+            concept_vector, author_id, alpha, beta, country_code, order_by, limit,
+            model_versions, filters
+        )
+        cached = get_recommendation_cache().get(cache_key)
+        if cached is not None:
+            return Response(cached, status=status.HTTP_200_OK)
 
         # Inicializar cache CB
-        ContentBasedQueries._initialize_cache()
-        concept_to_index = ContentBasedQueries._cache['concept_to_index']
+        concept_to_index = ContentBasedQueries.snapshot()['concept_to_index']
 
         # -------------------------
         # IDs semánticos relevantes
@@ -204,24 +233,36 @@ class RecommendationViewSet(APIView):
             "https://openalex.org/C28490314",   # Speech Recognition
         }
 
-        # Si hay filtro por país, traemos más candidatos primero
-        candidate_limit = 20000 if country_code else limit
+        # Si los filtros van en la BD, traemos más candidatos primero
+        candidate_limit = 20000 if post_filter else limit
 
-        # Recomendaciones híbridas
-        recommendations = HybridRecommender().get_recommendations(
+        # Recomendaciones híbridas (ids int32 del diccionario global), ya
+        # restringidas a los autores que pasan los filtros
+        ids, hybrid_scores, cb_scores, cf_scores, degraded = HybridRecommender.get_top_k(
             user_input=concept_vector,
             author_id=author_id,
             alpha=alpha,
             beta=beta,
-            k=candidate_limit
+            k=candidate_limit,
+            return_degraded=True,
+            allowed=allowed
         )
 
-        if not recommendations:
+        # Una respuesta sin la rama CF (timeout) no se guarda en el cache
+        if degraded:
+            cache_key = None
+
+        if len(ids) == 0:
             response_data = {'total_recommendations': 0, 'recommendations': []}
-            return Response(
-                RecommendationListSerializer(response_data).data,
-                status=status.HTTP_200_OK
-            )
+            return self._respond(response_data, cache_key)
+
+        # Los strings solo se decodifican para las filas retornadas
+        recommendations = list(zip(
+            AuthorDictionary.keys_at(ids),
+            hybrid_scores.tolist(),
+            cb_scores.tolist(),
+            cf_scores.tolist()
+        ))
 
         # Extraer scores
         top_author_ids = [aid for aid, _, _, _ in recommendations]
@@ -230,15 +271,19 @@ class RecommendationViewSet(APIView):
         cf_scores_dict = {aid: cf for aid, _, _, cf in recommendations}
 
         # -------------------------
-        # FILTRO POR PAÍS
+        # FILTROS EN LA BD (sin artefacto de atributos)
         # -------------------------
-        if country_code:
-            valid_author_ids = set(
-                MvLatamAuthor.objects.filter(
-                    id__in=top_author_ids,
-                    country_code=country_code
-                ).values_list('id', flat=True)
-            )
+        if post_filter:
+            valid_authors = MvLatamAuthor.objects.filter(id__in=top_author_ids)
+            if country_code:
+                valid_authors = valid_authors.filter(country_code=country_code)
+            if filters['institution_type']:
+                valid_authors = valid_authors.filter(last_known_institution__type=filters['institution_type'])
+            if filters['min_works_count'] is not None:
+                valid_authors = valid_authors.filter(works_count__gte=filters['min_works_count'])
+            if filters['min_cited_by_count'] is not None:
+                valid_authors = valid_authors.filter(cited_by_count__gte=filters['min_cited_by_count'])
+            valid_author_ids = set(valid_authors.values_list('id', flat=True))
 
             recommendations = [
                 (aid, s, cb, cf)
@@ -248,13 +293,9 @@ class RecommendationViewSet(APIView):
 
             if not recommendations:
                 response_data = {'total_recommendations': 0, 'recommendations': []}
-                return Response(
-                    RecommendationListSerializer(response_data).data,
-                    status=status.HTTP_200_OK
-                )
+                return self._respond(response_data, cache_key)
 
-        # Actualizar ids
-        top_author_ids = [aid for aid, _, _, _ in recommendations]
+            top_author_ids = [aid for aid, _, _, _ in recommendations]
 
         # -------------------------
         # QUERY AUTORES
@@ -404,10 +445,15 @@ class RecommendationViewSet(APIView):
             "recommendations": author_data
         }
 
-        return Response(
-            RecommendationListSerializer(response_data).data,
-            status=status.HTTP_200_OK
-        )
+        return self._respond(response_data, cache_key)
+
+    @staticmethod
+    def _respond(response_data, cache_key):
+        """Serializa la respuesta y la guarda en el cache de resultados."""
+        data = RecommendationListSerializer(response_data).data
+        if cache_key is not None:
+            get_recommendation_cache().set(cache_key, data)
+        return Response(data, status=status.HTTP_200_OK)
 
 class AuthorConceptsView(APIView):
     """
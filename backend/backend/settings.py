@@ -103,6 +103,17 @@ DATABASES = {
     }
 }
 
+# Cache de resultados de recomendación (api/recommendation_cache.py)
+# SHARED_ALIAS apunta a un alias de CACHES para compartir resultados entre
+# workers (ej. FileBasedCache o Redis); None usa solo el LRU del proceso.
+
+RECOMMENDATION_CACHE = {
+    'ENABLED': True,
+    'MAX_ENTRIES': 1024,
+    'SHARED_ALIAS': None,
+    'TIMEOUT': 3600,
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
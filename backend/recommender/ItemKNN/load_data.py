@@ -1,19 +1,55 @@
 import os
+from itertools import islice
 import numpy as np
 import pandas as pd
-from scipy.sparse import csr_matrix, save_npz
-from math import log1p
+from scipy.sparse import csr_matrix, load_npz, save_npz
 from api.models import MvIaCoauthorshipLatam
+from recommender.artifacts import ArtifactWriter, StringTable, artifact_dir
+from recommender.authors import register_authors
+from recommender.ItemKNN.queries import ARTIFACT_NAME
+from recommender.ItemKNN.neighbours import build_neighbour_lists, load_similarity
+
+
+def iter_coauthorships(source=MvIaCoauthorshipLatam, chunk_size=100000):
+    """
+    Recorre la vista de coautorías por bloques con un cursor del lado del
+    servidor.
+
+    Yields:
+        Tuplas (coauthor_1, coauthor_2, shared_works) de arreglos NumPy:
+        IDs como bytes de ancho fijo (dtype S) y shared_works int64
+        (NULL -> 0).
+    """
+    rows = source.objects.values_list(
+        "coauthor_1", "coauthor_2", "shared_works"
+    ).iterator(chunk_size=chunk_size)
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        first, second, shared = zip(*chunk)
+        yield (
+            StringTable.encode(first),
+            StringTable.encode(second),
+            np.fromiter((cnt or 0 for cnt in shared), dtype=np.int64, count=len(shared)),
+        )
 
 
 def build_author_knn_data(
     output_dir,
-    use_log_weight=True
+    use_log_weight=True,
+    source=MvIaCoauthorshipLatam,
+    chunk_size=100000
 ):
     """
     Construye matriz sparse autor × autor + pares únicos
     para ItemKNN (implicit)
 
+    Los pares se leen por bloques como arreglos NumPy y la matriz se arma
+    con operaciones vectorizadas, por lo que la memoria escala con el
+    número de pares y no con objetos de Python por par.
+
     Parámetros
     ----------
     output_dir : str
@@ -21,6 +57,11 @@ def build_author_knn_data(
     use_log_weight : bool
         Si True: w = log(1 + shared_works)
         Si False: w = shared_works
+    source : modelo Django
+        Vista de coautorías (MvIaCoauthorshipLatam o MvIaCoauthorship
+        para la vista global)
+    chunk_size : int
+        Filas por bloque del cursor
     """
 
     os.makedirs(output_dir, exist_ok=True)
@@ -32,43 +73,35 @@ def build_author_knn_data(
     # --------------------------------------------------------
     # 1) Cargar datos desde la BD
     # --------------------------------------------------------
-    print("🔹 Cargando datos desde la BD...")
-
-    qs = MvIaCoauthorshipLatam.objects.all().values(
-        "coauthor_1",
-        "coauthor_2",
-        "shared_works"
-    )
-
-    all_authors = set()
-    rows, cols, data = [], [], []
-    pairs_for_df = []
-
-    for row in qs:
-        a = str(row["coauthor_1"])
-        b = str(row["coauthor_2"])
-
-        if a == b:
-            continue
-
-        cnt = row["shared_works"] or 0
-        w = log1p(cnt) if use_log_weight else float(cnt)
-
-        all_authors.add(a)
-        all_authors.add(b)
-
-        pairs_for_df.append({
-            "pair_min": min(a, b),
-            "pair_max": max(a, b),
-            "count": float(cnt)
-        })
+    print(f"🔹 Cargando datos desde la BD ({source._meta.db_table})...")
+
+    first_chunks, second_chunks, count_chunks = [], [], []
+    n_rows = 0
+    for first, second, shared in iter_coauthorships(source, chunk_size=chunk_size):
+        keep = first != second
+        first_chunks.append(first[keep])
+        second_chunks.append(second[keep])
+        count_chunks.append(shared[keep])
+        n_rows += len(first)
+        print(f"  Leídas {n_rows:,} filas...")
+
+    first = np.concatenate(first_chunks) if first_chunks else np.empty(0, dtype="S1")
+    second = np.concatenate(second_chunks) if second_chunks else np.empty(0, dtype="S1")
+    counts = np.concatenate(count_chunks).astype(float) if count_chunks else np.empty(0)
+    del first_chunks, second_chunks, count_chunks
+    n_pairs = len(first)
 
     # --------------------------------------------------------
-    # 2) Crear mapping CONSISTENTE
+    # 2) Crear mapping CONSISTENTE (autores ordenados)
     # --------------------------------------------------------
-    author_list = sorted(all_authors)
-    author_to_idx = {a: i for i, a in enumerate(author_list)}
-    idx_to_author = {i: a for i, a in enumerate(author_list)}
+    authors, inverse = np.unique(np.concatenate([first, second]), return_inverse=True)
+    del first, second
+    i, j = inverse[:n_pairs], inverse[n_pairs:]
+    del inverse
+
+    author_list = [a.decode("utf-8") for a in authors]
+    author_to_idx = {a: idx for idx, a in enumerate(author_list)}
+    idx_to_author = {idx: a for idx, a in enumerate(author_list)}
 
     n = len(author_list)
     print(f"Autores únicos: {n:,}")
@@ -78,24 +111,14 @@ def build_author_knn_data(
     # --------------------------------------------------------
     print("🔹 Construyendo matriz sparse...")
 
-    for p in pairs_for_df:
-        i = author_to_idx[p["pair_min"]]
-        j = author_to_idx[p["pair_max"]]
-
-        w = log1p(p["count"]) if use_log_weight else p["count"]
-
-        rows.append(i)
-        cols.append(j)
-        data.append(w)
-
-        rows.append(j)
-        cols.append(i)
-        data.append(w)
+    pair_min, pair_max = np.minimum(i, j), np.maximum(i, j)
+    w = (np.log1p(counts) if use_log_weight else counts).astype(np.float32)
 
+    # Cada par aporta (min, max) y (max, min); los duplicados se suman
     R = csr_matrix(
-        (np.array(data, dtype=np.float32),
-         (np.array(rows, dtype=np.int32),
-          np.array(cols, dtype=np.int32))),
+        (np.repeat(w, 2),
+         (np.column_stack([pair_min, pair_max]).ravel().astype(np.int32),
+          np.column_stack([pair_max, pair_min]).ravel().astype(np.int32))),
         shape=(n, n)
     )
 
@@ -108,11 +131,16 @@ def build_author_knn_data(
     # --------------------------------------------------------
     # 4) DataFrame de pares únicos (GROUND TRUTH)
     # --------------------------------------------------------
-    df_pairs_unique = (
-        pd.DataFrame(pairs_for_df)
-        .drop_duplicates(subset=["pair_min", "pair_max"])
-        .reset_index(drop=True)
-    )
+    # Primera aparición de cada par, en el orden de lectura
+    _, first_seen = np.unique(pair_min.astype(np.int64) * n + pair_max, return_index=True)
+    first_seen = np.sort(first_seen)
+
+    author_names = np.array(author_list, dtype=object)
+    df_pairs_unique = pd.DataFrame({
+        "pair_min": author_names[pair_min[first_seen]],
+        "pair_max": author_names[pair_max[first_seen]],
+        "count": counts[first_seen],
+    })
 
     print(f"Pares únicos: {len(df_pairs_unique):,}")
 
@@ -148,4 +176,47 @@ def build_author_knn_data(
     print("  - author_to_idx.npy")
     print("  - idx_to_author.npy")
     print("  - df_pairs_unique.pkl")
-    print("==============================================\n")
\ No newline at end of file
+    print("==============================================\n")
+
+
+def export_artifact(files_dir, top_m=200, n_jobs=None):
+    """
+    Convierte los archivos de producción de ItemKNN (idx_to_author.npy o
+    author_ids.npy, X_full.npz, itemknn_best.npz) al formato de artefacto
+    versionado.
+
+    itemknn_best.npz se lee directamente con NumPy (formato de
+    ItemItemRecommender.save), sin importar implicit. Con top_m se
+    materializan además las listas de vecinos de cada autor (ver
+    ItemKNN/neighbours.py), calculadas en n_jobs procesos (None = todos
+    los núcleos); top_m=None las omite.
+    """
+    mapping_path = os.path.join(files_dir, "idx_to_author.npy")
+    if os.path.exists(mapping_path):
+        idx_to_author = np.load(mapping_path, allow_pickle=True).item()
+        author_ids = [idx_to_author[i] for i in range(len(idx_to_author))]
+    else:
+        # Vocabulario de build_author_graph_out_of_core (dtype S)
+        author_ids = [a.decode("utf-8") for a in np.load(os.path.join(files_dir, "author_ids.npy"))]
+    X_full = load_npz(os.path.join(files_dir, "X_full.npz")).tocsr()
+    similarity, K = load_similarity(os.path.join(files_dir, "itemknn_best.npz"))
+
+    writer = ArtifactWriter(artifact_dir(files_dir, ARTIFACT_NAME))
+    writer.add_strings("author_ids", author_ids)
+    writer.add_array("author_global_ids", register_authors(files_dir, author_ids))
+    writer.add_csr("X_full", X_full)
+    writer.add_csr("similarity", similarity)
+
+    if top_m:
+        for name, array in build_neighbour_lists(
+            X_full, similarity, top_m=top_m, n_jobs=n_jobs, work_dir=files_dir
+        ).items():
+            writer.add_array(name, array)
+
+    writer.set_meta(
+        K=K, n_authors=len(author_ids), nnz=int(similarity.nnz), neighbour_top_m=top_m
+    )
+    version = writer.commit()
+
+    print(f"Artefacto ItemKNN exportado: versión {version}")
+    return version
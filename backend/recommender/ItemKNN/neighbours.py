@@ -0,0 +1,157 @@
+"""
+Listas de vecinos precalculadas para ItemKNN.
+
+La similitud entre autores solo cambia al reconstruir los modelos, por lo
+que los scores colaborativos de cada autor (X_full[autor] @ similarity) se
+materializan offline. Para cada autor se guardan sus top_m recomendados
+ordenados por score en arreglos tipo CSR:
+
+    neighbour_indptr  (n_autores + 1,)  inicio de la fila de cada autor
+    neighbour_ids     (nnz,)            índices de autor recomendados
+    neighbour_scores  (nnz,)            score colaborativo
+    neighbour_min / neighbour_max       estadísticas Min-Max sobre TODOS
+                                        los autores alcanzados (no solo top_m)
+
+Los bloques de autores se pueden repartir en un pool de procesos
+(build_neighbour_lists(..., n_jobs=N)). Este módulo no depende de
+implicit ni de Django.
+"""
+
+import os
+import time
+import numpy as np
+from scipy.sparse import csr_matrix
+from recommender.batch_topk import assemble_rows, open_shared, run_blocks, shared_arrays
+
+# Matrices del worker (las fija _init_worker o build_neighbour_lists)
+_worker = None
+
+
+def load_similarity(path):
+    """
+    Lee la matriz de similitud de un modelo guardado con
+    ItemItemRecommender.save (itemknn_best.npz) usando solo NumPy.
+
+    Returns:
+        Tupla (similarity, K)
+    """
+    with np.load(path, allow_pickle=False) as data:
+        similarity = csr_matrix(
+            (data["data"], data["indices"], data["indptr"]),
+            shape=tuple(data["shape"])
+        )
+        K = int(data["K"])
+    return similarity, K
+
+
+def score_block(X_block, similarity):
+    """
+    Scores colaborativos de un bloque de autores (equivalente a
+    CosineRecommender.recommend con N = todos).
+
+    Los coautores ya conocidos quedan con score 0, igual que en implicit.
+
+    Returns:
+        CSR (filas = autores del bloque) con índices ordenados
+    """
+    scores = (X_block @ similarity).tocsr()
+    scores.sort_indices()
+    scores.data = scores.data.astype(np.float32)
+
+    # Marcar las entradas (autor, coautor ya conocido)
+    n_cols = np.int64(scores.shape[1])
+    score_rows = np.repeat(np.arange(scores.shape[0], dtype=np.int64), np.diff(scores.indptr))
+    liked_rows = np.repeat(np.arange(X_block.shape[0], dtype=np.int64), np.diff(X_block.indptr))
+    liked = np.isin(score_rows * n_cols + scores.indices, liked_rows * n_cols + X_block.indices)
+    scores.data[liked] = 0.0
+    return scores
+
+
+def _neighbour_block(lo, hi, top_m):
+    """
+    Top-top_m de las filas [lo, hi) con el mínimo y máximo de cada fila
+    sobre todos los autores alcanzados.
+
+    Returns:
+        Tupla (lengths, ids, scores, row_min, row_max)
+    """
+    scores = score_block(_worker["X_full"][lo:hi], _worker["similarity"])
+
+    lengths = np.diff(scores.indptr)
+    rows = np.repeat(np.arange(hi - lo), lengths)
+    row_min = np.zeros(hi - lo, dtype=np.float32)
+    row_max = np.zeros(hi - lo, dtype=np.float32)
+    non_empty = lengths > 0
+    if non_empty.any():
+        starts = scores.indptr[:-1][non_empty]
+        row_min[non_empty] = np.minimum.reduceat(scores.data, starts)
+        row_max[non_empty] = np.maximum.reduceat(scores.data, starts)
+
+    # Orden dentro de cada fila: score descendente, índice ascendente
+    order = np.lexsort((scores.indices, -scores.data, rows))
+    rank_in_row = np.arange(len(order)) - np.repeat(scores.indptr[:-1], lengths)
+    keep = order[rank_in_row < top_m]
+
+    return (
+        np.minimum(lengths, top_m),
+        scores.indices[keep].astype(np.int32),
+        scores.data[keep],
+        row_min,
+        row_max,
+    )
+
+
+def _init_worker(work_dir):
+    """Abre vía mmap X_full y la similitud que escribió el proceso principal."""
+    global _worker
+
+    def open_csr(name):
+        return csr_matrix(
+            tuple(open_shared(work_dir, f"{name}.{part}") for part in ("data", "indices", "indptr")),
+            shape=tuple(open_shared(work_dir, f"{name}.shape")),
+            copy=False
+        )
+
+    _worker = {"X_full": open_csr("X_full"), "similarity": open_csr("similarity")}
+
+
+def build_neighbour_lists(X_full, similarity, top_m=200, block_size=10000, n_jobs=1, work_dir=None):
+    """
+    Materializa los top_m autores recomendados de cada autor.
+
+    Con n_jobs > 1 (None = todos los núcleos) los bloques de filas se
+    reparten en un pool de procesos que abre X_full y la similitud vía
+    mmap desde work_dir (ver recommender/batch_topk.py).
+
+    Returns:
+        Dict nombre -> arreglo (neighbour_indptr, neighbour_ids,
+        neighbour_scores, neighbour_min, neighbour_max)
+    """
+    global _worker
+    start_time = time.time()
+    X_full = X_full.tocsr()
+    similarity = similarity.tocsr()
+    n_authors = X_full.shape[0]
+    n_jobs = n_jobs or os.cpu_count() or 1
+
+    if n_jobs == 1:
+        _worker = {"X_full": X_full, "similarity": similarity}
+        results = run_blocks(_neighbour_block, n_authors, top_m, block_size, label="Vecinos ItemKNN")
+    else:
+        arrays = {}
+        for name, matrix in (("X_full", X_full), ("similarity", similarity)):
+            for part in ("data", "indices", "indptr"):
+                arrays[f"{name}.{part}"] = getattr(matrix, part)
+            arrays[f"{name}.shape"] = np.array(matrix.shape)
+        with shared_arrays(arrays, work_dir, prefix="itemknn_neighbours_") as tmp_dir:
+            results = run_blocks(
+                _neighbour_block, n_authors, top_m, block_size, n_jobs=n_jobs,
+                initializer=_init_worker, initargs=(tmp_dir,), label="Vecinos ItemKNN"
+            )
+
+    neighbours = assemble_rows(results, n_authors)
+    print(
+        f"Listas de vecinos: top-{top_m}, {neighbours['neighbour_indptr'][-1]:,} entradas "
+        f"en {time.time() - start_time:.1f}s"
+    )
+    return neighbours
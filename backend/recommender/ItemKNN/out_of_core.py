@@ -0,0 +1,296 @@
+"""
+Construcción out-of-core del grafo de coautoría para la vista global
+(MvIaCoauthorship), que no cabe en memoria como lista de pares.
+
+Etapas:
+    1. Se leen los pares por bloques desde Postgres; cada bloque se guarda
+       en disco (IDs como bytes de ancho fijo) y su vocabulario se mezcla
+       con el vocabulario global ordenado.
+    2. Cada bloque se traduce a índices (searchsorted sobre el vocabulario)
+       y sus entradas COO (ambas direcciones) y sus pares (pair_min,
+       pair_max, count) se agregan a archivos binarios por partición de
+       filas (los pares según la partición de pair_min).
+    3. Cada partición se convierte a CSR (sumando duplicados) y se escribe
+       a continuación de las anteriores en la matriz final; sus pares se
+       deduplican y se agregan a los pares únicos.
+
+En memoria solo viven el vocabulario, un bloque de pares y una partición
+de filas. Al final de cada etapa se reporta el peak de memoria (RSS).
+
+Archivos generados en output_dir:
+    author_author_matrix.npz  matriz simétrica autor × autor (como
+                              build_author_knn_data)
+    author_ids.npy            vocabulario ordenado (dtype S): fila -> autor
+    pairs_unique.npz          pares únicos (pair_min, pair_max, count) como
+                              índices del vocabulario, ordenados por
+                              partición y, dentro de ella, por primera
+                              aparición
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from scipy.sparse import csr_matrix, save_npz
+from api.models import MvIaCoauthorship
+from recommender.ItemKNN.load_data import iter_coauthorships
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_memory_mb():
+    """Peak de memoria residente del proceso en MB (None si no está disponible)."""
+    if resource is None:
+        return None
+    # ru_maxrss está en KB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _report(stage, start_time):
+    peak = peak_memory_mb()
+    peak_text = f", peak RSS {peak:,.0f} MB" if peak is not None else ""
+    print(f"  {stage}: {time.time() - start_time:.1f}s{peak_text}")
+
+
+def _merge_vocabulary(vocabulary, pending):
+    """Une el vocabulario ordenado con los vocabularios de bloque pendientes."""
+    widest = max(a.dtype.itemsize for a in [vocabulary] + pending)
+    return np.unique(np.concatenate(
+        [a.astype(f"S{widest}") for a in [vocabulary] + pending]
+    ))
+
+
+def _open_binary(path, dtype, length):
+    """Arreglo vía mmap de un archivo binario (vacío si length es 0)."""
+    if length == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(length,))
+
+
+def build_author_graph_out_of_core(
+    output_dir,
+    source=MvIaCoauthorship,
+    use_log_weight=True,
+    chunk_size=1000000,
+    n_partitions=16,
+    work_dir=None
+):
+    """
+    Construye la matriz autor × autor de ItemKNN sin cargar todos los pares
+    en memoria (ver docstring del módulo).
+
+    Parámetros
+    ----------
+    output_dir : str
+        Carpeta donde se guardan los archivos
+    source : modelo Django
+        Vista de coautorías (por defecto la global, MvIaCoauthorship)
+    use_log_weight : bool
+        Si True: w = log(1 + shared_works)
+        Si False: w = shared_works
+    chunk_size : int
+        Pares por bloque leído desde la BD
+    n_partitions : int
+        Particiones de filas para la etapa de merge
+    work_dir : str
+        Carpeta para los bloques temporales (por defecto un tempdir dentro
+        de output_dir, que se elimina al terminar)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    own_work_dir = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix=".coauthorship-", dir=output_dir)
+    os.makedirs(work_dir, exist_ok=True)
+
+    print("==============================================")
+    print(f"📌 Grafo de coautoría out-of-core ({source._meta.db_table})")
+    print("==============================================\n")
+
+    try:
+        # --------------------------------------------------------
+        # 1) Bloques de pares a disco + vocabulario global
+        # --------------------------------------------------------
+        start_time = time.time()
+        print("🔹 Etapa 1/3: Leyendo pares desde la BD...")
+        vocabulary = np.empty(0, dtype="S1")
+        pending, pending_size = [], 0
+        n_blocks, n_rows = 0, 0
+
+        for first, second, shared in iter_coauthorships(source, chunk_size=chunk_size):
+            keep = first != second
+            np.save(os.path.join(work_dir, f"block-{n_blocks:06d}-first.npy"), first[keep])
+            np.save(os.path.join(work_dir, f"block-{n_blocks:06d}-second.npy"), second[keep])
+            np.save(os.path.join(work_dir, f"block-{n_blocks:06d}-count.npy"), shared[keep])
+
+            block_vocabulary = np.unique(np.concatenate([first[keep], second[keep]]))
+            pending.append(block_vocabulary)
+            pending_size += len(block_vocabulary)
+            # Se mezcla cuando lo pendiente supera al vocabulario (costo amortizado)
+            if pending_size > max(len(vocabulary), chunk_size):
+                vocabulary = _merge_vocabulary(vocabulary, pending)
+                pending, pending_size = [], 0
+
+            n_blocks += 1
+            n_rows += len(first)
+            print(f"  Leídas {n_rows:,} filas ({n_blocks} bloques)...")
+
+        if pending:
+            vocabulary = _merge_vocabulary(vocabulary, pending)
+        del pending
+
+        n = len(vocabulary)
+        print(f"Autores únicos: {n:,}")
+        _report("Etapa 1", start_time)
+
+        # --------------------------------------------------------
+        # 2) COO parciales por partición de filas
+        # --------------------------------------------------------
+        start_time = time.time()
+        print("🔹 Etapa 2/3: Escribiendo bloques COO por partición...")
+        n_partitions = max(1, min(n_partitions, n))
+        bounds = np.linspace(0, n, n_partitions + 1).astype(np.int64)
+        part_files = [
+            {
+                name: open(os.path.join(work_dir, f"part-{p:04d}.{name}"), "wb")
+                for name in ("rows", "cols", "data", "pmin", "pmax", "count")
+            }
+            for p in range(n_partitions)
+        ]
+
+        try:
+            for b in range(n_blocks):
+                prefix = os.path.join(work_dir, f"block-{b:06d}")
+                i = np.searchsorted(vocabulary, np.load(f"{prefix}-first.npy")).astype(np.int32)
+                j = np.searchsorted(vocabulary, np.load(f"{prefix}-second.npy")).astype(np.int32)
+                counts = np.load(f"{prefix}-count.npy").astype(float)
+                for suffix in ("first", "second", "count"):
+                    os.remove(f"{prefix}-{suffix}.npy")
+
+                pair_min, pair_max = np.minimum(i, j), np.maximum(i, j)
+
+                # Pares originales por partición de pair_min (orden de lectura)
+                pair_partition = np.searchsorted(bounds, pair_min, side="right") - 1
+                pair_order = np.argsort(pair_partition, kind="stable")
+                pair_offsets = np.searchsorted(pair_partition[pair_order], np.arange(n_partitions + 1))
+                for p in range(n_partitions):
+                    selected = pair_order[pair_offsets[p]:pair_offsets[p + 1]]
+                    pair_min[selected].tofile(part_files[p]["pmin"])
+                    pair_max[selected].tofile(part_files[p]["pmax"])
+                    counts[selected].tofile(part_files[p]["count"])
+
+                # Cada par aporta (min, max) y (max, min)
+                w = (np.log1p(counts) if use_log_weight else counts).astype(np.float32)
+                rows = np.column_stack([pair_min, pair_max]).ravel()
+                cols = np.column_stack([pair_max, pair_min]).ravel()
+                data = np.repeat(w, 2)
+
+                partition = np.searchsorted(bounds, rows, side="right") - 1
+                order = np.argsort(partition, kind="stable")
+                offsets = np.searchsorted(partition[order], np.arange(n_partitions + 1))
+                for p in range(n_partitions):
+                    selected = order[offsets[p]:offsets[p + 1]]
+                    rows[selected].tofile(part_files[p]["rows"])
+                    cols[selected].tofile(part_files[p]["cols"])
+                    data[selected].tofile(part_files[p]["data"])
+        finally:
+            for files in part_files:
+                for f in files.values():
+                    f.close()
+        _report("Etapa 2", start_time)
+
+        # --------------------------------------------------------
+        # 3) Merge de particiones en la CSR final
+        # --------------------------------------------------------
+        start_time = time.time()
+        print("🔹 Etapa 3/3: Mezclando particiones en la CSR final...")
+        row_lengths = np.zeros(n, dtype=np.int64)
+        indices_path = os.path.join(work_dir, "indices.bin")
+        data_path = os.path.join(work_dir, "data.bin")
+        pair_paths = {name: os.path.join(work_dir, f"pairs.{name}") for name in ("pmin", "pmax", "count")}
+        pair_files = {name: open(path, "wb") for name, path in pair_paths.items()}
+        n_pairs = 0
+
+        try:
+            with open(indices_path, "wb") as indices_file, open(data_path, "wb") as data_file:
+                for p in range(n_partitions):
+                    lo, hi = bounds[p], bounds[p + 1]
+                    prefix = os.path.join(work_dir, f"part-{p:04d}")
+                    rows = np.fromfile(f"{prefix}.rows", dtype=np.int32)
+                    cols = np.fromfile(f"{prefix}.cols", dtype=np.int32)
+                    data = np.fromfile(f"{prefix}.data", dtype=np.float32)
+                    for name in ("rows", "cols", "data"):
+                        os.remove(f"{prefix}.{name}")
+
+                    # La CSR de la partición suma los duplicados y ordena índices
+                    block = csr_matrix((data, (rows - lo, cols)), shape=(hi - lo, n))
+                    block.indices.astype(np.int32).tofile(indices_file)
+                    block.data.astype(np.float32).tofile(data_file)
+                    row_lengths[lo:hi] = np.diff(block.indptr)
+                    del rows, cols, data
+
+                    # Pares únicos de la partición (primera aparición)
+                    pair_min = np.fromfile(f"{prefix}.pmin", dtype=np.int32)
+                    pair_max = np.fromfile(f"{prefix}.pmax", dtype=np.int32)
+                    counts = np.fromfile(f"{prefix}.count", dtype=float)
+                    for name in ("pmin", "pmax", "count"):
+                        os.remove(f"{prefix}.{name}")
+                    _, first_seen = np.unique(pair_min.astype(np.int64) * n + pair_max, return_index=True)
+                    first_seen.sort()
+                    pair_min[first_seen].tofile(pair_files["pmin"])
+                    pair_max[first_seen].tofile(pair_files["pmax"])
+                    counts[first_seen].tofile(pair_files["count"])
+                    n_pairs += len(first_seen)
+
+                    print(
+                        f"  Partición {p + 1}/{n_partitions}: filas {lo:,}-{hi:,}, nnz {block.nnz:,}, "
+                        f"pares únicos {len(first_seen):,}"
+                    )
+                    del block, pair_min, pair_max, counts, first_seen
+        finally:
+            for f in pair_files.values():
+                f.close()
+
+        nnz = int(row_lengths.sum())
+        index_dtype = np.int32 if nnz <= np.iinfo(np.int32).max else np.int64
+        indptr = np.zeros(n + 1, dtype=index_dtype)
+        indptr[1:] = np.cumsum(row_lengths)
+
+        # Los arreglos finales se leen vía mmap al escribir el .npz
+        R = csr_matrix(
+            (
+                _open_binary(data_path, np.float32, nnz),
+                _open_binary(indices_path, np.int32, nnz),
+                indptr,
+            ),
+            shape=(n, n),
+            copy=False
+        )
+        print(f"Matriz: shape={R.shape}, nnz={R.nnz:,}")
+
+        save_npz(os.path.join(output_dir, "author_author_matrix.npz"), R)
+        np.save(os.path.join(output_dir, "author_ids.npy"), vocabulary, allow_pickle=False)
+        del R
+
+        # Los pares únicos también se escriben vía mmap
+        np.savez(
+            os.path.join(output_dir, "pairs_unique.npz"),
+            pair_min=_open_binary(pair_paths["pmin"], np.int32, n_pairs),
+            pair_max=_open_binary(pair_paths["pmax"], np.int32, n_pairs),
+            count=_open_binary(pair_paths["count"], float, n_pairs),
+        )
+        print(f"Pares únicos: {n_pairs:,}")
+        _report("Etapa 3", start_time)
+
+    finally:
+        if own_work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("\n==============================================")
+    print("✅ Archivos generados correctamente:")
+    print("  - author_author_matrix.npz")
+    print("  - author_ids.npy")
+    print("  - pairs_unique.npz")
+    print("==============================================\n")
@@ -1,7 +1,12 @@
 import os
 import numpy as np
 from scipy.sparse import load_npz
-from implicit.nearest_neighbours import CosineRecommender
+from recommender.artifacts import Artifact, StringTable, artifact_dir
+from recommender.authors import AuthorDictionary, invert_ids
+from recommender.topk import top_k_indices, min_max_normalize
+from recommender.ItemKNN.neighbours import load_similarity, score_block
+
+ARTIFACT_NAME = "itemknn"
 
 class ItemKNNQueries:
     # Cache estático a nivel de clase
@@ -18,77 +23,194 @@ class ItemKNNQueries:
             "files"
         )
 
+        # Preferir el artefacto versionado (mmap, sin pickle); si no existe
+        # se cargan los archivos legacy
+        try:
+            cls._cache = cls._load_artifact(artifact_dir(files_dir, ARTIFACT_NAME))
+        except FileNotFoundError:
+            cls._cache = cls._load_legacy_files(files_dir)
+
+    @classmethod
+    def model_version(cls):
+        """Versión del modelo cargado ("legacy" si viene de los archivos originales)"""
+        cls._initialize_cache()
+        return cls._cache["version"]
+
+    @classmethod
+    def global_ids(cls):
+        """Ids del diccionario global de autores para cada fila local (int32)"""
+        cls._initialize_cache()
+        if "global_ids" not in cls._cache:
+            cls._cache["global_ids"] = AuthorDictionary.ids_of_table(cls._cache["author_to_idx"])
+        return cls._cache["global_ids"]
+
+    @classmethod
+    def local_ids(cls):
+        """Fila local de cada id global (-1 si el autor no está en el modelo)"""
+        cls._initialize_cache()
+        if "local_ids" not in cls._cache:
+            cls._cache["local_ids"] = invert_ids(cls.global_ids())
+        return cls._cache["local_ids"]
+
+    @staticmethod
+    def _load_artifact(root_dir):
+        """Carga el modelo desde el artefacto versionado (arreglos vía mmap)."""
+        artifact = Artifact.open(root_dir)
+
+        cache = {
+            "version": artifact.version,
+            "author_to_idx": artifact.strings("author_ids"),
+            "X_full": artifact.csr("X_full"),
+            "similarity": artifact.csr("similarity"),
+        }
+
+        # Fila local -> id del diccionario global de autores
+        if artifact.has("author_global_ids"):
+            cache["global_ids"] = artifact.array("author_global_ids")
+
+        # Listas de vecinos precalculadas (opcionales)
+        if artifact.has("neighbour_indptr"):
+            for name in ("neighbour_indptr", "neighbour_ids", "neighbour_scores",
+                         "neighbour_min", "neighbour_max"):
+                cache[name] = artifact.array(name)
+            cache["neighbour_top_m"] = int(artifact.meta["neighbour_top_m"])
+
+        return cache
+
+    @staticmethod
+    def _load_legacy_files(files_dir):
+        """Carga el modelo desde los archivos .npy/.npz originales."""
         # 1. Cargar mapeos
-        author_to_idx = np.load(
-            os.path.join(files_dir, "author_to_idx.npy"),
-            allow_pickle=True
-        ).item()
         idx_to_author = np.load(
             os.path.join(files_dir, "idx_to_author.npy"),
             allow_pickle=True
         ).item()
+        author_to_idx = StringTable.from_strings(
+            [idx_to_author[i] for i in range(len(idx_to_author))]
+        )
 
         # 2. Cargar Matriz de Interacciones
         X_full = load_npz(os.path.join(files_dir, "X_full.npz")).tocsr()
 
-        # 3. Cargar el modelo correctamente
-        # El método load es un classmethod, devuelve la instancia cargada.
-        model_path = os.path.join(files_dir, "itemknn_best.npz")
-        model = CosineRecommender.load(model_path)
+        # 3. Cargar la similitud del modelo (formato de ItemItemRecommender.save)
+        similarity, _ = load_similarity(os.path.join(files_dir, "itemknn_best.npz"))
 
-        cls._cache = {
+        return {
+            "version": "legacy",
             "author_to_idx": author_to_idx,
-            "idx_to_author": idx_to_author,
             "X_full": X_full,
-            "model": model,
+            "similarity": similarity,
         }
 
     @classmethod
-    def get_recommendations(cls, author_id, n_recs=None):
+    def _score_neighbours(cls, author_idx):
+        """
+        Scores colaborativos de un autor (equivalente a
+        CosineRecommender.recommend con N = todos los autores).
+
+        Solo se recorren las filas de similitud de los coautores del autor:
+        el resultado son los autores alcanzados (ordenados por índice) y su
+        score acumulado. Los coautores ya conocidos se mantienen con score 0,
+        igual que en implicit.
+        """
+        scores = score_block(cls._cache["X_full"][author_idx], cls._cache["similarity"])
+        return scores.indices, scores.data.astype(float)
+
+    @classmethod
+    def _lookup_neighbours(cls, author_idx, n_recs, allowed=None):
+        """
+        Top-n_recs precalculado del autor: (ids, scores_norm), o None si
+        no hay listas o la fila no alcanza para responder (con allowed,
+        si quedan menos de n_recs autores permitidos en una fila truncada).
+        """
+        if "neighbour_indptr" not in cls._cache:
+            return None
+
+        indptr = cls._cache["neighbour_indptr"]
+        start, end = indptr[author_idx], indptr[author_idx + 1]
+
+        # La fila está completa si tiene menos de top_m entradas
+        complete = end - start < cls._cache["neighbour_top_m"]
+        if not complete and (n_recs is None or n_recs > end - start):
+            return None
+
+        ids = cls._cache["neighbour_ids"][start:end]
+        scores = cls._cache["neighbour_scores"][start:end]
+        if allowed is not None:
+            keep = allowed[ids]
+            if not complete and np.count_nonzero(keep) < n_recs:
+                return None
+            ids, scores = ids[keep], scores[keep]
+
+        if n_recs is not None:
+            ids, scores = ids[:n_recs], scores[:n_recs]
+        scores_norm = min_max_normalize(
+            scores,
+            float(cls._cache["neighbour_min"][author_idx]),
+            float(cls._cache["neighbour_max"][author_idx])
+        )
+        return ids, scores_norm
+
+    @classmethod
+    def get_top_k(cls, author_id, n_recs=None, allowed=None):
+        """
+        Índices locales y scores Min-Max de los n_recs autores con mayor
+        score colaborativo (todos los alcanzados si n_recs es None).
+
+        El Min-Max usa el mínimo y máximo de todos los autores alcanzados,
+        por lo que el score de cada autor no depende de n_recs. Si el
+        artefacto trae listas de vecinos precalculadas se responde con un
+        corte de la fila del autor. allowed (máscara booleana por fila)
+        restringe los autores retornados sin cambiar sus scores.
+
+        Returns:
+            Tupla (top_ids, scores_norm); arreglos vacíos si el autor no
+            existe o no alcanza a nadie
+        """
         # Inicializar cache
         cls._initialize_cache()
 
         author_to_idx = cls._cache["author_to_idx"]
-        idx_to_author = cls._cache["idx_to_author"]
-        X_full = cls._cache["X_full"]
-        model = cls._cache["model"]
 
         if author_id not in author_to_idx:
             print(f"Autor {author_id} no encontrado")
-            return []
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=float)
 
         author_idx = author_to_idx[author_id]
 
-        # Si no se especifica n_recs, intentamos traer a todos para el sorting global
-        if n_recs is None:
-            n_recs = len(idx_to_author) - 1
-
-        # 🔹 Obtener recomendaciones de Implicit
-        # recommend() devuelve IDs y scores (ya filtrando los que el autor ya conoce)
-        ids, scores = model.recommend(
-            userid=author_idx,
-            user_items=X_full[author_idx],
-            N=n_recs,
-            filter_already_liked_items=True,
-        )
+        # 🔹 Lectura de la lista de vecinos precalculada (si alcanza)
+        precomputed = cls._lookup_neighbours(author_idx, n_recs, allowed)
+        if precomputed is not None:
+            return precomputed
 
+        ids, scores = cls._score_neighbours(author_idx)
         if len(scores) == 0:
-            return []
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=float)
+        min_score, max_score = scores.min(), scores.max()
 
-        # 🔹 Normalización Min-Max (Score de Fusión)
-        min_score = scores.min()
-        max_score = scores.max()
-        epsilon = 1e-8
+        if allowed is not None:
+            keep = allowed[ids]
+            ids, scores = ids[keep], scores[keep]
+
+        # 🔹 Top-k por selección parcial y Min-Max (Score de Fusión)
+        top = top_k_indices(scores, n_recs)
+        return ids[top], min_max_normalize(scores[top], min_score, max_score)
+
+    @classmethod
+    def get_recommendations(cls, author_id, n_recs=None, allowed=None):
+        """
+        Retorna los n_recs autores con mayor score colaborativo (todos los
+        alcanzados si n_recs es None), normalizados con Min-Max.
 
-        if (max_score - min_score) > epsilon:
-            scores_norm = (scores - min_score) / (max_score - min_score)
-        else:
-            scores_norm = np.zeros_like(scores)
+        Lista de tuplas (author_id, score_min_max) ordenadas descendente
+        (ver get_top_k).
+        """
+        top_ids, scores_norm = cls.get_top_k(author_id, n_recs, allowed)
 
         # Construir lista de recomendaciones
         recommendations = [
-            (idx_to_author[idx], float(s_norm))
-            for idx, s_norm in zip(ids, scores_norm)
+            (aid, float(s_norm))
+            for aid, s_norm in zip(cls._cache["author_to_idx"].keys_at(top_ids), scores_norm)
         ]
 
         return recommendations
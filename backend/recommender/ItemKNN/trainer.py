@@ -0,0 +1,373 @@
+"""
+Entrenamiento de ItemKNN (similitud coseno autor-autor) dentro del repo.
+
+Reemplaza el notebook ItemKNN/train.ipynb sin depender de implicit:
+
+    1. Se leen los pares únicos generados por build_author_knn_data
+       (df_pairs_unique.pkl + author_to_idx.npy) o por
+       build_author_graph_out_of_core (pairs_unique.npz + author_ids.npy).
+    2. Split leave-one-out triple (train/val/test) igual al del notebook.
+    3. La similitud coseno se calcula con productos sparse por bloques de
+       filas repartidos en un pool de procesos (recommender/batch_topk.py);
+       cada bloque conserva su top-K por fila (incluida la diagonal, como
+       CosineRecommender).
+    4. Se barre K sobre validación (Recall/NDCG@20), se evalúa el mejor K en
+       test entrenando con train + val y se reentrena con todos los pares.
+
+Archivos generados en files_dir (formato que carga ItemKNNQueries):
+    X_full.npz         matriz binaria simétrica autor × autor
+    itemknn_best.npz   similitud top-K (formato de ItemItemRecommender.save)
+"""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix, save_npz
+from sklearn.preprocessing import normalize
+from recommender.batch_topk import open_shared, run_blocks, shared_arrays
+from recommender.ItemKNN.neighbours import build_neighbour_lists
+
+# Matrices del worker (las fija _init_worker o cosine_similarity_top_k)
+_worker = None
+
+
+def _init_worker(work_dir):
+    """Abre vía mmap las matrices normalizadas que escribió el proceso principal."""
+    global _worker
+
+    def open_csr(name):
+        return csr_matrix(
+            tuple(open_shared(work_dir, f"{name}.{part}") for part in ("data", "indices", "indptr")),
+            shape=tuple(open_shared(work_dir, f"{name}.shape")),
+            copy=False
+        )
+
+    _worker = {"items": open_csr("items"), "items_t": open_csr("items_t")}
+
+
+def _similarity_block(lo, hi, K):
+    """
+    Top-K de similitud de las filas [lo, hi).
+
+    Returns:
+        Tupla (lengths, indices, data); cada fila viene ordenada por
+        similitud descendente (empates por índice ascendente).
+    """
+    block = (_worker["items"][lo:hi] @ _worker["items_t"]).tocsr()
+    block.sum_duplicates()
+
+    lengths = np.diff(block.indptr)
+    rows = np.repeat(np.arange(hi - lo), lengths)
+    order = np.lexsort((block.indices, -block.data, rows))
+    rank_in_row = np.arange(len(order)) - np.repeat(block.indptr[:-1], lengths)
+    keep = order[rank_in_row < K]
+
+    return (
+        np.minimum(lengths, K),
+        block.indices[keep].astype(np.int32),
+        block.data[keep].astype(np.float32),
+    )
+
+
+def cosine_similarity_top_k(X, K, block_size=5000, n_jobs=None, work_dir=None):
+    """
+    Similitud coseno entre columnas de X con top-K por fila (equivalente a
+    CosineRecommender(K).fit(X).similarity, salvo el orden de empates).
+
+    Con n_jobs > 1 (None = todos los núcleos) las columnas normalizadas se
+    escriben a disco una vez y los bloques de filas se reparten en un pool
+    de procesos que las abre vía mmap (ver recommender/batch_topk.py).
+
+    Returns:
+        CSR (n × n) float32 cuyas filas quedan ordenadas por similitud
+        descendente (ver top_k_rows para recortar a un K menor).
+    """
+    global _worker
+    start_time = time.time()
+    n_jobs = n_jobs or os.cpu_count() or 1
+    X = X.tocsr().astype(np.float64)
+
+    # Filas de items = columnas de X normalizadas (L2)
+    items = normalize(X.T.tocsr(), norm="l2", axis=1)
+    items_t = items.T.tocsr()
+    n = items.shape[0]
+
+    if n_jobs == 1:
+        _worker = {"items": items, "items_t": items_t}
+        results = run_blocks(_similarity_block, n, K, block_size, label="Similitud coseno")
+    else:
+        arrays = {}
+        for name, matrix in (("items", items), ("items_t", items_t)):
+            for part in ("data", "indices", "indptr"):
+                arrays[f"{name}.{part}"] = getattr(matrix, part)
+            arrays[f"{name}.shape"] = np.array(matrix.shape)
+        with shared_arrays(arrays, work_dir, prefix="itemknn_") as tmp_dir:
+            results = run_blocks(
+                _similarity_block, n, K, block_size, n_jobs=n_jobs,
+                initializer=_init_worker, initargs=(tmp_dir,), label="Similitud coseno"
+            )
+
+    lengths = np.concatenate([r[0] for r in results]) if results else np.zeros(0, dtype=np.int64)
+    indptr = np.zeros(n + 1, dtype=np.int32)
+    indptr[1:] = np.cumsum(lengths)
+
+    def join(position, dtype):
+        if not results:
+            return np.empty(0, dtype=dtype)
+        return np.concatenate([r[position] for r in results])
+
+    similarity = csr_matrix((join(2, np.float32), join(1, np.int32), indptr), shape=(n, n))
+    print(f"Similitud calculada: nnz={similarity.nnz:,} en {time.time() - start_time:.1f}s")
+    return similarity
+
+
+def top_k_rows(similarity, K):
+    """
+    Recorta cada fila (ordenada por similitud) a sus K primeros vecinos y
+    retorna la CSR con índices ordenados, como la guarda implicit.
+    """
+    lengths = np.diff(similarity.indptr)
+    rank_in_row = np.arange(similarity.nnz) - np.repeat(similarity.indptr[:-1], lengths)
+    keep = rank_in_row < K
+
+    indptr = np.zeros(len(lengths) + 1, dtype=np.int32)
+    indptr[1:] = np.cumsum(np.minimum(lengths, K))
+    result = csr_matrix(
+        (similarity.data[keep], similarity.indices[keep], indptr),
+        shape=similarity.shape
+    )
+    result.sort_indices()
+    return result
+
+
+def load_pairs(files_dir):
+    """
+    Pares únicos de coautoría como índices de autor.
+
+    Returns:
+        Tupla (pair_min, pair_max, n_authors)
+    """
+    npz_path = os.path.join(files_dir, "pairs_unique.npz")
+    if os.path.exists(npz_path):
+        # Salida de build_author_graph_out_of_core
+        with np.load(npz_path) as data:
+            pair_min, pair_max = data["pair_min"], data["pair_max"]
+        n_authors = len(np.load(os.path.join(files_dir, "author_ids.npy"), mmap_mode="r"))
+    else:
+        # Salida de build_author_knn_data
+        author_to_idx = np.load(
+            os.path.join(files_dir, "author_to_idx.npy"), allow_pickle=True
+        ).item()
+        df_pairs_unique = pd.read_pickle(os.path.join(files_dir, "df_pairs_unique.pkl"))
+        pair_min = df_pairs_unique["pair_min"].map(author_to_idx).to_numpy()
+        pair_max = df_pairs_unique["pair_max"].map(author_to_idx).to_numpy()
+        n_authors = len(author_to_idx)
+
+    return pair_min.astype(np.int64), pair_max.astype(np.int64), n_authors
+
+
+def build_csr(pair_min, pair_max, n):
+    """Matriz binaria simétrica autor × autor a partir de pares."""
+    rows = np.concatenate([pair_min, pair_max])
+    cols = np.concatenate([pair_max, pair_min])
+    data = np.ones(len(rows), dtype=np.float32)
+    return csr_matrix((data, (rows, cols)), shape=(n, n))
+
+
+def triple_loo_split(pair_min, pair_max, seed=42):
+    """
+    Split leave-one-out triple del notebook sobre índices de pares.
+
+    Se recorren los autores en orden de primera aparición; con >= 3 pares
+    aún sin asignar uno va a test y otro a validación, con exactamente 2
+    uno va a test.
+
+    Returns:
+        Tupla (train_idx, val_idx, test_idx) de posiciones de pares
+    """
+    rng = np.random.default_rng(seed)
+    n_pairs = len(pair_min)
+
+    # Listas de adyacencia autor -> pares, en orden de aparición
+    endpoints = np.column_stack([pair_min, pair_max]).ravel()
+    pair_of = np.repeat(np.arange(n_pairs), 2)
+    by_author = np.argsort(endpoints, kind="stable")
+    authors, first_seen, counts = np.unique(endpoints, return_index=True, return_counts=True)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    adjacency = pair_of[by_author]
+
+    assigned = np.zeros(n_pairs, dtype=bool)
+    test_idx, val_idx = [], []
+
+    for position in np.argsort(first_seen):
+        indices = adjacency[starts[position]:starts[position] + counts[position]]
+        indices = indices[~assigned[indices]]
+        if len(indices) >= 3:
+            rng.shuffle(indices)
+            test_idx.append(indices[0])
+            val_idx.append(indices[1])
+            assigned[indices[:2]] = True
+        elif len(indices) == 2:
+            t = rng.choice(indices)
+            test_idx.append(t)
+            assigned[t] = True
+
+    test_idx = np.array(test_idx, dtype=np.int64)
+    val_idx = np.array(val_idx, dtype=np.int64)
+    train_idx = np.flatnonzero(~assigned)
+    return train_idx, val_idx, test_idx
+
+
+def recommend_top_k(X_train, similarity, authors, k=20):
+    """Top-k recomendados de cada autor (liked con score 0, como implicit)."""
+    neighbours = build_neighbour_lists(X_train[authors], similarity, top_m=k)
+    return neighbours["neighbour_indptr"], neighbours["neighbour_ids"]
+
+
+def recall_ndcg_at_k(indptr, ids, authors, X_gt, k=20):
+    """Recall@k y NDCG@k promedio contra los pares de X_gt."""
+    X_gt = X_gt.tocsr()
+    n = np.int64(X_gt.shape[1])
+    relevant = np.diff(X_gt.indptr)[authors]
+
+    lengths = np.diff(indptr)
+    rows = np.repeat(np.arange(len(authors)), lengths)
+    positions = np.arange(len(ids)) - np.repeat(indptr[:-1], lengths)
+
+    gt_rows = np.repeat(np.arange(X_gt.shape[0], dtype=np.int64), np.diff(X_gt.indptr))
+    hits = np.isin(authors[rows].astype(np.int64) * n + ids, gt_rows * n + X_gt.indices)
+
+    recall = np.bincount(rows, weights=hits, minlength=len(authors)) / relevant
+    dcg = np.bincount(rows, weights=hits / np.log2(positions + 2), minlength=len(authors))
+    discounts = np.concatenate([[0.0], np.cumsum(1 / np.log2(np.arange(k) + 2))])
+    idcg = discounts[np.minimum(relevant, k)]
+    return float(recall.mean()), float((dcg / idcg).mean())
+
+
+def coverage_novelty(ids, indptr, X_train, k=20):
+    """Cobertura del catálogo entrenado y novedad (-log2 popularidad) en top-k."""
+    degree = np.diff(X_train.tocsr().indptr)
+    catalog = np.count_nonzero(degree)
+    coverage = len(np.unique(ids)) / catalog
+
+    lengths = np.diff(indptr)
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+    popularity = np.where(degree[ids] > 0, degree[ids], 1) / degree.sum()
+    novelty = np.bincount(rows, weights=-np.log2(popularity), minlength=len(lengths)) / k
+    return coverage, float(novelty[lengths > 0].mean())
+
+
+def save_model(path, similarity, K):
+    """Guarda la similitud en el formato de ItemItemRecommender.save."""
+    similarity = similarity.sorted_indices()
+    np.savez(
+        path,
+        K=K,
+        shape=np.array(similarity.shape),
+        data=similarity.data,
+        indptr=similarity.indptr,
+        indices=similarity.indices,
+    )
+
+
+def train_itemknn(
+    files_dir,
+    ks=(20, 50, 100, 150, 200),
+    eval_k=20,
+    sample_users_eval=20000,
+    seed=42,
+    block_size=5000,
+    n_jobs=None,
+    work_dir=None
+):
+    """
+    Entrena ItemKNN con barrido de K sobre validación y guarda el mejor
+    modelo (ver docstring del módulo).
+
+    La similitud de validación se calcula una sola vez con max(ks) y se
+    recorta para cada K menor (el top-K es un prefijo del top-max(ks)).
+
+    Returns:
+        Dict con best_k, métricas de validación por K y métricas de test
+    """
+    start_time = time.time()
+    pair_min, pair_max, n_authors = load_pairs(files_dir)
+    print(f"Pares únicos: {len(pair_min):,} | Autores: {n_authors:,}")
+
+    # Filtrar autores con >= 2 colaboraciones para permitir LOO
+    degree = np.bincount(np.concatenate([pair_min, pair_max]), minlength=n_authors)
+    eligible = (degree[pair_min] >= 2) & (degree[pair_max] >= 2)
+    f_min, f_max = pair_min[eligible], pair_max[eligible]
+    print(f"Autores elegibles (>=2): {np.count_nonzero(degree >= 2):,}")
+    print(f"Pares tras filtrado: {len(f_min):,}")
+
+    print("Generando splits...")
+    train_idx, val_idx, test_idx = triple_loo_split(f_min, f_max, seed=seed)
+
+    # Barrido de K sobre validación
+    X_train = build_csr(f_min[train_idx], f_max[train_idx], n_authors)
+    X_val = build_csr(f_min[val_idx], f_max[val_idx], n_authors)
+    val_authors = np.flatnonzero(np.diff(X_val.indptr))
+    val_sample = np.sort(np.random.default_rng(seed).choice(
+        val_authors, size=min(sample_users_eval, len(val_authors)), replace=False
+    ))
+
+    print("\n--- TUNING: RECALL & NDCG ---")
+    sweep_similarity = cosine_similarity_top_k(
+        X_train, max(ks), block_size=block_size, n_jobs=n_jobs, work_dir=work_dir
+    )
+    validation = {}
+    for K in ks:
+        indptr, ids = recommend_top_k(X_train, top_k_rows(sweep_similarity, K), val_sample, eval_k)
+        validation[K] = recall_ndcg_at_k(indptr, ids, val_sample, X_val, eval_k)
+    del sweep_similarity
+
+    for K, (recall, ndcg) in validation.items():
+        print(f"K={K:3} | Recall@{eval_k}: {recall:.4f} | NDCG@{eval_k}: {ndcg:.4f}")
+    best_k = max(ks, key=lambda K: validation[K][1])
+
+    # Evaluación final en test entrenando con train + val
+    print(f"\n--- EVALUACIÓN FINAL (K={best_k}) ---")
+    final_idx = np.sort(np.concatenate([train_idx, val_idx]))
+    X_final_train = build_csr(f_min[final_idx], f_max[final_idx], n_authors)
+    X_test = build_csr(f_min[test_idx], f_max[test_idx], n_authors)
+    test_authors = np.flatnonzero(np.diff(X_test.indptr))
+
+    similarity = cosine_similarity_top_k(
+        X_final_train, best_k, block_size=block_size, n_jobs=n_jobs, work_dir=work_dir
+    )
+    indptr, ids = recommend_top_k(X_final_train, similarity, test_authors, eval_k)
+    test_recall, test_ndcg = recall_ndcg_at_k(indptr, ids, test_authors, X_test, eval_k)
+    test_coverage, test_novelty = coverage_novelty(ids, indptr, X_final_train, eval_k)
+    del similarity
+
+    print("\n" + "=" * 50)
+    print("RESULTADOS FINALES (LOO)")
+    print(f"Muestra Test: {len(test_authors):,} autores")
+    print(f"Recall@{eval_k}:   {test_recall:.4f}")
+    print(f"NDCG@{eval_k}:     {test_ndcg:.4f}")
+    print(f"Coverage:    {test_coverage:.4f}")
+    print(f"Novelty:     {test_novelty:.4f}")
+    print("=" * 50)
+
+    # Modelo de producción con todos los pares
+    X_full = build_csr(pair_min, pair_max, n_authors)
+    similarity = cosine_similarity_top_k(
+        X_full, best_k, block_size=block_size, n_jobs=n_jobs, work_dir=work_dir
+    )
+    save_npz(os.path.join(files_dir, "X_full.npz"), X_full)
+    save_model(os.path.join(files_dir, "itemknn_best.npz"), similarity, best_k)
+
+    print(f"Modelo guardado en {files_dir} ({time.time() - start_time:.1f}s)")
+    return {
+        "best_k": best_k,
+        "validation": validation,
+        "test": {
+            "recall": test_recall,
+            "ndcg": test_ndcg,
+            "coverage": test_coverage,
+            "novelty": test_novelty,
+        },
+    }
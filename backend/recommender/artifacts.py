@@ -0,0 +1,430 @@
+"""
+Formato de artefactos versionado y memory-mappable para los modelos.
+
+Cada modelo se guarda en un directorio raíz (ej. files/artifacts/content_based)
+con una subcarpeta por versión y un archivo CURRENT que apunta a la versión
+activa:
+
+    files/artifacts/content_based/
+        CURRENT                      -> "20250101T120000.123Z-a1b2c3"
+        20250101T120000.123Z-a1b2c3/
+            manifest.json
+            author_matrix.indptr.npy
+            author_matrix.indices.npy
+            author_matrix.data.npy
+            author_ids.sorted.npy    (strings ordenados de ancho fijo, dtype S)
+            author_ids.order.npy     (posición ordenada -> índice)
+            author_ids.rank.npy      (índice -> posición ordenada)
+            ...
+
+Las matrices se guardan como CSR de scipy (add_csr) o como CompactCSR
+(add_compact_csr: índices uint16 y valores float16/uint8 cuantizados).
+
+Todos los arreglos son .npy planos (sin pickle) y se abren con
+mmap_mode='r', por lo que N workers comparten una sola copia en el page
+cache y el arranque no depende del tamaño del modelo.
+"""
+
+import json
+import os
+import secrets
+import shutil
+import time
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+FORMAT_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+CURRENT_FILE = 'CURRENT'
+
+
+def artifact_dir(files_dir, model):
+    """Directorio raíz de los artefactos de un modelo."""
+    return os.path.join(files_dir, 'artifacts', model)
+
+
+def current_version(root_dir):
+    """Versión activa de un modelo (None si no hay artefactos)."""
+    try:
+        with open(os.path.join(root_dir, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _new_version():
+    # Timestamp UTC con milisegundos: el orden alfabético es el orden de
+    # creación (la hora local retrocede al salir del horario de verano)
+    now = time.time()
+    return f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime(now))}.{int(now * 1000) % 1000:03d}Z-{secrets.token_hex(3)}"
+
+
+class StringTable:
+    """
+    Tabla de strings de ancho fijo alineada a índices enteros.
+
+    Se comporta como un diccionario string -> índice (`in`, `[]`, `get`,
+    `len`) y permite recuperar strings por índice con key_at / keys_at.
+    Se guardan los strings ordenados (sorted_values) junto a dos
+    permutaciones int32 (order: posición ordenada -> índice, rank: índice
+    -> posición ordenada), así las búsquedas son O(log n) con searchsorted
+    directamente sobre el mmap, sin construir diccionarios de Python.
+    """
+
+    def __init__(self, sorted_values, order, rank):
+        self.sorted_values = sorted_values
+        self.order = order
+        self.rank = rank
+
+    @classmethod
+    def from_strings(cls, strings):
+        """Construye la tabla en memoria a partir de una secuencia de strings."""
+        values = cls.encode(strings)
+        order = np.argsort(values, kind='stable').astype(np.int32)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order), dtype=np.int32)
+        return cls(values[order], order, rank)
+
+    @staticmethod
+    def encode(strings):
+        """Codifica strings a un arreglo de bytes de ancho fijo (dtype S)."""
+        if isinstance(strings, np.ndarray) and strings.dtype.kind == 'S':
+            return strings
+        encoded = np.array([str(s).encode('utf-8') for s in strings], dtype=np.bytes_)
+        if len(encoded) == 0:
+            return np.empty(0, dtype='S1')
+        return encoded
+
+    def __len__(self):
+        return len(self.sorted_values)
+
+    def index_of(self, keys):
+        """Índices de varios strings a la vez (-1 si no existen)."""
+        encoded = self.encode(keys)
+        result = np.full(len(encoded), -1, dtype=np.int64)
+        if len(self) == 0 or len(encoded) == 0:
+            return result
+
+        # Strings más largos que el ancho de la tabla no pueden estar en ella
+        fits = np.char.str_len(encoded) <= self.sorted_values.itemsize
+        encoded = encoded.astype(self.sorted_values.dtype)
+
+        pos = np.minimum(np.searchsorted(self.sorted_values, encoded), len(self) - 1)
+        found = fits & (self.sorted_values[pos] == encoded)
+        result[found] = self.order[pos[found]]
+        return result
+
+    def get(self, key, default=None):
+        idx = self.index_of([key])[0]
+        return default if idx < 0 else int(idx)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __getitem__(self, key):
+        idx = self.get(key)
+        if idx is None:
+            raise KeyError(key)
+        return idx
+
+    def key_at(self, idx):
+        return self.sorted_values[self.rank[idx]].decode('utf-8')
+
+    def keys_at(self, indices):
+        """Strings de varios índices (solo se decodifican esas filas)."""
+        indices = np.asarray(indices, dtype=np.int64)
+        return [v.decode('utf-8') for v in self.sorted_values[self.rank[indices]]]
+
+    def keys(self):
+        """Todos los strings en orden de índice."""
+        return self.keys_at(np.arange(len(self)))
+
+
+class CompactCSR:
+    """
+    Matriz CSR compacta para modelos con pocas columnas.
+
+    Los índices de columna se guardan como uint16 cuando hay a lo más
+    65.536 columnas y los valores como float32, float16 o uint8. En uint8
+    cada valor se cuantiza con una escala por fila (scale_axis=0) o por
+    columna (scale_axis=1): valor ~= data * scale. scipy no admite índices
+    uint16, así que los kernels operan directo sobre indptr/indices/data.
+    """
+
+    VALUE_DTYPES = ('float32', 'float16', 'uint8')
+
+    def __init__(self, indptr, indices, data, shape, scale=None, scale_axis=1):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.shape = tuple(shape)
+        self.scale = scale
+        self.scale_axis = scale_axis
+
+    @classmethod
+    def from_csr(cls, matrix, value_dtype='float32', scale_axis=1):
+        """Convierte una CSR de scipy (valores no negativos si value_dtype='uint8')."""
+        if value_dtype not in cls.VALUE_DTYPES:
+            raise ValueError(f"value_dtype debe ser uno de {cls.VALUE_DTYPES}, no '{value_dtype}'")
+
+        matrix = csr_matrix(matrix, dtype=np.float32)
+        index_dtype = np.uint16 if matrix.shape[1] <= np.iinfo(np.uint16).max + 1 else np.int32
+        indices = matrix.indices.astype(index_dtype)
+        data = matrix.data
+        scale = None
+
+        if value_dtype == 'uint8':
+            # Escala = máximo de cada grupo / 255; los valores positivos nunca
+            # se cuantizan a 0 para no alterar qué entradas existen
+            max_value = np.asarray(matrix.max(axis=1 - scale_axis).todense(), dtype=np.float32).ravel()
+            scale = np.where(max_value > 0, max_value / 255.0, 1.0).astype(np.float32)
+            if scale_axis == 1:
+                groups = matrix.indices
+            else:
+                groups = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+            quantized = np.rint(data / scale[groups])
+            data = np.where(data > 0, np.maximum(quantized, 1), quantized).clip(0, 255).astype(np.uint8)
+        else:
+            data = data.astype(value_dtype)
+
+        return cls(matrix.indptr, indices, data, matrix.shape, scale, scale_axis)
+
+    @property
+    def nnz(self):
+        return int(self.indptr[-1])
+
+    @property
+    def nbytes(self):
+        arrays = [self.indptr, self.indices, self.data]
+        if self.scale is not None:
+            arrays.append(self.scale)
+        return sum(a.nbytes for a in arrays)
+
+    def values(self):
+        """Valores de data decuantizados a float32."""
+        data = self.data.astype(np.float32)
+        if self.scale is None:
+            return data
+        if self.scale_axis == 1:
+            return data * self.scale[self.indices]
+        return data * np.repeat(self.scale, np.diff(self.indptr))
+
+    def to_csr(self):
+        """CSR de scipy (float32, índices int32) con los valores decuantizados."""
+        return csr_matrix(
+            (self.values(), self.indices.astype(np.int32), self.indptr), shape=self.shape
+        )
+
+    def dot_rows(self, rows, query_indices, query_weights):
+        """
+        Producto punto de las filas `rows` con un vector disperso
+        (query_indices, query_weights), sin construir submatrices: se
+        recolectan las entradas de esas filas y se suman con bincount.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        query = np.zeros(self.shape[1], dtype=np.float64)
+        query[query_indices] = query_weights
+        if self.scale is not None and self.scale_axis == 1:
+            query *= self.scale
+
+        starts = self.indptr[rows].astype(np.int64)
+        lengths = self.indptr[rows + 1].astype(np.int64) - starts
+        row_of_entry = np.repeat(np.arange(len(rows)), lengths)
+        positions = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths) + starts[row_of_entry]
+
+        products = self.data[positions].astype(np.float64) * query[self.indices[positions]]
+        if self.scale is not None and self.scale_axis == 0:
+            products *= self.scale[rows][row_of_entry]
+        return np.bincount(row_of_entry, weights=products, minlength=len(rows))
+
+
+class ArtifactWriter:
+    """
+    Escribe una nueva versión de un artefacto.
+
+    Los archivos se escriben en un directorio temporal y solo al llamar
+    commit() se mueven a su versión y se actualiza CURRENT, de modo que los
+    lectores nunca ven una versión a medio escribir.
+    """
+
+    def __init__(self, root_dir, version=None):
+        self.root_dir = root_dir
+        self.version = version or _new_version()
+        self.tmp_dir = os.path.join(root_dir, f'.tmp-{self.version}')
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self.manifest = {
+            'format_version': FORMAT_VERSION,
+            'version': self.version,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'arrays': {},
+            'strings': [],
+            'csr': {},
+            'compact': {},
+            'meta': {},
+        }
+
+    def _register(self, name, array):
+        self.manifest['arrays'][name] = {
+            'file': f'{name}.npy',
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+        }
+
+    def add_array(self, name, array):
+        array = np.ascontiguousarray(array)
+        if array.dtype == object:
+            raise TypeError(f"'{name}': los arreglos object no son memory-mappables")
+        np.save(os.path.join(self.tmp_dir, f'{name}.npy'), array, allow_pickle=False)
+        self._register(name, array)
+
+    def open_array(self, name, dtype, shape):
+        """Arreglo escribible en disco (para construir artefactos out-of-core)."""
+        array = np.lib.format.open_memmap(
+            os.path.join(self.tmp_dir, f'{name}.npy'), mode='w+', dtype=dtype, shape=shape
+        )
+        self._register(name, array)
+        return array
+
+    def add_strings(self, name, strings):
+        table = strings if isinstance(strings, StringTable) else StringTable.from_strings(strings)
+        self.add_array(f'{name}.sorted', table.sorted_values)
+        self.add_array(f'{name}.order', table.order)
+        self.add_array(f'{name}.rank', table.rank)
+        self.manifest['strings'].append(name)
+
+    def add_csr(self, name, matrix):
+        matrix = csr_matrix(matrix)
+        self.add_array(f'{name}.indptr', matrix.indptr)
+        self.add_array(f'{name}.indices', matrix.indices)
+        self.add_array(f'{name}.data', matrix.data)
+        self.manifest['csr'][name] = list(matrix.shape)
+
+    def add_compact_csr(self, name, matrix):
+        self.add_array(f'{name}.indptr', matrix.indptr)
+        self.add_array(f'{name}.indices', matrix.indices)
+        self.add_array(f'{name}.data', matrix.data)
+        if matrix.scale is not None:
+            self.add_array(f'{name}.scale', matrix.scale)
+        self.manifest['compact'][name] = {
+            'shape': list(matrix.shape),
+            'scale_axis': matrix.scale_axis,
+        }
+
+    def set_meta(self, **meta):
+        self.manifest['meta'].update(meta)
+
+    def commit(self, keep=2):
+        """Publica la versión y elimina versiones antiguas (conserva `keep`)."""
+        with open(os.path.join(self.tmp_dir, MANIFEST_FILE), 'w') as f:
+            json.dump(self.manifest, f, indent=2, default=str)
+
+        final_dir = os.path.join(self.root_dir, self.version)
+        os.replace(self.tmp_dir, final_dir)
+
+        tmp_current = os.path.join(self.root_dir, f'.{CURRENT_FILE}-{self.version}')
+        with open(tmp_current, 'w') as f:
+            f.write(self.version)
+        os.replace(tmp_current, os.path.join(self.root_dir, CURRENT_FILE))
+
+        prune_versions(self.root_dir, keep=keep)
+        return self.version
+
+
+def prune_versions(root_dir, keep=2):
+    """Elimina versiones antiguas, conservando las `keep` más recientes y CURRENT."""
+    active = current_version(root_dir)
+    versions = sorted(
+        d for d in os.listdir(root_dir)
+        if not d.startswith('.') and os.path.isfile(os.path.join(root_dir, d, MANIFEST_FILE))
+    )
+    for version in versions[:-keep] if keep > 0 else versions:
+        if version != active:
+            shutil.rmtree(os.path.join(root_dir, version), ignore_errors=True)
+
+
+class Artifact:
+    """Versión publicada de un artefacto, con sus arreglos abiertos vía mmap."""
+
+    def __init__(self, path, manifest):
+        self.path = path
+        self.manifest = manifest
+        self.version = manifest['version']
+        self.meta = manifest.get('meta', {})
+
+    @classmethod
+    def open(cls, root_dir, version=None):
+        """Abre la versión indicada (o CURRENT). Lanza FileNotFoundError si no existe."""
+        version = version or current_version(root_dir)
+        if version is None:
+            raise FileNotFoundError(f'No hay artefactos publicados en {root_dir}')
+
+        path = os.path.join(root_dir, version)
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+
+        if manifest.get('format_version') != FORMAT_VERSION:
+            raise ValueError(
+                f"Formato de artefacto {manifest.get('format_version')} no soportado "
+                f"(se esperaba {FORMAT_VERSION})"
+            )
+        return cls(path, manifest)
+
+    def has(self, name):
+        return (
+            name in self.manifest['arrays']
+            or name in self.manifest['strings']
+            or name in self.manifest['csr']
+            or name in self.manifest.get('compact', {})
+        )
+
+    def array(self, name, mmap_mode='r'):
+        """
+        Abre un arreglo del artefacto.
+
+        mmap_mode='r' (por defecto) comparte las páginas entre procesos;
+        'c' (copy-on-write) también las comparte pero entrega un arreglo
+        escribible, para librerías que no aceptan buffers de solo lectura;
+        None lo carga completo en memoria.
+        """
+        info = self.manifest['arrays'][name]
+        return np.load(
+            os.path.join(self.path, info['file']),
+            mmap_mode=mmap_mode,
+            allow_pickle=False
+        )
+
+    def strings(self, name):
+        return StringTable(
+            self.array(f'{name}.sorted'), self.array(f'{name}.order'), self.array(f'{name}.rank')
+        )
+
+    def csr(self, name, mmap_mode='r'):
+        shape = tuple(self.manifest['csr'][name])
+        return csr_matrix(
+            (
+                self.array(f'{name}.data', mmap_mode),
+                self.array(f'{name}.indices', mmap_mode),
+                self.array(f'{name}.indptr', mmap_mode),
+            ),
+            shape=shape,
+            copy=False
+        )
+
+    def compact_csr(self, name, mmap_mode='r'):
+        info = self.manifest['compact'][name]
+        scale = self.array(f'{name}.scale', mmap_mode) if f'{name}.scale' in self.manifest['arrays'] else None
+        return CompactCSR(
+            self.array(f'{name}.indptr', mmap_mode),
+            self.array(f'{name}.indices', mmap_mode),
+            self.array(f'{name}.data', mmap_mode),
+            info['shape'],
+            scale,
+            info['scale_axis'],
+        )
+
+    def matrix(self, name, mmap_mode='r'):
+        """Matriz guardada con add_csr (CSR de scipy) o add_compact_csr (CompactCSR)."""
+        if name in self.manifest.get('compact', {}):
+            return self.compact_csr(name, mmap_mode)
+        return self.csr(name, mmap_mode)
@@ -0,0 +1,230 @@
+"""
+Atributos por autor para filtrar recomendaciones dentro de los motores.
+
+Columnas compactas alineadas al diccionario global de autores (id int32 de
+recommender.authors): país y tipo de institución como códigos enteros sobre
+un vocabulario (StringTable), y cantidad de works y de citas. Un filtro se
+resuelve como una máscara booleana sobre los ids globales que
+HybridRecommender aplica en cada motor antes del top-k, en lugar de pedir
+miles de candidatos y filtrarlos después en la base de datos.
+
+Los autores sin atributos (no están en mv_latam_authors, o se registraron
+en el diccionario después de construir el artefacto) no pasan ningún
+filtro. Si el artefacto no existe, mask retorna None y la API aplica los
+filtros después, en la base de datos.
+"""
+
+import os
+import time
+
+import numpy as np
+from recommender.artifacts import Artifact, ArtifactWriter, artifact_dir, current_version
+from recommender.authors import ARTIFACT_NAME as DICTIONARY_ARTIFACT
+
+ARTIFACT_NAME = 'author_attributes'
+
+# Código de los autores sin valor para un atributo categórico
+UNKNOWN = -1
+
+
+def _encode_categories(values):
+    """Códigos int16 sobre el vocabulario ordenado de values (UNKNOWN para vacíos)."""
+    values = np.array([v or '' for v in values], dtype=object)
+    vocabulary = np.unique(values[values != ''])
+    if len(vocabulary) > np.iinfo(np.int16).max:
+        raise ValueError("Vocabulario de atributos excede el rango de int16")
+
+    codes = np.full(len(values), UNKNOWN, dtype=np.int16)
+    known = values != ''
+    codes[known] = np.searchsorted(vocabulary, values[known])
+    return codes, [str(v) for v in vocabulary]
+
+
+def build_author_attributes(files_dir, chunk_size=20000):
+    """
+    Construye el artefacto de atributos desde mv_latam_authors (y el tipo
+    de su última institución) alineado a la versión vigente del
+    diccionario global de autores. Retorna la versión publicada.
+    """
+    # Django solo se importa al construir el artefacto
+    from api.models import Institution, MvLatamAuthor
+
+    dictionary = Artifact.open(artifact_dir(files_dir, DICTIONARY_ARTIFACT)).strings('author_ids')
+    n_authors = len(dictionary)
+
+    institution_types = dict(
+        Institution.objects.filter(
+            id__in=MvLatamAuthor.objects.values('last_known_institution')
+        ).values_list('id', 'type').iterator(chunk_size=chunk_size)
+    )
+
+    rows = list(
+        MvLatamAuthor.objects
+        .values_list('id', 'country_code', 'last_known_institution_id', 'works_count', 'cited_by_count')
+        .iterator(chunk_size=chunk_size)
+    )
+    print(f"Atributos: {len(rows):,} autores en mv_latam_authors")
+
+    author_ids, countries, institutions, works, cited = zip(*rows) if rows else ((),) * 5
+    global_ids = dictionary.index_of(author_ids)
+    registered = global_ids >= 0
+    global_ids = global_ids[registered]
+
+    country_codes, country_vocabulary = _encode_categories(countries)
+    type_codes, type_vocabulary = _encode_categories(
+        [institution_types.get(i) for i in institutions]
+    )
+
+    columns = {
+        'has_attributes': (np.zeros(n_authors, dtype=bool), np.ones(len(rows), dtype=bool)),
+        'country': (np.full(n_authors, UNKNOWN, dtype=np.int16), country_codes),
+        'institution_type': (np.full(n_authors, UNKNOWN, dtype=np.int16), type_codes),
+        'works_count': (
+            np.zeros(n_authors, dtype=np.int32),
+            np.array([w or 0 for w in works], dtype=np.int32)
+        ),
+        'cited_by_count': (
+            np.zeros(n_authors, dtype=np.int32),
+            np.array([c or 0 for c in cited], dtype=np.int32)
+        ),
+    }
+
+    writer = ArtifactWriter(artifact_dir(files_dir, ARTIFACT_NAME))
+    for name, (column, values) in columns.items():
+        column[global_ids] = values[registered]
+        writer.add_array(name, column)
+    writer.add_strings('countries', country_vocabulary)
+    writer.add_strings('institution_types', type_vocabulary)
+    writer.set_meta(
+        n_authors=n_authors,
+        dictionary_version=current_version(artifact_dir(files_dir, DICTIONARY_ARTIFACT))
+    )
+    version = writer.commit()
+
+    print(
+        f"Atributos: {int(registered.sum()):,} autores del diccionario, "
+        f"{len(country_vocabulary)} países, {len(type_vocabulary)} tipos de institución, "
+        f"versión {version}"
+    )
+    return version
+
+
+class AuthorAttributes:
+    # Cache estático a nivel de clase
+    _cache = None
+
+    # Cada cuántos segundos se revisa si se publicó una nueva versión
+    RELOAD_INTERVAL = 30.0
+    _last_version_check = 0.0
+    _last_missing_check = None
+
+    # Máscaras recientes por filtro (se vacía al superar el tamaño)
+    MASK_CACHE_SIZE = 64
+
+    @staticmethod
+    def _root_dir():
+        return artifact_dir(
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "files"),
+            ARTIFACT_NAME
+        )
+
+    @classmethod
+    def _initialize_cache(cls):
+        """
+        Carga las columnas vía mmap (y las recarga si se publicó otra
+        versión). Sin artefacto lanza FileNotFoundError; se vuelve a buscar
+        cada RELOAD_INTERVAL segundos.
+        """
+        if cls._cache is None and cls._last_missing_check is not None:
+            if time.monotonic() - cls._last_missing_check < cls.RELOAD_INTERVAL:
+                raise FileNotFoundError(cls._root_dir())
+        if cls._cache is not None:
+            now = time.monotonic()
+            if now - cls._last_version_check < cls.RELOAD_INTERVAL:
+                return
+            cls._last_version_check = now
+            if current_version(cls._root_dir()) == cls._cache['version']:
+                return
+
+        try:
+            artifact = Artifact.open(cls._root_dir())
+        except FileNotFoundError:
+            if cls._cache is None:
+                cls._last_missing_check = time.monotonic()
+                raise FileNotFoundError(
+                    "No hay atributos de autores: ejecuta build_author_attributes "
+                    "para filtrar dentro de los motores."
+                )
+            # La versión cargada sigue siendo válida
+            return
+        cls._last_missing_check = None
+        cls._cache = {
+            'version': artifact.version,
+            'has_attributes': artifact.array('has_attributes'),
+            'country': artifact.array('country'),
+            'institution_type': artifact.array('institution_type'),
+            'works_count': artifact.array('works_count'),
+            'cited_by_count': artifact.array('cited_by_count'),
+            'countries': artifact.strings('countries'),
+            'institution_types': artifact.strings('institution_types'),
+            'masks': {},
+        }
+
+    @classmethod
+    def model_version(cls):
+        cls._initialize_cache()
+        return cls._cache['version']
+
+    @classmethod
+    def available(cls):
+        """True si hay artefacto de atributos publicado."""
+        try:
+            cls._initialize_cache()
+        except FileNotFoundError:
+            return False
+        return True
+
+    @staticmethod
+    def active_filters(country_code=None, institution_type=None, min_works_count=None, min_cited_by_count=None):
+        """Tupla normalizada de filtros (None si no hay ningún filtro)."""
+        filters = (country_code or None, institution_type or None, min_works_count, min_cited_by_count)
+        if all(value is None for value in filters):
+            return None
+        return filters
+
+    @classmethod
+    def mask(cls, country_code=None, institution_type=None, min_works_count=None, min_cited_by_count=None):
+        """
+        Máscara booleana sobre ids globales de los autores que cumplen
+        todos los filtros entregados (None si no hay ningún filtro o si no
+        hay artefacto de atributos; ver available).
+
+        Args:
+            country_code: Código de país de la última institución (ej. 'CL')
+            institution_type: Tipo de institución (ej. 'education')
+            min_works_count: Mínimo de works del autor
+            min_cited_by_count: Mínimo de citas del autor
+        """
+        filters = cls.active_filters(country_code, institution_type, min_works_count, min_cited_by_count)
+        if filters is None or not cls.available():
+            return None
+
+        masks = cls._cache['masks']
+        if filters in masks:
+            return masks[filters]
+
+        cache = cls._cache
+        allowed = np.array(cache['has_attributes'], dtype=bool)
+        if country_code:
+            allowed &= cache['country'] == cache['countries'].get(country_code, UNKNOWN - 1)
+        if institution_type:
+            allowed &= cache['institution_type'] == cache['institution_types'].get(institution_type, UNKNOWN - 1)
+        if min_works_count is not None:
+            allowed &= cache['works_count'] >= min_works_count
+        if min_cited_by_count is not None:
+            allowed &= cache['cited_by_count'] >= min_cited_by_count
+
+        if len(masks) >= cls.MASK_CACHE_SIZE:
+            masks.clear()
+        masks[filters] = allowed
+        return allowed
@@ -0,0 +1,247 @@
+"""
+Diccionario global de autores: ID de OpenAlex <-> id entero (int32).
+
+Cada motor (content-based, ItemKNN, MF, LightGCN) guarda en su artefacto
+el arreglo author_global_ids (fila local -> id global), de modo que el
+recomendador híbrido y la API intercambian arreglos int32 y los strings
+solo se decodifican para las filas finales de la respuesta.
+
+El diccionario es un artefacto más (files/artifacts/authors) con una
+StringTable: búsquedas O(log n) sobre el mmap, sin diccionarios de Python.
+Los ids se asignan de forma append-only (un autor nuevo recibe el
+siguiente id libre y los existentes no cambian), por lo que los artefactos
+de los motores publicados antes de ampliar el diccionario siguen siendo
+válidos.
+
+Si no hay diccionario publicado (despliegues que solo tienen los archivos
+legacy de los motores), AuthorDictionary arma uno en memoria a partir de
+las tablas de autores que cargan los motores, con la misma asignación
+append-only.
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+from recommender.artifacts import Artifact, ArtifactWriter, StringTable, artifact_dir, current_version
+
+ARTIFACT_NAME = 'authors'
+
+# Artefactos de motores cuyos autores se registran en build_author_dictionary
+ENGINE_ARTIFACTS = ('content_based', 'itemknn', 'mf', 'lightgcn')
+
+# Archivos legacy con los IDs de autor de cada motor (fila -> author_id)
+LEGACY_ID_FILES = {
+    'content_based': 'cb_author_ids.npy',
+    'itemknn': 'idx_to_author.npy',
+    'mf': 'cf_idx_to_author.npy',
+    'lightgcn': 'lightgcn_idx_to_author.npy',
+}
+
+# Versión del diccionario en memoria (sin artefacto publicado)
+LEGACY_VERSION = 'legacy'
+
+
+def _append_authors(known, encoded, ids):
+    """
+    Agrega al final de known (strings en orden de id) los autores de
+    encoded sin id (ids < 0) y completa ids en el lugar.
+
+    Returns:
+        Tupla (values, new_values): todos los strings en orden de id y los
+        agregados
+    """
+    missing = ids < 0
+    new_values = np.unique(encoded[missing])
+    ids[missing] = len(known) + np.searchsorted(new_values, encoded[missing])
+    return np.concatenate([known, new_values]), new_values
+
+
+def load_legacy_author_ids(path):
+    """IDs de autor de un archivo legacy (dict índice -> id o arreglo de ids)."""
+    data = np.load(path, allow_pickle=True)
+    if data.dtype == object and data.shape == ():
+        idx_to_author = data.item()
+        return [idx_to_author[i] for i in range(len(idx_to_author))]
+    return [a.decode('utf-8') if isinstance(a, bytes) else str(a) for a in data]
+
+
+def register_authors(files_dir, author_ids):
+    """
+    Ids globales de author_ids. Los autores que aún no están en el
+    diccionario se agregan al final publicando una nueva versión.
+
+    Returns:
+        Arreglo int32 alineado con author_ids
+    """
+    root_dir = artifact_dir(files_dir, ARTIFACT_NAME)
+    encoded = StringTable.encode(author_ids)
+
+    try:
+        table = Artifact.open(root_dir).strings('author_ids')
+        known = table.sorted_values[table.rank]
+        ids = table.index_of(encoded)
+    except FileNotFoundError:
+        known = np.empty(0, dtype='S1')
+        ids = np.full(len(encoded), -1, dtype=np.int64)
+
+    if (ids < 0).any():
+        values, new_values = _append_authors(known, encoded, ids)
+        if len(values) > np.iinfo(np.int32).max:
+            raise ValueError("El diccionario de autores excede el rango de int32")
+
+        writer = ArtifactWriter(root_dir)
+        writer.add_strings('author_ids', values)
+        writer.set_meta(n_authors=len(values))
+        version = writer.commit()
+        print(
+            f"Diccionario de autores: {len(new_values):,} nuevos "
+            f"(total {len(values):,}), versión {version}"
+        )
+
+    return ids.astype(np.int32)
+
+
+def build_author_dictionary(files_dir):
+    """
+    Registra en el diccionario los autores de cada motor: los del artefacto
+    publicado o, si el motor no tiene artefacto, los de su archivo legacy
+    (para despliegues anteriores al diccionario). Retorna la versión
+    vigente del diccionario.
+    """
+    for model in ENGINE_ARTIFACTS:
+        try:
+            table = Artifact.open(artifact_dir(files_dir, model)).strings('author_ids')
+            author_ids, source = table.sorted_values, 'artefacto'
+        except FileNotFoundError:
+            legacy_path = os.path.join(files_dir, LEGACY_ID_FILES[model])
+            if not os.path.exists(legacy_path):
+                continue
+            author_ids, source = load_legacy_author_ids(legacy_path), LEGACY_ID_FILES[model]
+        register_authors(files_dir, author_ids)
+        print(f"  {model}: {len(author_ids):,} autores registrados ({source})")
+    return current_version(artifact_dir(files_dir, ARTIFACT_NAME))
+
+
+def invert_ids(global_ids):
+    """Inversa de un arreglo fila local -> id global (-1 para ids sin fila local)."""
+    global_ids = np.asarray(global_ids)
+    local_ids = np.full(int(global_ids.max(initial=-1)) + 1, -1, dtype=np.int32)
+    registered = global_ids >= 0
+    local_ids[global_ids[registered]] = np.flatnonzero(registered)
+    return local_ids
+
+
+def local_mask(allowed, global_ids):
+    """
+    Máscara por fila local de un motor a partir de una máscara sobre ids
+    globales (False para autores sin id global o fuera de la máscara).
+    """
+    global_ids = np.asarray(global_ids)
+    in_range = (global_ids >= 0) & (global_ids < len(allowed))
+    mask = np.zeros(len(global_ids), dtype=bool)
+    mask[in_range] = allowed[global_ids[in_range]]
+    return mask
+
+
+class AuthorDictionary:
+    # Cache estático a nivel de clase
+    _cache = None
+    _lock = threading.Lock()
+
+    # Cada cuántos segundos se revisa si se publicó una versión ampliada
+    RELOAD_INTERVAL = 30.0
+    _last_version_check = 0.0
+
+    @staticmethod
+    def _root_dir():
+        return artifact_dir(
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "files"),
+            ARTIFACT_NAME
+        )
+
+    @classmethod
+    def _initialize_cache(cls, force=False):
+        """
+        Carga el diccionario (y lo recarga si se publicó otra versión). Sin
+        artefacto se usa un diccionario en memoria que se mantiene hasta
+        reiniciar el proceso (los motores ya cargados guardan esos ids).
+        """
+        if cls._cache is not None and cls._cache['version'] == LEGACY_VERSION:
+            return
+        if cls._cache is not None and not force:
+            now = time.monotonic()
+            if now - cls._last_version_check < cls.RELOAD_INTERVAL:
+                return
+            cls._last_version_check = now
+            if current_version(cls._root_dir()) == cls._cache['version']:
+                return
+
+        try:
+            artifact = Artifact.open(cls._root_dir())
+        except FileNotFoundError:
+            # Solo archivos legacy: el diccionario se arma con las tablas de
+            # los motores a medida que se cargan (ver ids_of_table)
+            with cls._lock:
+                if cls._cache is None or cls._cache['version'] != LEGACY_VERSION:
+                    cls._cache = {
+                        'version': LEGACY_VERSION,
+                        'author_ids': StringTable.from_strings([]),
+                    }
+            return
+        cls._cache = {
+            'version': artifact.version,
+            'author_ids': artifact.strings('author_ids'),
+        }
+
+    @classmethod
+    def model_version(cls):
+        cls._initialize_cache()
+        return cls._cache['version']
+
+    @classmethod
+    def size(cls):
+        cls._initialize_cache()
+        return len(cls._cache['author_ids'])
+
+    @classmethod
+    def ids_of(cls, author_ids):
+        """Ids globales (int32) de varios autores (-1 si no están registrados)."""
+        cls._initialize_cache()
+        return cls._cache['author_ids'].index_of(author_ids).astype(np.int32)
+
+    @classmethod
+    def ids_of_table(cls, table):
+        """
+        Ids globales de cada fila de una StringTable local (para artefactos
+        sin author_global_ids); se busca directo sobre los strings ordenados.
+        Con el diccionario en memoria los autores nuevos se registran.
+        """
+        cls._initialize_cache()
+        if cls._cache['version'] == LEGACY_VERSION:
+            cls._register(table.sorted_values)
+        global_ids = np.empty(len(table), dtype=np.int32)
+        global_ids[table.order] = cls.ids_of(table.sorted_values)
+        return global_ids
+
+    @classmethod
+    def _register(cls, encoded):
+        """Agrega al diccionario en memoria los autores que aún no tiene."""
+        with cls._lock:
+            table = cls._cache['author_ids']
+            ids = table.index_of(encoded)
+            if not (ids < 0).any():
+                return
+            values, _ = _append_authors(table.sorted_values[table.rank], StringTable.encode(encoded), ids)
+            cls._cache = {'version': LEGACY_VERSION, 'author_ids': StringTable.from_strings(values)}
+
+    @classmethod
+    def keys_at(cls, ids):
+        """Strings de varios ids globales (solo se decodifican esas filas)."""
+        cls._initialize_cache()
+        ids = np.asarray(ids, dtype=np.int64)
+        # Un id fuera de rango viene de un artefacto más nuevo que el cache
+        if len(ids) and ids.max() >= len(cls._cache['author_ids']):
+            cls._initialize_cache(force=True)
+        return cls._cache['author_ids'].keys_at(ids)
@@ -0,0 +1,124 @@
+"""
+Precálculo offline de top-k por autor, por bloques de filas.
+
+Las recomendaciones colaborativas (ItemKNN y MF) de un autor son
+deterministas entre reconstrucciones del modelo, así que se calculan una
+vez para todos los autores y se guardan en el artefacto con el mismo
+formato tipo CSR (ver ItemKNN/neighbours.py):
+
+    neighbour_indptr, neighbour_ids, neighbour_scores,
+    neighbour_min, neighbour_max
+
+Cada motor define una función de bloque a nivel de módulo
+(lo, hi, top_m) -> (lengths, ids, scores, row_min, row_max) con las filas
+ordenadas por score descendente. run_blocks la reparte entre n_jobs
+procesos (spawn) que abren las matrices vía mmap desde un directorio
+temporal (shared_arrays) e informa el avance y el throughput.
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+
+import numpy as np
+
+
+@contextmanager
+def shared_arrays(arrays, work_dir=None, prefix="topk_"):
+    """
+    Escribe los arreglos como .npy en un directorio temporal (para que los
+    workers los abran vía mmap) y lo elimina al salir.
+    """
+    tmp_dir = tempfile.mkdtemp(prefix=prefix, dir=work_dir)
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+        yield tmp_dir
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def open_shared(work_dir, name):
+    """Abre vía mmap un arreglo escrito por shared_arrays."""
+    return np.load(os.path.join(work_dir, f"{name}.npy"), mmap_mode="r", allow_pickle=False)
+
+
+def run_blocks(block_fn, n_rows, top_m, block_size, n_jobs=1, initializer=None, initargs=(), label="Top-k"):
+    """
+    Ejecuta block_fn(lo, hi, top_m) sobre bloques de block_size filas.
+
+    Con n_jobs == 1 se ejecuta en el proceso actual (el estado del worker
+    ya debe estar fijado); si no, en un pool spawn que llama a
+    initializer(*initargs) en cada proceso.
+
+    Returns:
+        Lista de resultados en el orden de las filas
+    """
+    start_time = time.time()
+    blocks = [(lo, min(lo + block_size, n_rows)) for lo in range(0, n_rows, block_size)]
+    results = {}
+    print(f"{label}: {n_rows:,} autores, top-{top_m}, {len(blocks)} bloques, {n_jobs} procesos")
+
+    def report(done, lo, hi, seconds):
+        elapsed = time.time() - start_time
+        rows_done = sum(results[b][0].shape[0] for b in results)
+        print(
+            f"  Bloque {done}/{len(blocks)}: filas {lo:,}-{hi:,} en {seconds:.2f}s "
+            f"({(hi - lo) / max(seconds, 1e-9):,.0f} autores/s) | "
+            f"total {rows_done:,}/{n_rows:,} ({rows_done / max(elapsed, 1e-9):,.0f} autores/s)"
+        )
+
+    if n_jobs == 1:
+        for done, (lo, hi) in enumerate(blocks, start=1):
+            block_start = time.time()
+            results[lo] = block_fn(lo, hi, top_m)
+            report(done, lo, hi, time.time() - block_start)
+    else:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=n_jobs, mp_context=context,
+            initializer=initializer, initargs=initargs
+        ) as executor:
+            futures = {executor.submit(_timed_block, block_fn, lo, hi, top_m): (lo, hi) for lo, hi in blocks}
+            for done, future in enumerate(as_completed(futures), start=1):
+                lo, hi = futures[future]
+                result, seconds = future.result()
+                results[lo] = result
+                report(done, lo, hi, seconds)
+
+    elapsed = time.time() - start_time
+    print(f"{label}: {n_rows:,} autores en {elapsed:.1f}s ({n_rows / max(elapsed, 1e-9):,.0f} autores/s)")
+    return [results[lo] for lo, _ in blocks]
+
+
+def _timed_block(block_fn, lo, hi, top_m):
+    start = time.time()
+    result = block_fn(lo, hi, top_m)
+    return result, time.time() - start
+
+
+def assemble_rows(results, n_rows):
+    """
+    Une los resultados de run_blocks en los arreglos neighbour_* del
+    artefacto.
+    """
+    lengths = np.concatenate([r[0] for r in results]) if results else np.zeros(0, dtype=np.int64)
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(lengths)
+
+    def join(position, dtype):
+        if not results:
+            return np.empty(0, dtype=dtype)
+        return np.concatenate([r[position] for r in results]).astype(dtype, copy=False)
+
+    return {
+        "neighbour_indptr": indptr,
+        "neighbour_ids": join(1, np.int32),
+        "neighbour_scores": join(2, np.float32),
+        "neighbour_min": join(3, np.float32),
+        "neighbour_max": join(4, np.float32),
+    }
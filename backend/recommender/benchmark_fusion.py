@@ -0,0 +1,90 @@
+"""
+Benchmark de la fusión híbrida por umbral (threshold_fusion) contra la
+fusión completa: igualdad del top-k, profundidad leída de cada motor y
+latencia.
+
+Uso (desde backend/):
+    python -m recommender.benchmark_fusion
+"""
+
+import numpy as np
+from recommender.benchmarking import sample_authors, timed
+from recommender.hybrid_recommender import HybridRecommender
+from recommender.ItemKNN.queries import ItemKNNQueries
+from recommender.content_based.benchmark_ann import sample_queries
+from recommender.threshold_fusion import CollaborativeStream, ContentBasedStream, threshold_top_k
+
+
+def sample_hybrid_authors(n_authors=200, seed=42):
+    """Autores de ItemKNN con al menos un coautor (el modo híbrido tiene CF)."""
+    ItemKNNQueries._initialize_cache()
+    with_coauthors = np.flatnonzero(np.diff(ItemKNNQueries._cache["X_full"].indptr) > 0)
+    return sample_authors(
+        ItemKNNQueries._cache["author_to_idx"], n_authors=n_authors, seed=seed, rows=with_coauthors
+    )
+
+
+def run_benchmark(ks=(10, 50, 200), n_queries=100, alpha=0.5, beta=0.5,
+                  candidate_budget=None, seed=42):
+    """
+    Compara la fusión por umbral con la fusión completa sobre pares
+    (consulta de conceptos, autor) sintéticos. Retorna una lista de dicts
+    (una fila por k).
+    """
+    pairs = list(zip(
+        sample_queries(n_queries=n_queries, seed=seed),
+        sample_hybrid_authors(n_authors=n_queries, seed=seed)
+    ))
+
+    print(f"Fusión híbrida: {len(pairs)} consultas, alpha={alpha}, beta={beta}")
+    print(
+        f"{'k':>5} | {'iguales':>7} | {'prof. CB':>8} | {'prof. CF':>8} | "
+        f"{'ms completa':>11} | {'ms umbral':>9} | {'speedup':>7}"
+    )
+
+    rows = []
+    for k in ks:
+        def run(fusion):
+            return lambda pair: HybridRecommender.get_top_k(
+                *pair, k, alpha, beta, candidate_budget, fusion=fusion
+            )
+
+        full, full_ms = timed(run('full'), pairs)
+        threshold, threshold_ms = timed(run('threshold'), pairs)
+
+        # Top-k igual = mismos scores híbridos (los empates pueden elegir
+        # autores distintos en ambos modos)
+        same = np.mean([
+            len(f[1]) == len(t[1]) and np.allclose(f[1], t[1])
+            for f, t in zip(full, threshold)
+        ])
+
+        # Fracción de cada ranking leída antes de detenerse
+        cb_depth, cf_depth = [], []
+        for query, author_id in pairs:
+            cb_stream = ContentBasedStream(query)
+            cf_stream = CollaborativeStream(author_id, candidate_budget)
+            if len(cf_stream) == 0:
+                continue
+            depth = threshold_top_k(cb_stream, cf_stream, k, alpha, beta)[-1]
+            cb_depth.append(min(depth, len(cb_stream)) / len(cb_stream))
+            cf_depth.append(min(depth, len(cf_stream)) / len(cf_stream))
+
+        speedup = full_ms / threshold_ms if threshold_ms > 0 else float('inf')
+        print(
+            f"{k:>5} | {same:>7.1%} | {np.mean(cb_depth):>8.2%} | {np.mean(cf_depth):>8.2%} | "
+            f"{full_ms:>11.3f} | {threshold_ms:>9.3f} | {speedup:>6.1f}x"
+        )
+        rows.append({
+            'k': k,
+            'same_top_k': float(same),
+            'cb_depth': float(np.mean(cb_depth)),
+            'cf_depth': float(np.mean(cf_depth)),
+            'full_latency_ms': full_ms,
+            'threshold_latency_ms': threshold_ms,
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,42 @@
+"""
+Utilidades compartidas por los scripts de benchmark de los motores
+(content_based/benchmark_*.py, matrix_factorization/benchmark_*.py,
+benchmark_fusion.py).
+"""
+
+import time
+import numpy as np
+
+
+def timed(fn, items):
+    """
+    Ejecuta fn sobre cada elemento de items.
+
+    Returns:
+        Tupla (results, elapsed_ms) con los resultados en orden y la
+        latencia media por elemento en milisegundos
+    """
+    results = []
+    start = time.perf_counter()
+    for item in items:
+        results.append(fn(item))
+    elapsed_ms = (time.perf_counter() - start) * 1000 / max(len(items), 1)
+    return results, elapsed_ms
+
+
+def sample_authors(author_table, n_authors=200, seed=42, rows=None):
+    """
+    Autores elegidos al azar (sin repetición) de una StringTable de un
+    motor, entre las filas rows (None = todas).
+    """
+    rows = np.arange(len(author_table)) if rows is None else np.asarray(rows)
+    rng = np.random.default_rng(seed)
+    chosen = rng.choice(rows, size=min(n_authors, len(rows)), replace=False)
+    return author_table.keys_at(chosen)
+
+
+def recall_at_k(approx, exact):
+    """Recall medio de los top-k aproximados respecto de los exactos."""
+    return float(np.mean([
+        len(np.intersect1d(a, e)) / max(len(e), 1) for a, e in zip(approx, exact)
+    ]))
@@ -19,6 +19,64 @@ from recommender.content_based.vector_builder import map_concepts, train_model
 
 #train_model(files_dir)
 
+# Con índice ANN (IVF) para búsqueda aproximada (CB_ANN_ENABLED=1)
+#train_model(files_dir, ann_lists=256)
+#from recommender.content_based.benchmark_ann import run_benchmark
+#run_benchmark(k=50)
+
+# Matriz compacta (índices uint16, valores float16/uint8) y reporte de exactitud
+#from recommender.content_based.benchmark_compact import run_report
+#run_report(k=50)
+#train_model(files_dir, value_dtype='uint8')
+
+# Rankings precalculados para consultas de 1 concepto (y pares frecuentes)
+#train_model(files_dir, ranking_top_n=100, ranking_pairs=[
+#    ('https://openalex.org/C154945302', 'https://openalex.org/C119857082'),
+#])
+
+# Update incremental tras refrescar mv_recommendation_author_pool
+#from recommender.content_based.incremental import update_model
+#update_model(files_dir)
+
+# Exportar archivos legacy al formato de artefactos (mmap, sin pickle)
+#from recommender.content_based.vector_builder import export_artifact as export_cb_artifact
+#from recommender.ItemKNN.load_data import export_artifact as export_itemknn_artifact
+#from recommender.matrix_factorization.load_data import export_artifact as export_mf_artifact
+#export_cb_artifact(files_dir)
+#export_itemknn_artifact(files_dir)
+#export_mf_artifact(files_dir)
+
+# Factores MF compactos (float16 / int8 con escala por fila) y fidelidad
+# del ranking frente a float32
+#from recommender.matrix_factorization.benchmark_quantized import run_report as run_mf_report
+#run_mf_report(k=50)
+#export_mf_artifact(files_dir, factor_dtype='int8')
+
+# Índice ANN por producto interno para MF (MF_ANN_ENABLED=1)
+#export_mf_artifact(files_dir, ann_lists=256)
+#from recommender.matrix_factorization.benchmark_ann import run_benchmark as run_mf_ann_benchmark
+#run_mf_ann_benchmark(k=50)
+
+# Top-N colaborativo precalculado para todos los autores (bloques en
+# paralelo); ItemKNNQueries y MFQueries responden con un corte de la tabla
+#export_itemknn_artifact(files_dir, top_m=200, n_jobs=8)
+#export_mf_artifact(files_dir, neighbour_top_m=200, n_jobs=8)
+
+# Diccionario global de autores (id int32 compartido por CB, ItemKNN y MF).
+# Los export/train lo amplían solos; esto registra artefactos anteriores
+#from recommender.authors import build_author_dictionary
+#build_author_dictionary(files_dir)
+
+# Atributos por autor (país, tipo de institución, works, citas) para los
+# filtros de recomendación; reconstruir tras ampliar el diccionario
+#from recommender.author_attributes import build_author_attributes
+#build_author_attributes(files_dir)
+
+# Benchmark de la fusión híbrida por umbral contra la fusión completa (la
+# completa es la por defecto; HYBRID_FUSION=threshold activa la de umbral)
+#from recommender.benchmark_fusion import run_benchmark as run_fusion_benchmark
+#run_fusion_benchmark(ks=(10, 50, 200))
+
 
 #from recommender.matrix_factorization.training_test import run_full_recommendation_system, evaluate_final_full
 #import numpy as np
@@ -27,6 +85,17 @@ from recommender.content_based.vector_builder import map_concepts, train_model
 #files_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ItemKNN/files")
 #print(files_dir)
 #build_author_knn_data(files_dir)
+# Vista global (no solo LatAm)
+#from api.models import MvIaCoauthorship
+#build_author_knn_data(files_dir, source=MvIaCoauthorship)
+# Vista global sin cargar todos los pares en memoria (bloques en disco)
+#from recommender.ItemKNN.out_of_core import build_author_graph_out_of_core
+#build_author_graph_out_of_core(files_dir, chunk_size=1000000, n_partitions=32)
+# Entrenar ItemKNN (barrido de K, similitud en paralelo) y exportar el artefacto
+#from recommender.ItemKNN.trainer import train_itemknn
+#train_itemknn(files_dir, ks=(20, 50, 100, 150, 200), block_size=5000, n_jobs=8)
+#from recommender.ItemKNN.load_data import export_artifact as export_itemknn_artifact
+#export_itemknn_artifact(files_dir)
 
 #from recommender.turbo_cf.data_loader import prepare_turbocf_loo
 #files_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "turbo_cf/files")
@@ -103,6 +172,10 @@ from recommender.content_based.vector_builder import map_concepts, train_model
 #train_dict = build_interaction_dict(df_train, author_to_idx)
 #save_model(results, author_to_idx, train_dict, output_dir=files_dir)
 
+# 5. Servir los embeddings (LightGCNQueries, misma interfaz que MFQueries)
+#from recommender.graph_based.load_data import export_artifact as export_lightgcn_artifact
+#export_lightgcn_artifact(files_dir, neighbour_top_m=200)
+
 
 #from recommender.graph_based_2.train_lightgcn import(
 #  export_to_recbole_inter,
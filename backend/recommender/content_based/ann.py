@@ -0,0 +1,32 @@
+import numpy as np
+from sklearn.preprocessing import normalize
+from recommender import ivf
+
+
+def build_ivf_index(author_matrix, n_lists=256, n_iter=10, sample_size=200000, seed=42):
+    """
+    Construye un índice IVF (inverted file) sobre las filas L2-normalizadas
+    de author_concept_matrix usando k-means esférico (ver recommender/ivf.py).
+
+    Los autores sin conceptos (fila vacía) no se indexan: su similitud es
+    siempre 0 y se rankean igual que en la búsqueda exacta.
+
+    Returns:
+        Tupla (centroids, list_indptr, list_authors):
+            centroids: (n_lists, n_concepts) float32, L2-normalizados
+            list_indptr: (n_lists + 1,) inicio de cada lista en list_authors
+            list_authors: índices de autor agrupados por lista
+    """
+    matrix = normalize(author_matrix.tocsr().astype(np.float32), norm='l2', axis=1)
+    indexed = np.flatnonzero(np.diff(matrix.indptr) > 0)
+    return ivf.build_ivf_index(
+        matrix, rows=indexed, n_lists=n_lists, n_iter=n_iter, sample_size=sample_size, seed=seed
+    )
+
+
+def probe_lists(centroids, list_indptr, list_authors, query_indices, query_weights, n_probe):
+    """
+    Candidatos de una consulta: autores de las n_probe listas cuyo
+    centroide tiene mayor producto punto con el vector de la consulta.
+    """
+    return ivf.probe_lists(centroids, list_indptr, list_authors, query_weights, n_probe, columns=query_indices)
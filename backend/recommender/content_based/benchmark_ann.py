@@ -0,0 +1,75 @@
+"""
+Benchmark de la búsqueda aproximada (IVF) de ContentBasedQueries contra la
+búsqueda exacta: recall@k y latencia para distintos n_probe.
+
+Uso (desde backend/):
+    python -m recommender.content_based.benchmark_ann
+"""
+
+import numpy as np
+from recommender.benchmarking import recall_at_k, timed
+from recommender.content_based.queries import ContentBasedQueries
+
+
+def sample_queries(n_queries=200, max_concepts=5, seed=42):
+    """
+    Consultas sintéticas de 1 a max_concepts conceptos, muestreados según
+    su frecuencia documental (los conceptos populares son más consultados).
+    """
+    ContentBasedQueries._initialize_cache()
+    concept_table = ContentBasedQueries._cache['concept_to_index']
+    postings = ContentBasedQueries._cache['concept_postings']
+
+    popularity = np.diff(postings.indptr).astype(float) + 1.0
+    popularity /= popularity.sum()
+
+    rng = np.random.default_rng(seed)
+    queries = []
+    for _ in range(n_queries):
+        size = rng.integers(1, max_concepts + 1)
+        concept_idx = rng.choice(len(popularity), size=size, replace=False, p=popularity)
+        queries.append([{'id': concept_id} for concept_id in concept_table.keys_at(concept_idx)])
+    return queries
+
+
+def run_benchmark(k=50, n_probes=(1, 2, 4, 8, 16, 32), n_queries=200, seed=42):
+    """
+    Compara recall@k y latencia media de la búsqueda aproximada frente a la
+    exacta. Retorna una lista de dicts (una fila por n_probe).
+    """
+    ContentBasedQueries._initialize_cache()
+    if 'ann_centroids' not in ContentBasedQueries._cache:
+        raise ValueError(
+            "El artefacto content-based no tiene índice ANN: "
+            "ejecuta train_model(files_dir, ann_lists=...)"
+        )
+
+    queries = sample_queries(n_queries=n_queries, seed=seed)
+
+    exact, exact_ms = timed(
+        lambda q: ContentBasedQueries.get_top_k(q, k, approximate=False)[0], queries
+    )
+
+    print(f"Exacto: {exact_ms:.3f} ms/consulta (k={k}, {len(queries)} consultas)")
+    print(f"{'n_probe':>8} | {'recall@k':>9} | {'ms/consulta':>11} | {'speedup':>7}")
+
+    rows = []
+    for n_probe in n_probes:
+        approx, approx_ms = timed(
+            lambda q: ContentBasedQueries.get_top_k(q, k, approximate=True, n_probe=n_probe)[0],
+            queries
+        )
+        recall = recall_at_k(approx, exact)
+        speedup = exact_ms / approx_ms if approx_ms > 0 else float('inf')
+        print(f"{n_probe:>8} | {recall:>9.4f} | {approx_ms:>11.3f} | {speedup:>6.1f}x")
+        rows.append({
+            'n_probe': n_probe,
+            'recall': float(recall),
+            'latency_ms': approx_ms,
+            'exact_latency_ms': exact_ms,
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,95 @@
+"""
+Reporte de memoria y exactitud de la matriz content-based compacta
+(artifacts.CompactCSR) frente a la matriz float32 original.
+
+Para cada value_dtype se construyen en memoria la matriz de autores y las
+posting lists compactas a partir del modelo float32 cargado y se comparan
+los rankings top-k de ContentBasedQueries sobre consultas de muestra.
+
+Uso (desde backend/):
+    python -m recommender.content_based.benchmark_compact
+"""
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from recommender.artifacts import CompactCSR
+from recommender.benchmarking import recall_at_k, timed
+from recommender.content_based.queries import ContentBasedQueries
+from recommender.content_based.benchmark_ann import sample_queries
+
+
+def _csr_nbytes(matrix):
+    return matrix.indptr.nbytes + matrix.indices.nbytes + matrix.data.nbytes
+
+
+def _top_k_all(queries, k):
+    return timed(lambda query: ContentBasedQueries.get_top_k(query, k, approximate=False), queries)
+
+
+def run_report(k=50, value_dtypes=('float32', 'float16', 'uint8'), n_queries=200, seed=42):
+    """
+    Compara memoria, error de los valores y equivalencia de rankings top-k
+    de cada value_dtype contra la matriz float32. Retorna una lista de
+    dicts (una fila por value_dtype).
+    """
+    ContentBasedQueries._initialize_cache()
+    base_cache = ContentBasedQueries._cache
+    if isinstance(base_cache['author_matrix'], CompactCSR):
+        raise ValueError(
+            "El modelo cargado ya es compacto: el reporte necesita el artefacto float32 "
+            "como referencia (train_model sin value_dtype)"
+        )
+
+    author_matrix = csr_matrix(base_cache['author_matrix'])
+    postings = csr_matrix(base_cache['concept_postings'])
+    base_bytes = _csr_nbytes(author_matrix) + _csr_nbytes(postings)
+
+    queries = sample_queries(n_queries=n_queries, seed=seed)
+    exact, exact_ms = _top_k_all(queries, k)
+
+    print(f"Referencia float32: {base_bytes / 1024**2:.2f} MB, {exact_ms:.3f} ms/consulta "
+          f"(k={k}, {len(queries)} consultas)")
+    print(f"{'dtype':>8} | {'MB':>8} | {'ratio':>6} | {'err. máx':>9} | {'recall@k':>8} | "
+          f"{'mismo orden':>11} | {'Δscore máx':>10} | {'ms/consulta':>11}")
+
+    rows = []
+    for value_dtype in value_dtypes:
+        compact_matrix = CompactCSR.from_csr(author_matrix, value_dtype, scale_axis=1)
+        compact_postings = CompactCSR.from_csr(postings, value_dtype, scale_axis=0)
+        compact_bytes = compact_matrix.nbytes + compact_postings.nbytes
+        value_error = float(np.abs(compact_matrix.values() - author_matrix.data).max(initial=0.0))
+
+        ContentBasedQueries._cache = {
+            **base_cache,
+            'author_matrix': compact_matrix,
+            'concept_postings': compact_postings,
+        }
+        try:
+            approx, approx_ms = _top_k_all(queries, k)
+        finally:
+            ContentBasedQueries._cache = base_cache
+
+        recall = recall_at_k([a[0] for a in approx], [e[0] for e in exact])
+        same_order = np.mean([np.array_equal(a[0], e[0]) for a, e in zip(approx, exact)])
+        score_error = max(
+            (float(np.abs(a[1] - e[1]).max(initial=0.0)) for a, e in zip(approx, exact)), default=0.0
+        )
+
+        print(f"{value_dtype:>8} | {compact_bytes / 1024**2:>8.2f} | {compact_bytes / base_bytes:>6.2f} | "
+              f"{value_error:>9.2e} | {recall:>8.4f} | {same_order:>11.3f} | {score_error:>10.2e} | "
+              f"{approx_ms:>11.3f}")
+        rows.append({
+            'value_dtype': value_dtype,
+            'bytes': int(compact_bytes),
+            'ratio': compact_bytes / base_bytes,
+            'max_value_error': value_error,
+            'recall': float(recall),
+            'same_order': float(same_order),
+            'max_score_error': score_error,
+            'latency_ms': approx_ms,
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    run_report()
@@ -0,0 +1,201 @@
+import time
+import numpy as np
+from scipy.sparse import csr_matrix, diags, vstack
+from sklearn.preprocessing import normalize
+from recommender.artifacts import Artifact, artifact_dir
+from recommender.content_based.queries import ARTIFACT_NAME
+from recommender.content_based.ranking_tables import pairs_from_keys
+from recommender.content_based.vector_builder import build_tf_chunk, iter_author_pool, save_artifact
+
+
+def _replace_rows(matrix, row_indices, new_rows):
+    """Reemplaza filas de una CSR (las demás quedan intactas)."""
+    if len(row_indices) == 0:
+        return matrix
+    keep = np.ones(matrix.shape[0], dtype=np.float32)
+    keep[row_indices] = 0.0
+    patch = csr_matrix(
+        (np.ones(len(row_indices), dtype=np.float32), (row_indices, np.arange(len(row_indices)))),
+        shape=(matrix.shape[0], len(row_indices))
+    )
+    result = diags(keep) @ matrix + patch @ new_rows
+    result.eliminate_zeros()
+    return result.tocsr()
+
+
+def _doc_freq(matrix, n_concepts):
+    """Autores con TF > 0 por concepto."""
+    return np.bincount(matrix.indices, minlength=n_concepts).astype(np.int64)
+
+
+def update_model(files_dir, chunk_size=5000, idf_tolerance=1e-3):
+    """
+    Actualiza incrementalmente el modelo content-based a partir de la
+    versión publicada y el estado actual de mv_recommendation_author_pool.
+
+    1) Detecta autores nuevos, eliminados y modificados (TF o works).
+    2) Parcha las filas afectadas de la matriz TF y actualiza DF.
+    3) Recalcula el IDF suave; solo se adopta el nuevo valor de los
+       conceptos cuyo IDF cambió más que idf_tolerance (relativo).
+    4) Re-normaliza solo las filas modificadas/nuevas y las que contienen
+       conceptos con IDF actualizado.
+
+    Si la versión anterior tenía índice ANN se reconstruye con la misma
+    cantidad de listas, si era compacta se mantiene su value_dtype y las
+    tablas de ranking se recalculan con el mismo top-N y pares.
+
+    Requiere un artefacto generado por train_model (con tf_matrix y
+    doc_freq). Retorna la nueva versión publicada.
+    """
+    start = time.time()
+    artifact = Artifact.open(artifact_dir(files_dir, ARTIFACT_NAME))
+    if not (artifact.has('tf_matrix') and artifact.has('doc_freq')):
+        raise ValueError(
+            "El artefacto actual no tiene tf_matrix/doc_freq: ejecuta train_model "
+            "para generar una versión que admita updates incrementales."
+        )
+
+    concept_table = artifact.strings('concept_ids')
+    author_table = artifact.strings('author_ids')
+    n_concepts = len(concept_table)
+    n_old = len(author_table)
+
+    old_tf = artifact.csr('tf_matrix', mmap_mode=None)
+    old_work_counts = artifact.array('author_work_counts', mmap_mode=None)
+    applied_idf = artifact.array('idf_vector', mmap_mode=None).astype(np.float32)
+    if artifact.meta.get('value_dtype'):
+        # Matriz compacta (posiblemente cuantizada): se reconstruye exacta a
+        # partir de TF y el IDF aplicado en vez de decuantizarla
+        old_matrix = old_tf.copy()
+        old_matrix.data *= applied_idf[old_matrix.indices]
+        old_matrix = normalize(old_matrix, norm='l2', axis=1)
+    else:
+        old_matrix = artifact.csr('author_matrix', mmap_mode=None)
+    doc_freq = artifact.array('doc_freq', mmap_mode=None).astype(np.int64)
+
+    # PASO 1: Detectar cambios recorriendo la vista por bloques
+    print("Paso 1/4: Detectando autores nuevos, eliminados y modificados...")
+    seen = np.zeros(n_old, dtype=bool)
+    changed_idx, changed_rows, changed_counts = [], [], []
+    new_ids, new_rows, new_counts = [], [], []
+
+    for chunk in iter_author_pool(chunk_size=chunk_size):
+        chunk_ids, chunk_counts, _, rows, cols, tf = build_tf_chunk(chunk, concept_table)
+        chunk_tf = csr_matrix((tf, (rows, cols)), shape=(len(chunk), n_concepts), dtype=np.float32)
+
+        old_idx = author_table.index_of(chunk_ids)
+        existing = old_idx >= 0
+        seen[old_idx[existing]] = True
+
+        # Autores existentes: comparar fila TF y cantidad de works
+        if existing.any():
+            idx = old_idx[existing]
+            candidate_tf = chunk_tf[np.flatnonzero(existing)]
+            differs = (old_tf[idx] != candidate_tf).getnnz(axis=1) > 0
+            differs |= old_work_counts[idx] != chunk_counts[existing]
+            if differs.any():
+                changed_idx.append(idx[differs])
+                changed_rows.append(candidate_tf[np.flatnonzero(differs)])
+                changed_counts.append(chunk_counts[existing][differs])
+
+        # Autores nuevos
+        if (~existing).any():
+            new_ids.append(chunk_ids[~existing])
+            new_rows.append(chunk_tf[np.flatnonzero(~existing)])
+            new_counts.append(chunk_counts[~existing])
+
+    changed_idx = np.concatenate(changed_idx) if changed_idx else np.empty(0, dtype=np.int64)
+    changed_rows = vstack(changed_rows).tocsr() if changed_rows else csr_matrix((0, n_concepts), dtype=np.float32)
+    new_rows = vstack(new_rows).tocsr() if new_rows else csr_matrix((0, n_concepts), dtype=np.float32)
+    removed_idx = np.flatnonzero(~seen)
+
+    print(f"  Modificados: {len(changed_idx):,} | Nuevos: {new_rows.shape[0]:,} | Eliminados: {len(removed_idx):,}")
+
+    if len(changed_idx) == 0 and new_rows.shape[0] == 0 and len(removed_idx) == 0:
+        print("Sin cambios: se mantiene la versión actual.")
+        return artifact.version
+
+    # PASO 2: Parchar TF y actualizar DF
+    print("Paso 2/4: Actualizando TF y DF...")
+    doc_freq -= _doc_freq(old_tf[np.concatenate([changed_idx, removed_idx])], n_concepts)
+    doc_freq += _doc_freq(changed_rows, n_concepts) + _doc_freq(new_rows, n_concepts)
+
+    tf_matrix = _replace_rows(old_tf, changed_idx, changed_rows)
+
+    # Eliminar autores borrados y agregar los nuevos al final
+    kept = np.flatnonzero(seen)
+    old_to_new = np.full(n_old, -1, dtype=np.int64)
+    old_to_new[kept] = np.arange(len(kept))
+
+    tf_matrix = vstack([tf_matrix[kept], new_rows]).tocsr()
+    author_matrix = vstack([old_matrix[kept], csr_matrix(new_rows.shape, dtype=np.float32)]).tocsr()
+
+    work_counts = old_work_counts.copy()
+    if changed_counts:
+        work_counts[changed_idx] = np.concatenate(changed_counts)
+    work_counts = np.concatenate(
+        [work_counts[kept]] + new_counts
+    ).astype(np.int32)
+
+    author_ids = np.concatenate(
+        [author_table.sorted_values[author_table.rank[kept]]] + new_ids
+    )
+    n_authors = len(author_ids)
+
+    # PASO 3: IDF suave con tolerancia
+    print("Paso 3/4: Recalculando IDF...")
+    exact_idf = (np.log((n_authors + 1) / (doc_freq + 1.0)) + 1.0).astype(np.float32)
+    drift = np.abs(exact_idf - applied_idf) / np.maximum(applied_idf, 1e-12)
+    drifted = np.flatnonzero(drift > idf_tolerance)
+    applied_idf[drifted] = exact_idf[drifted]
+    print(f"  Conceptos con IDF actualizado: {len(drifted):,}/{n_concepts:,}")
+
+    # PASO 4: Re-normalizar solo las filas afectadas
+    print("Paso 4/4: Re-normalizando filas afectadas...")
+    affected = np.zeros(n_authors, dtype=bool)
+    affected[old_to_new[changed_idx]] = True
+    affected[len(kept):] = True
+    if len(drifted):
+        affected |= tf_matrix[:, drifted].getnnz(axis=1) > 0
+    affected_idx = np.flatnonzero(affected)
+
+    affected_tfidf = tf_matrix[affected_idx].copy()
+    affected_tfidf.data *= applied_idf[affected_tfidf.indices]
+    author_matrix = _replace_rows(
+        author_matrix, affected_idx, normalize(affected_tfidf, norm='l2', axis=1)
+    )
+    print(f"  Filas re-normalizadas: {len(affected_idx):,}/{n_authors:,}")
+
+    # Las tablas de ranking se recalculan para los mismos pares
+    ranking_pairs = None
+    if artifact.has('pair_rank_keys'):
+        ranking_pairs = pairs_from_keys(artifact.array('pair_rank_keys'), concept_table, n_concepts)
+
+    metadata = dict(artifact.meta)
+    metadata.update({
+        'n_authors': n_authors,
+        'incremental_from': artifact.version,
+        'n_changed': int(len(changed_idx)),
+        'n_new': int(new_rows.shape[0]),
+        'n_removed': int(len(removed_idx)),
+        'n_idf_updated': int(len(drifted)),
+        'n_rows_renormalized': int(len(affected_idx)),
+    })
+
+    version = save_artifact(
+        files_dir,
+        concept_ids=concept_table.keys(),
+        author_ids=author_ids,
+        author_matrix=author_matrix,
+        idf=applied_idf,
+        work_counts=work_counts,
+        tf_matrix=tf_matrix,
+        doc_freq=doc_freq,
+        metadata=metadata,
+        ann_lists=artifact.meta.get('ann_lists'),
+        value_dtype=artifact.meta.get('value_dtype'),
+        ranking_top_n=artifact.meta.get('ranking_top_n'),
+        ranking_pairs=ranking_pairs,
+    )
+    print(f"Update incremental publicado: versión {version} ({time.time() - start:.1f}s)")
+    return version
@@ -1,32 +1,177 @@
 import os
 import pickle
+import threading
+import time
 import numpy as np
 from scipy.sparse import lil_matrix, load_npz
-from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.preprocessing import normalize
+from recommender.artifacts import Artifact, CompactCSR, StringTable, artifact_dir, current_version
+from recommender.authors import AuthorDictionary, invert_ids
+from recommender.topk import first_allowed, top_k_indices, min_max_normalize
+from recommender.content_based.ann import probe_lists
+
+ARTIFACT_NAME = 'content_based'
+
+
+def pair_key(first, second, n_concepts):
+    """Clave int64 de un par de índices de concepto (sin importar el orden)."""
+    low, high = min(first, second), max(first, second)
+    return int(low) * n_concepts + int(high)
 
 
 class ContentBasedQueries:
     # Cache estático a nivel de clase
     _cache = None
+
+    # Cada cuántos segundos se revisa si hay una nueva versión publicada
+    # (ej. tras un update incremental) para recargar sin reiniciar workers
+    RELOAD_INTERVAL = 30.0
+    _last_version_check = 0.0
+
+    # Búsqueda aproximada (IVF) opcional: requiere un artefacto con índice
+    # ANN (train_model(..., ann_lists=N)). n_probe = listas revisadas
+    ANN_ENABLED = os.getenv('CB_ANN_ENABLED', '0') == '1'
+    ANN_N_PROBE = int(os.getenv('CB_ANN_N_PROBE', '16'))
+
+    # Scoring multi-proceso opcional: la matriz se divide en SHARDS rangos
+    # de filas, cada uno atendido por un proceso persistente (0/1 = apagado)
+    SHARDS = int(os.getenv('CB_SHARDS', '0'))
+    _scorer = None
+    _scorer_lock = threading.Lock()
+
+    # Parámetro de confianza C del Bayesian smoothing
+    CONFIDENCE_PARAM = 50.0
     
     @classmethod
     def _initialize_cache(cls):
-        """Inicializa el cache una sola vez"""
-        if cls._cache is not None:
+        """Inicializa el cache una sola vez (y lo recarga si cambia la versión)"""
+        if cls._cache is not None and not cls._artifact_changed():
             return
         
-        models_dir = os.path.join(
+        models_dir = cls._models_dir()
+        
+        # Preferir el artefacto versionado (mmap, sin pickle); si no existe
+        # se cargan los archivos legacy
+        try:
+            cls._cache = cls._load_artifact(artifact_dir(models_dir, ARTIFACT_NAME))
+        except FileNotFoundError:
+            cls._cache = cls._load_legacy_files(models_dir)
+
+    @staticmethod
+    def _models_dir():
+        return os.path.join(
             os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 
             "files"
         )
-        
+
+    @classmethod
+    def _artifact_changed(cls):
+        """True si CURRENT apunta a otra versión (revisado cada RELOAD_INTERVAL)"""
+        now = time.monotonic()
+        if now - cls._last_version_check < cls.RELOAD_INTERVAL:
+            return False
+        cls._last_version_check = now
+
+        version = current_version(artifact_dir(cls._models_dir(), ARTIFACT_NAME))
+        return version is not None and version != cls._cache['version']
+
+    @classmethod
+    def snapshot(cls):
+        """
+        Cache de la versión cargada. Una recarga reemplaza cls._cache por
+        otro diccionario, así que una consulta que toma un snapshot y lo
+        entrega a get_top_k / global_ids / local_ids ve una sola versión
+        aunque se publique otra mientras se responde.
+        """
+        cls._initialize_cache()
+        return cls._cache
+
+    @classmethod
+    def model_version(cls):
+        """Versión del modelo cargado ('legacy' si viene de los archivos originales)"""
+        return cls.snapshot()['version']
+
+    @classmethod
+    def global_ids(cls, cache=None):
+        """Ids del diccionario global de autores para cada fila local (int32)"""
+        cache = cls.snapshot() if cache is None else cache
+        if 'global_ids' not in cache:
+            cache['global_ids'] = AuthorDictionary.ids_of_table(cache['author_ids'])
+        return cache['global_ids']
+
+    @classmethod
+    def local_ids(cls, cache=None):
+        """Fila local de cada id global (-1 si el autor no está en el modelo)"""
+        cache = cls.snapshot() if cache is None else cache
+        if 'local_ids' not in cache:
+            cache['local_ids'] = invert_ids(cls.global_ids(cache))
+        return cache['local_ids']
+
+    @staticmethod
+    def _load_artifact(root_dir):
+        """Carga el modelo desde el artefacto versionado (arreglos vía mmap)."""
+        artifact = Artifact.open(root_dir)
+        author_ids = artifact.strings('author_ids')
+        concept_to_index = artifact.strings('concept_ids')
+
+        if artifact.has('author_prior'):
+            author_prior = artifact.array('author_prior')
+        else:
+            author_prior = np.zeros(len(author_ids), dtype=np.float32)
+
+        # author_matrix / concept_postings pueden venir como CompactCSR
+        author_matrix = artifact.matrix('author_matrix')
+        cache = {
+            'version': artifact.version,
+            'concept_to_index': concept_to_index,
+            'author_matrix': author_matrix,
+            'author_ids': author_ids,
+            'author_work_counts': artifact.array('author_work_counts'),
+            'author_prior': author_prior,
+            'n_concepts': len(concept_to_index),
+            'idf_vector': artifact.array('idf_vector'),
+            'concept_postings': artifact.matrix('concept_postings'),
+            'work_count_order': artifact.array('work_count_order'),
+        }
+
+        # Fila local -> id del diccionario global de autores
+        if artifact.has('author_global_ids'):
+            cache['global_ids'] = artifact.array('author_global_ids')
+
+        # Masa por concepto (suma de columnas): media de similitud en O(q)
+        if artifact.has('concept_mass'):
+            cache['concept_mass'] = artifact.array('concept_mass')
+        else:
+            cache['concept_mass'] = np.asarray(author_matrix.sum(axis=0), dtype=float).ravel()
+
+        # Rankings precalculados de 1 y 2 conceptos (opcionales)
+        for name in ('concept_rank_indices', 'concept_rank_scores',
+                     'pair_rank_keys', 'pair_rank_indices', 'pair_rank_scores'):
+            if artifact.has(name):
+                cache[name] = artifact.array(name)
+
+        # Índice ANN (IVF) opcional
+        if artifact.has('ann_centroids'):
+            cache['ann_centroids'] = artifact.array('ann_centroids')
+            cache['ann_list_indptr'] = artifact.array('ann_list_indptr')
+            cache['ann_list_authors'] = artifact.array('ann_list_authors')
+
+        return cache
+
+    @staticmethod
+    def _load_legacy_files(models_dir):
+        """Carga el modelo desde los archivos .pkl/.npy/.npz originales."""
         # Cargar archivos
         with open(os.path.join(models_dir, 'concept_mapping.pkl'), 'rb') as f:
-            concept_to_index = pickle.load(f)
+            concept_mapping = pickle.load(f)
+        concept_to_index = StringTable.from_strings(
+            sorted(concept_mapping, key=concept_mapping.get)
+        )
         
         author_matrix = load_npz(os.path.join(models_dir, 'author_concept_matrix.npz'))
-        author_ids = np.load(os.path.join(models_dir, 'cb_author_ids.npy'), allow_pickle=True)
+        author_ids = StringTable.from_strings(
+            np.load(os.path.join(models_dir, 'cb_author_ids.npy'), allow_pickle=True)
+        )
         
         try:
             author_work_counts = np.load(os.path.join(models_dir, 'cb_author_work_counts.npy'))
@@ -47,14 +192,31 @@ class ContentBasedQueries:
             # Si IDF no existe, usamos un vector de 1s para evitar errores de multiplicación.
             idf_vector = np.ones(len(concept_to_index), dtype=np.float32) 
 
-        cls._cache = {
+        # Índice invertido concepto -> autores (CSC traspuesta de la matriz)
+        try:
+            concept_postings = load_npz(os.path.join(models_dir, 'cb_concept_postings.npz')).tocsr()
+        except FileNotFoundError:
+            concept_postings = author_matrix.T.tocsr()
+
+        # Orden de autores por cantidad de works (ascendente): define el
+        # ranking de los autores sin conceptos en común con la consulta
+        try:
+            work_count_order = np.load(os.path.join(models_dir, 'cb_work_count_order.npy'))
+        except FileNotFoundError:
+            work_count_order = np.argsort(author_work_counts, kind='stable')
+
+        return {
+            'version': 'legacy',
             'concept_to_index': concept_to_index,
             'author_matrix': author_matrix,
             'author_ids': author_ids,
             'author_work_counts': author_work_counts,
             'author_prior': author_prior,
             'n_concepts': len(concept_to_index),
-            'idf_vector': idf_vector # Añadir IDF al caché
+            'idf_vector': idf_vector, # Añadir IDF al caché
+            'concept_postings': concept_postings,
+            'work_count_order': work_count_order,
+            'concept_mass': np.asarray(author_matrix.sum(axis=0), dtype=float).ravel(),
         }
 
     
@@ -94,15 +256,21 @@ class ContentBasedQueries:
         return user_vector_final
     
     @staticmethod
-    def apply_bayesian_smoothing(similarities, work_counts, confidence_param=10.0):
+    def apply_bayesian_smoothing(similarities, work_counts, confidence_param=10.0, mean_similarity=None):
         """
         Bayesian smoothing por AUTOR:
         adjusted_score = (C * m_author + n * sim) / (C + n)
+
+        Si se entrega mean_similarity se usa como m en lugar de la media
+        de similarities (útil cuando solo se suaviza un subconjunto).
         """
 
         similarities = np.array(similarities, dtype=float)
         work_counts = np.array(work_counts, dtype=float)
-        m = np.mean(similarities)
+        if mean_similarity is None:
+            m = np.mean(similarities)
+        else:
+            m = float(mean_similarity)
 
         adjusted_scores = (
             confidence_param * m +
@@ -112,28 +280,132 @@ class ContentBasedQueries:
         return adjusted_scores
 
     
+    @staticmethod
+    def _accumulate_postings(postings, query_indices, query_weights, author_range=None):
+        """
+        Acumula la similitud coseno recorriendo solo las posting lists de
+        los conceptos de la consulta.
+
+        Si se entrega author_range=(lo, hi) solo se consideran los autores
+        de ese rango de filas (las posting lists están ordenadas por autor,
+        así que cada lista se recorta con searchsorted sin copiar).
+
+        postings puede ser una CSR de scipy o una CompactCSR; en el caso
+        cuantizado la escala del concepto se aplica al peso de la consulta.
+
+        Returns:
+            Tupla (touched, similarities) con los autores que comparten al
+            menos un concepto (ordenados) y su similitud coseno.
+        """
+        indptr = postings.indptr
+        scale = getattr(postings, 'scale', None)
+
+        authors, weights = [], []
+        for c, w in zip(query_indices, query_weights):
+            start, end = indptr[c], indptr[c + 1]
+            if author_range is not None:
+                lo, hi = np.searchsorted(postings.indices[start:end], author_range)
+                start, end = start + lo, start + hi
+            if scale is not None:
+                w = w * scale[c]
+            authors.append(postings.indices[start:end])
+            weights.append(postings.data[start:end].astype(float) * w)
+
+        if not authors:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=float)
+
+        touched, inverse = np.unique(np.concatenate(authors), return_inverse=True)
+        similarities = np.bincount(
+            inverse, weights=np.concatenate(weights), minlength=len(touched)
+        )
+        return touched, similarities
+
+    @staticmethod
+    def _first_not_in(candidates, excluded):
+        """Filtra de candidates los índices presentes en excluded (ordenado)."""
+        if len(excluded) == 0:
+            return candidates
+        pos = np.minimum(np.searchsorted(excluded, candidates), len(excluded) - 1)
+        return candidates[excluded[pos] != candidates]
+
     @classmethod
-    def get_recommendations(cls, user_input):
+    def _score_ann_candidates(cls, cache, query_indices, query_weights, n_probe):
         """
-        Retorna TODOS los autores ordenados por similitud (sin threshold ni top_k),
-        aplicando Normalización Gaussiana al score y Min-Max para el score de fusión.
-        
+        Similitud coseno exacta solo para los autores de las n_probe listas
+        IVF más cercanas a la consulta.
+        """
+        candidates = np.unique(probe_lists(
+            cache['ann_centroids'],
+            cache['ann_list_indptr'],
+            cache['ann_list_authors'],
+            query_indices,
+            query_weights,
+            n_probe
+        ))
+        if len(candidates) == 0:
+            return candidates, np.empty(0, dtype=float)
+
+        author_matrix = cache['author_matrix']
+        if isinstance(author_matrix, CompactCSR):
+            return candidates, author_matrix.dot_rows(candidates, query_indices, query_weights)
+
+        sub_matrix = author_matrix[candidates][:, query_indices]
+        similarities = sub_matrix @ np.asarray(query_weights, dtype=float)
+        return candidates, np.asarray(similarities, dtype=float).ravel()
+
+    @classmethod
+    def get_top_k(cls, user_input, k=None, approximate=None, n_probe=None, allowed=None, cache=None):
+        """
+        Calcula los k mejores autores sin materializar la lista completa.
+
+        La similitud solo se acumula sobre las posting lists de los
+        conceptos de la consulta. Los autores sin conceptos en común tienen
+        similitud 0 y su score suavizado C*m / (C + n) depende solo de su
+        cantidad de works, por lo que se rankean con un orden precalculado.
+
+        En modo aproximado (índice IVF) solo se puntúan los autores de las
+        n_probe listas más cercanas; la media m se obtiene exacta de la masa
+        por concepto y los autores no revisados se tratan como similitud 0.
+
+        Si el artefacto tiene tablas de ranking, las consultas de un
+        concepto (o de un par precalculado) con k <= top-N se leen de ellas.
+
+        Con SHARDS > 1 (y k definido) la matriz se reparte en rangos de
+        filas puntuados en paralelo por procesos persistentes; el resultado
+        es el mismo que en un solo proceso.
+
+        allowed (máscara booleana por fila) restringe el top-k a los
+        autores permitidos antes de seleccionarlo; los scores no cambian
+        (el Min-Max sigue siendo sobre todos los autores). Las consultas
+        filtradas no usan los shards.
+
+        cache (ver snapshot) fija la versión del modelo: los índices
+        retornados son filas de esa versión y se traducen con
+        global_ids(cache).
+
         Args:
             user_input: Lista de conceptos del usuario con formato:
                     [{'id': concept_id}, ...]
-        
+            k: Cantidad de autores a retornar (None = todos)
+            approximate: Usar el índice ANN (None = ANN_ENABLED)
+            n_probe: Listas IVF a revisar (None = ANN_N_PROBE)
+            allowed: Máscara de autores permitidos (None = todos)
+            cache: Snapshot del modelo (None = la versión cargada)
+
         Returns:
-            Lista de tuplas (author_id, score_min_max, z_score) ordenadas descendente
-        """ # <--- Se modifica la documentación para reflejar los 3 valores.
-        
+            Tupla (indices, scores) de arreglos NumPy ordenados descendente,
+            donde indices son filas de author_concept_matrix y scores el
+            score Min-Max normalizado sobre TODOS los autores.
+        """
         # Inicializar cache si es necesario
-        cls._initialize_cache()
+        cache = cls.snapshot() if cache is None else cache
         
-        concept_to_index = cls._cache['concept_to_index']
-        author_matrix = cls._cache['author_matrix']
-        author_ids = cls._cache['author_ids']
-        n_concepts = cls._cache['n_concepts']
-        idf_vector = cls._cache['idf_vector'] # Obtener el vector IDF del caché
+        concept_to_index = cache['concept_to_index']
+        n_concepts = cache['n_concepts']
+        idf_vector = cache['idf_vector'] # Obtener el vector IDF del caché
+        work_counts = cache['author_work_counts']
+        order = cache['work_count_order']
+        n_authors = len(work_counts)
         
         # Crear vector de usuario TF-IDF normalizado (L2)
         user_vector = cls.create_user_vector(
@@ -142,46 +414,227 @@ class ContentBasedQueries:
             concept_to_index, 
             idf_vector # Pasar el vector IDF
         )
-        
-        # Calcular similitud coseno directamente
-        similarities = cosine_similarity(user_vector, author_matrix)[0]
+        query_indices, query_weights = user_vector.indices, user_vector.data
+
+        # Consultas de 1 o 2 conceptos: lectura de la tabla precalculada
+        precomputed = cls._lookup_ranking_table(cache, query_indices, k, allowed)
+        if precomputed is not None:
+            return precomputed
+
+        use_ann = cls.ANN_ENABLED if approximate is None else approximate
+        if use_ann and k is not None and 'ann_centroids' in cache:
+            touched, similarities = cls._score_ann_candidates(
+                cache, query_indices, query_weights, n_probe or cls.ANN_N_PROBE
+            )
+            return cls._rank_top_k(
+                touched, similarities, cls._mean_similarity(cache, query_indices, query_weights), k,
+                work_counts, order, allowed=allowed
+            )
 
+        scorer = cls._sharded_scorer(cache) if k is not None and allowed is None else None
+        if scorer is not None:
+            # Cada shard puntúa su rango de filas y retorna su top-k local
+            return scorer.top_k(
+                query_indices, query_weights, cls._mean_similarity(cache, query_indices, query_weights), k
+            )
 
-        # Aplicar Bayesian Smoothing usando score_prior (Comentado, pero disponible)
-        similarities = cls.apply_bayesian_smoothing(
-             similarities,
-             cls._cache['author_work_counts'],
-             confidence_param=50.0
+        # Similitud coseno solo sobre autores que comparten conceptos
+        touched, similarities = cls._accumulate_postings(
+            cache['concept_postings'], query_indices, query_weights
         )
+        mean_similarity = similarities.sum() / n_authors
 
+        return cls._rank_top_k(touched, similarities, mean_similarity, k, work_counts, order, allowed=allowed)
 
-        
-        epsilon = 1e-8
+    @classmethod
+    def _lookup_ranking_table(cls, cache, query_indices, k, allowed=None):
+        """
+        Top-k precalculado para consultas de un concepto o de un par
+        presente en la tabla (None si no hay tabla o k excede su largo).
+        Con allowed se filtra la fila completa y solo se responde si quedan
+        al menos k autores permitidos.
+        """
+        if k is None or 'concept_rank_indices' not in cache:
+            return None
+        if k > cache['concept_rank_indices'].shape[1]:
+            return None
 
-        # Normalización min-max para posicion relativa
-        min_sim = similarities.min()
-        max_sim = similarities.max()
-        if (max_sim - min_sim) > epsilon:
-            similarities_norm = (similarities - min_sim) / (max_sim - min_sim)
+        if len(query_indices) == 1:
+            indices, scores = cache['concept_rank_indices'], cache['concept_rank_scores']
+            row = query_indices[0]
+        elif len(query_indices) == 2 and 'pair_rank_keys' in cache:
+            keys = cache['pair_rank_keys']
+            key = pair_key(query_indices[0], query_indices[1], cache['n_concepts'])
+            row = np.searchsorted(keys, key)
+            if row >= len(keys) or keys[row] != key:
+                return None
+            indices, scores = cache['pair_rank_indices'], cache['pair_rank_scores']
         else:
-            # Caso para evitar división por cero (si todos los scores son iguales)
-            similarities_norm = np.zeros_like(similarities)
+            return None
+
+        if allowed is None:
+            return np.array(indices[row, :k], dtype=np.int64), np.array(scores[row, :k])
+
+        keep = allowed[indices[row]]
+        if np.count_nonzero(keep) < k:
+            return None
+        return (
+            np.array(indices[row][keep][:k], dtype=np.int64),
+            np.array(scores[row][keep][:k])
+        )
+
+    @staticmethod
+    def _mean_similarity(cache, query_indices, query_weights):
+        """Media de la similitud coseno sobre todos los autores, a partir de la masa por concepto."""
+        n_authors = len(cache['author_work_counts'])
+        return float(cache['concept_mass'][query_indices] @ query_weights) / n_authors
+
+    @classmethod
+    def _sharded_scorer(cls, cache):
+        """
+        Pool de procesos por shards para la versión del snapshot (None si
+        está desactivado o si el modelo viene de los archivos legacy).
+        """
+        if cls.SHARDS <= 1 or cache['version'] == 'legacy':
+            return None
+
+        with cls._scorer_lock:
+            if cls._scorer is None or cls._scorer.version != cache['version']:
+                from recommender.content_based.sharding import ShardedScorer
+                if cls._scorer is not None:
+                    cls._scorer.close()
+                cls._scorer = ShardedScorer(
+                    artifact_dir(cls._models_dir(), ARTIFACT_NAME),
+                    cache['version'],
+                    cls.SHARDS
+                )
+        return cls._scorer
+
+    @classmethod
+    def _rank_top_k(cls, touched, similarities, mean_similarity, k, work_counts, order, allowed=None):
+        """
+        Aplica Bayesian smoothing y Min-Max a partir de las similitudes de
+        los autores puntuados (touched); el resto tiene similitud 0.
+
+        work_counts y order (autores ordenados por works) son los del
+        snapshot consultado (o los del modelo al precalcular tablas de
+        ranking). allowed restringe los autores rankeados (no las
+        estadísticas Min-Max).
+        """
+        n_authors = len(work_counts)
+
+        if k is None or k >= n_authors:
+            # Ranking completo: se densifica el vector de similitudes
+            all_similarities = np.zeros(n_authors, dtype=float)
+            all_similarities[touched] = similarities
+            smoothed = cls.apply_bayesian_smoothing(
+                all_similarities,
+                work_counts,
+                confidence_param=cls.CONFIDENCE_PARAM,
+                mean_similarity=mean_similarity
+            )
+            if allowed is None:
+                top_indices = top_k_indices(smoothed, k)
+            else:
+                permitted = np.flatnonzero(allowed)
+                top_indices = permitted[top_k_indices(smoothed[permitted], k)]
+            top_scores = min_max_normalize(
+                smoothed[top_indices], smoothed.min(), smoothed.max()
+            )
+            return top_indices, top_scores
+
+        candidates, candidate_scores, min_score, max_score = cls._select_candidates(
+            touched, similarities, mean_similarity, k, work_counts, order, allowed
+        )
+
+        # Las estadísticas Min-Max se calculan sobre todos los autores,
+        # pero solo se normalizan y ordenan los k ganadores
+        top = top_k_indices(candidate_scores, k)
+        top_scores = min_max_normalize(candidate_scores[top], min_score, max_score)
+
+        return candidates[top], top_scores
+
+    @classmethod
+    def _select_candidates(cls, touched, similarities, mean_similarity, k, work_counts, order,
+                           allowed=None):
+        """
+        Candidatos al top-k entre los autores de `order` (todos, o los de un
+        shard) y el mínimo/máximo del score suavizado sobre esos autores.
+
+        Args:
+            touched: Autores puntuados (ordenados) y similarities su similitud
+            work_counts: Cantidad de works por autor (indexado globalmente)
+            order: Autores considerados, ordenados por works ascendente
+            allowed: Máscara de autores que pueden ser candidatos (None =
+                todos); el mínimo/máximo se calcula igual sobre todos
+
+        Returns:
+            Tupla (candidates, candidate_scores, min_score, max_score)
+        """
+        confidence_param = cls.CONFIDENCE_PARAM
+        n_authors = len(order)
+
+        # Aplicar Bayesian Smoothing a los autores con conceptos en común
+        smoothed_touched = cls.apply_bayesian_smoothing(
+            similarities,
+            work_counts[touched],
+            confidence_param=confidence_param,
+            mean_similarity=mean_similarity
+        )
+
+        # Autores sin conceptos en común: score = C*m / (C + n), que es
+        # decreciente en n. Basta con revisar los extremos del orden por works
+        # (saltando los autores ya considerados).
+        n_skip = len(touched)
+        best_untouched = cls._first_not_in(order[:k + n_skip], touched)[:k]
+        worst_untouched = cls._first_not_in(order[max(0, n_authors - n_skip - 1):], touched)[-1:]
+
+        def untouched_scores(indices):
+            return confidence_param * mean_similarity / (
+                confidence_param + work_counts[indices].astype(float)
+            )
+
+        candidates = np.concatenate([touched, best_untouched])
+        candidate_scores = np.concatenate([smoothed_touched, untouched_scores(best_untouched)])
+        extremes = np.concatenate([candidate_scores, untouched_scores(worst_untouched)])
+
+        if allowed is not None:
+            # Solo los permitidos compiten por el top-k: los k primeros del
+            # orden por works que no estén puntuados y pasen el filtro
+            eligible = allowed.copy()
+            eligible[touched] = False
+            best_untouched = first_allowed(order, eligible, k)
+            keep = allowed[touched]
+            candidates = np.concatenate([touched[keep], best_untouched])
+            candidate_scores = np.concatenate([
+                smoothed_touched[keep], untouched_scores(best_untouched)
+            ])
+
+        return candidates, candidate_scores, extremes.min(), extremes.max()
+
+    @classmethod
+    def get_recommendations(cls, user_input, k=None, allowed=None):
+        """
+        Retorna los k autores más similares (todos si k es None),
+        usando Min-Max como score de fusión.
         
-        #K_SIM_SCALER = 5.0
-        #center_point_sim = np.median(similarities)
-        #similarities_centered = similarities - center_point_sim
-        #similarities_norm = 1.0 / (1.0 + np.exp(-K_SIM_SCALER * similarities_centered))
+        Args:
+            user_input: Lista de conceptos del usuario con formato:
+                    [{'id': concept_id}, ...]
+            k: Cantidad de autores a retornar (None = todos)
+            allowed: Máscara de autores permitidos (None = todos)
         
-        # Ordenar autores por similitud descendentes
-        # 💡 NOTA: Se mantiene la ordenación basada en Min-Max (similarities_norm)
-        sorted_indices = np.argsort(-similarities_norm)
-        sorted_author_ids = author_ids[sorted_indices]
-        sorted_scores = similarities_norm[sorted_indices] # Min-Max score
+        Returns:
+            Lista de tuplas (author_id, score_min_max) ordenadas descendente
+        """
+        cache = cls.snapshot()
+        top_indices, top_scores = cls.get_top_k(user_input, k, allowed=allowed, cache=cache)
+        author_ids = cache['author_ids']
 
-        # Empaquetar resultados: (author_id, score_min_max, z_score)
+        # Empaquetar resultados: (author_id, score_min_max)
         recommendations = [
             (author_id, float(score))
-            for author_id, score in zip(sorted_author_ids, sorted_scores)
+            for author_id, score in zip(author_ids.keys_at(top_indices), top_scores)
         ]
         
-        return recommendations
\ No newline at end of file
+        return recommendations
@@ -0,0 +1,92 @@
+"""
+Tablas de ranking precalculadas para consultas de uno o dos conceptos.
+
+Gran parte de las consultas eligen solo uno o dos conceptos del
+autocompletado. Para cada concepto (y para los pares indicados) se guarda
+el top-N de autores ya suavizado y normalizado, calculado con el mismo
+código de ContentBasedQueries, de modo que esas consultas se responden
+con una lectura de la tabla.
+"""
+
+import time
+import numpy as np
+from recommender.artifacts import StringTable
+from recommender.content_based.queries import ContentBasedQueries, pair_key
+
+
+def build_ranking_tables(postings, concept_ids, idf, work_counts, top_n=100, pairs=None):
+    """
+    Precalcula el top-N de cada concepto y de cada par de conceptos.
+
+    Args:
+        postings: Posting lists concepto -> autores (CSR o CompactCSR),
+            las mismas que usará ContentBasedQueries
+        concept_ids: IDs de concepto en orden de índice
+        idf: Vector IDF aplicado
+        work_counts: Cantidad de works por autor
+        top_n: Largo de cada ranking (se acota al total de autores)
+        pairs: Lista opcional de pares (concept_id, concept_id)
+
+    Returns:
+        Dict nombre -> arreglo para guardar en el artefacto:
+            concept_rank_indices / concept_rank_scores: (n_concepts, top_n)
+            pair_rank_keys (ordenadas), pair_rank_indices, pair_rank_scores
+    """
+    start_time = time.time()
+    concept_table = concept_ids if isinstance(concept_ids, StringTable) else StringTable.from_strings(concept_ids)
+    n_concepts = len(concept_table)
+    work_counts = np.asarray(work_counts, dtype=np.int32)
+    order = np.argsort(work_counts, kind='stable').astype(np.int32)
+    n_authors = len(work_counts)
+    top_n = min(top_n, n_authors)
+
+    def rank(query_concepts):
+        user_vector = ContentBasedQueries.create_user_vector(
+            [{'id': concept_id} for concept_id in query_concepts], n_concepts, concept_table, idf
+        )
+        touched, similarities = ContentBasedQueries._accumulate_postings(
+            postings, user_vector.indices, user_vector.data
+        )
+        return ContentBasedQueries._rank_top_k(
+            touched, similarities, similarities.sum() / n_authors, top_n, work_counts, order
+        )
+
+    concept_keys = concept_table.keys()
+    tables = {
+        'concept_rank_indices': np.zeros((n_concepts, top_n), dtype=np.int32),
+        'concept_rank_scores': np.zeros((n_concepts, top_n), dtype=np.float64),
+    }
+    for concept_idx, concept_id in enumerate(concept_keys):
+        indices, scores = rank([concept_id])
+        tables['concept_rank_indices'][concept_idx] = indices
+        tables['concept_rank_scores'][concept_idx] = scores
+
+    # Pares: se descartan conceptos desconocidos, pares repetidos y (c, c)
+    pair_ids = {}
+    for first, second in pairs or []:
+        first_idx, second_idx = concept_table.get(first), concept_table.get(second)
+        if first_idx is None or second_idx is None or first_idx == second_idx:
+            continue
+        pair_ids[pair_key(first_idx, second_idx, n_concepts)] = (first, second)
+
+    if pair_ids:
+        keys = np.array(sorted(pair_ids), dtype=np.int64)
+        tables['pair_rank_keys'] = keys
+        tables['pair_rank_indices'] = np.zeros((len(keys), top_n), dtype=np.int32)
+        tables['pair_rank_scores'] = np.zeros((len(keys), top_n), dtype=np.float64)
+        for row, key in enumerate(keys):
+            indices, scores = rank(pair_ids[key])
+            tables['pair_rank_indices'][row] = indices
+            tables['pair_rank_scores'][row] = scores
+
+    print(
+        f"Tablas de ranking: {n_concepts} conceptos y {len(pair_ids)} pares, "
+        f"top-{top_n} en {time.time() - start_time:.1f}s"
+    )
+    return tables
+
+
+def pairs_from_keys(keys, concept_ids, n_concepts):
+    """Reconstruye los pares (concept_id, concept_id) desde pair_rank_keys."""
+    keys = np.asarray(keys, dtype=np.int64)
+    return list(zip(concept_ids.keys_at(keys // n_concepts), concept_ids.keys_at(keys % n_concepts)))
@@ -0,0 +1,117 @@
+"""
+Scoring content-based multi-proceso por shards de filas.
+
+La matriz de autores se divide en rangos contiguos de filas [lo, hi)
+balanceados por cantidad de no-ceros. Cada shard lo atiende un proceso
+persistente que abre el artefacto vía mmap (las páginas se comparten entre
+procesos a través del page cache, sin copiar la matriz) y recorre solo el
+tramo de cada posting list que cae en su rango.
+
+Por consulta, cada shard retorna su top-k local del score suavizado junto
+con el mínimo y máximo del shard; el proceso principal mezcla los top-k y
+normaliza con el Min-Max global.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from recommender.artifacts import Artifact
+from recommender.topk import top_k_indices, min_max_normalize
+from recommender.content_based.queries import ContentBasedQueries
+
+# Estado del shard dentro de cada proceso worker (lo fija _init_shard)
+_shard = None
+
+
+def _init_shard(root_dir, version, lo, hi):
+    """Abre el artefacto en el worker y prepara el orden por works del shard."""
+    global _shard
+    artifact = Artifact.open(root_dir, version)
+    order = artifact.array('work_count_order')
+    _shard = {
+        'range': (lo, hi),
+        'postings': artifact.matrix('concept_postings'),
+        'work_counts': artifact.array('author_work_counts'),
+        'order': np.ascontiguousarray(order[(order >= lo) & (order < hi)]),
+    }
+
+
+def _score_shard(query_indices, query_weights, mean_similarity, k):
+    """Top-k local del shard: (candidates, scores, min_score, max_score)."""
+    touched, similarities = ContentBasedQueries._accumulate_postings(
+        _shard['postings'], query_indices, query_weights, author_range=_shard['range']
+    )
+    candidates, scores, min_score, max_score = ContentBasedQueries._select_candidates(
+        touched, similarities, mean_similarity, k, _shard['work_counts'], _shard['order']
+    )
+    top = top_k_indices(scores, k)
+    return candidates[top], scores[top], min_score, max_score
+
+
+def shard_bounds(indptr, n_shards):
+    """
+    Límites de n_shards rangos contiguos de filas con una cantidad similar
+    de no-ceros (el costo de puntuar un shard es proporcional a ellos).
+    """
+    n_rows = len(indptr) - 1
+    n_shards = max(1, min(n_shards, n_rows))
+    targets = np.linspace(0, indptr[-1], n_shards + 1)
+    bounds = np.searchsorted(indptr, targets).clip(0, n_rows)
+    bounds[0], bounds[-1] = 0, n_rows
+    return np.unique(bounds)
+
+
+class ShardedScorer:
+    """
+    Pool persistente con un proceso por shard de filas de la matriz.
+
+    Los procesos se crean con 'spawn' (no heredan locks ni hilos del
+    servidor web) y viven hasta close() o hasta que se publique otra versión.
+    """
+
+    def __init__(self, root_dir, version, n_shards):
+        artifact = Artifact.open(root_dir, version)
+        bounds = shard_bounds(artifact.array('author_matrix.indptr'), n_shards)
+
+        self.version = version
+        self.bounds = bounds
+        context = multiprocessing.get_context('spawn')
+        self.executors = [
+            ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=context,
+                initializer=_init_shard,
+                initargs=(root_dir, version, int(lo), int(hi))
+            )
+            for lo, hi in zip(bounds[:-1], bounds[1:])
+        ]
+        print(f"Scoring CB por shards: {len(self.executors)} procesos (versión {version})")
+
+    def top_k(self, query_indices, query_weights, mean_similarity, k):
+        """
+        Top-k global mezclando los top-k de cada shard.
+
+        Returns:
+            Tupla (indices, scores) igual a ContentBasedQueries.get_top_k
+        """
+        query_indices = np.asarray(query_indices)
+        query_weights = np.asarray(query_weights)
+        futures = [
+            executor.submit(_score_shard, query_indices, query_weights, mean_similarity, k)
+            for executor in self.executors
+        ]
+        results = [future.result() for future in futures]
+
+        candidates = np.concatenate([r[0] for r in results])
+        scores = np.concatenate([r[1] for r in results])
+        min_score = min(r[2] for r in results)
+        max_score = max(r[3] for r in results)
+
+        top = top_k_indices(scores, k)
+        return candidates[top], min_max_normalize(scores[top], min_score, max_score)
+
+    def close(self):
+        """Termina los procesos del pool."""
+        for executor in self.executors:
+            executor.shutdown(wait=False, cancel_futures=True)
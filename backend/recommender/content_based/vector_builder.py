@@ -1,9 +1,14 @@
 import os
-import math
 import pickle
+from itertools import chain
 import numpy as np
-from scipy.sparse import lil_matrix, save_npz
+from scipy.sparse import csr_matrix, load_npz, save_npz
 from sklearn.preprocessing import normalize
+from recommender.artifacts import ArtifactWriter, CompactCSR, StringTable, artifact_dir
+from recommender.authors import register_authors
+from recommender.content_based.queries import ARTIFACT_NAME
+from recommender.content_based.ann import build_ivf_index
+from recommender.content_based.ranking_tables import build_ranking_tables
 from api.models import MvIaConcept, MvLatamIaAuthorConcept, MvRecommendationAuthorPool
 
 
@@ -27,12 +32,116 @@ def map_concepts(files_dir):
     print(f"Mapeo de conceptos creado: {len(concept_mapping)} conceptos")
 
 
-def train_model(files_dir):
+def iter_author_pool(chunk_size=5000):
+    """
+    Recorre mv_recommendation_author_pool en bloques usando un cursor del
+    lado del servidor (QuerySet.iterator), sin materializar objetos ORM.
+
+    Yields:
+        Listas de tuplas (author_id, concept_ids, concept_tfs)
+    """
+    qs = (
+        MvRecommendationAuthorPool.objects
+        .order_by('author_id')
+        .values_list('author_id', 'concept_ids', 'concept_tfs')
+    )
+
+    chunk = []
+    for row in qs.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def build_tf_chunk(chunk, concept_table, row_offset=0):
+    """
+    Convierte un bloque de autores a arreglos COO de TF sublineal.
+
+    Args:
+        chunk: Lista de tuplas (author_id, concept_ids, concept_tfs)
+        concept_table: StringTable concepto -> índice
+        row_offset: Índice de fila del primer autor del bloque
+
+    Returns:
+        Tupla (author_ids, work_counts, doc_freq, rows, cols, tf) donde
+        author_ids es un arreglo de bytes (dtype S), doc_freq el aporte del
+        bloque a la frecuencia documental y rows/cols/tf las celdas con
+        TF > 0 (una por autor y concepto).
+    """
+    author_ids = StringTable.encode([author_id for author_id, _, _ in chunk])
+    concept_lists = [concept_ids or [] for _, concept_ids, _ in chunk]
+    tf_lists = [concept_tfs or [] for _, _, concept_tfs in chunk]
+
+    # Cantidad de works: suma de todos los TF del autor
+    tf_lengths = np.fromiter((len(t) for t in tf_lists), dtype=np.int64, count=len(chunk))
+    all_tfs = np.fromiter(chain.from_iterable(tf_lists), dtype=np.float64, count=int(tf_lengths.sum()))
+    work_counts = np.bincount(
+        np.repeat(np.arange(len(chunk)), tf_lengths), weights=all_tfs, minlength=len(chunk)
+    ).astype(np.int32)
+
+    # Cada concepto se alinea con su TF (0 si el arreglo de TF es más corto)
+    lengths = np.fromiter((len(c) for c in concept_lists), dtype=np.int64, count=len(chunk))
+    n_cells = int(lengths.sum())
+    flat_concepts = list(chain.from_iterable(concept_lists))
+    flat_tfs = np.fromiter(
+        chain.from_iterable(
+            t[:len(c)] if len(t) >= len(c) else list(t) + [0] * (len(c) - len(t))
+            for c, t in zip(concept_lists, tf_lists)
+        ),
+        dtype=np.float64,
+        count=n_cells
+    )
+    rows = np.repeat(np.arange(len(chunk), dtype=np.int64), lengths)
+    cols = concept_table.index_of(flat_concepts) if n_cells else np.empty(0, dtype=np.int64)
+
+    # Solo conceptos del mapeo
+    in_mapping = cols >= 0
+    rows, cols, flat_tfs = rows[in_mapping], cols[in_mapping], flat_tfs[in_mapping]
+
+    # DF: un concepto cuenta para el autor si alguna aparición tiene TF > 0
+    n_concepts = len(concept_table)
+    cell_keys = rows * n_concepts + cols
+    present_keys = np.unique(cell_keys[flat_tfs > 0])
+    doc_freq = np.bincount(present_keys % n_concepts, minlength=n_concepts)
+
+    # Conceptos repetidos en un autor: se conserva la última aparición
+    # (como la asignación celda a celda original)
+    _, last = np.unique(cell_keys[::-1], return_index=True)
+    last = len(cell_keys) - 1 - last
+    rows, cols, flat_tfs = rows[last], cols[last], flat_tfs[last]
+
+    # TF sublineal: 1 + log(tf), solo para TF positivos
+    positive = flat_tfs > 0
+    rows, cols = rows[positive], cols[positive]
+    tf = (1.0 + np.log(flat_tfs[positive])).astype(np.float32)
+
+    return (
+        author_ids, work_counts, doc_freq,
+        (rows + row_offset).astype(np.int32), cols.astype(np.int32), tf
+    )
+
+
+def train_model(files_dir, chunk_size=5000, ann_lists=None, value_dtype=None,
+                ranking_top_n=None, ranking_pairs=None):
     """
     Entrena el modelo usando:
     1) Term Frequency (TF) basada en conteo de papers.
     2) Ponderación por Inverse Document Frequency (IDF) suave.
     3) Normalización L2.
+
+    Los autores se leen en bloques con un cursor del lado del servidor y se
+    acumulan como arreglos COO de NumPy, por lo que el tiempo y la memoria
+    escalan con el nnz de la matriz y no con objetos de Python por autor.
+
+    Con ann_lists se construye también un índice IVF de ann_lists listas
+    para la búsqueda aproximada de ContentBasedQueries. Con value_dtype
+    ('float32', 'float16' o 'uint8') el artefacto guarda la matriz en
+    formato compacto (ver artifacts.CompactCSR). Con ranking_top_n se
+    precalcula el top-N de cada concepto y, opcionalmente, de los pares más
+    frecuentes de las consultas (ranking_pairs: [(concept_id, concept_id)]).
     """
     # Cargar mapping de conceptos
     concept_mapping_path = os.path.join(files_dir, "concept_mapping.pkl")
@@ -40,85 +149,54 @@ def train_model(files_dir):
         concept_to_index = pickle.load(f)
     
     n_concepts = len(concept_to_index)
+    concept_ids = sorted(concept_to_index, key=concept_to_index.get)
+    concept_table = StringTable.from_strings(concept_ids)
     
-    # Cargar autores
-    print("Cargando autores...")
-    authors_data = list(MvRecommendationAuthorPool.objects.all().order_by('author_id'))
-    n_authors = len(authors_data)
+    # PASO 1: Construir TF (Term Frequency) por bloques
+    print("Paso 1/3: Construyendo TF (Frecuencia Absoluta) por bloques...")
+    author_id_chunks, work_count_chunks = [], []
+    row_chunks, col_chunks, tf_chunks = [], [], []
+    concept_doc_freq = np.zeros(n_concepts, dtype=np.int64)
+    n_authors = 0
+
+    for chunk in iter_author_pool(chunk_size=chunk_size):
+        author_ids_chunk, work_counts_chunk, doc_freq, rows, cols, tf = build_tf_chunk(
+            chunk, concept_table, row_offset=n_authors
+        )
+        concept_doc_freq += doc_freq
+        author_id_chunks.append(author_ids_chunk)
+        work_count_chunks.append(work_counts_chunk)
+        row_chunks.append(rows)
+        col_chunks.append(cols)
+        tf_chunks.append(tf)
+        n_authors += len(chunk)
+        print(f"  Procesados {n_authors:,} autores...")
 
-    
     print(f"Procesando {n_authors:,} autores con {n_concepts} conceptos...")
-    
-    # PASO 1: Construir TF (Term Frequency) y calcular DF (Document Frequency)
-    matrix_tf = lil_matrix((n_authors, n_concepts), dtype=np.float32)
-    author_ids = []
-    author_work_counts = []
-    
-    # Para calcular DF (Document Frequency)
-    concept_doc_freq = np.zeros(n_concepts, dtype=np.int32)
-    
-    print("Paso 1/3: Construyendo TF (Frecuencia Absoluta) y calculando DF...")
-    for author_idx, author in enumerate(authors_data):
-        author_ids.append(author.author_id)
-        
-        concept_ids = author.concept_ids or []
-        concept_tfs = author.concept_tfs or []
-        
-        # Obtener cantidad de works (se mantiene por si se usa en metadata/otros)
-        work_count = getattr(author, 'works_count', sum(concept_tfs)) 
-        author_work_counts.append(work_count)
-        
-        # Marcar conceptos presentes para este autor (para DF)
-        concepts_present = set()
-        
-        for i, concept_id in enumerate(concept_ids):
-            if concept_id not in concept_to_index:
-                continue
-            
-            concept_idx = concept_to_index[concept_id]
-            
-            # TF: Ahora es la frecuencia de papers (Conteo Absoluto)
-            tf_value = float(concept_tfs[i]) if i < len(concept_tfs) else 0.0
-            
-            # Opcional: Aplicar Sublinear TF si se desea reducir el efecto de las frecuencias altas
-            if tf_value > 0:
-                tf_value = 1 + math.log(tf_value)
-            
-            matrix_tf[author_idx, concept_idx] = tf_value
-            
-            # Registrar concepto presente
-            if tf_value > 0:
-                 concepts_present.add(concept_idx)
-        
-        # Incrementar DF para conceptos presentes en este autor
-        for concept_idx in concepts_present:
-            concept_doc_freq[concept_idx] += 1
-        
-        if (author_idx + 1) % 10000 == 0:
-            print(f"  Procesados {author_idx + 1:,}/{n_authors:,} autores...")
-    
-    # Convertir a CSR para operaciones eficientes
-    matrix_tf = matrix_tf.tocsr()
+
+    author_ids = np.concatenate(author_id_chunks) if author_id_chunks else np.empty(0, dtype='S1')
+    author_work_counts = (
+        np.concatenate(work_count_chunks) if work_count_chunks else np.empty(0, dtype=np.int32)
+    )
+    rows = np.concatenate(row_chunks) if row_chunks else np.empty(0, dtype=np.int32)
+    cols = np.concatenate(col_chunks) if col_chunks else np.empty(0, dtype=np.int32)
+    tf = np.concatenate(tf_chunks) if tf_chunks else np.empty(0, dtype=np.float32)
+    del author_id_chunks, work_count_chunks, row_chunks, col_chunks, tf_chunks
+
+    matrix_tf = csr_matrix((tf, (rows, cols)), shape=(n_authors, n_concepts), dtype=np.float32)
+    del rows, cols, tf
     
     # PASO 2: Aplicar IDF (Inverse Document Frequency)
     print("Paso 2/3: Aplicando TF-IDF (con Smooth IDF)...")
     
     # Implementamos la fórmula Smooth IDF estándar: IDF(c) = log((N + 1) / (df(c) + 1)) + 1
     # Esto asegura robustez (no división por cero) y mejor ponderación
-    idf = np.zeros(n_concepts, dtype=np.float32)
     N = n_authors # El número total de autores/documentos
+    idf = (np.log((N + 1) / (concept_doc_freq + 1.0)) + 1.0).astype(np.float32)
     
-    for concept_idx in range(n_concepts):
-        df = concept_doc_freq[concept_idx]
-        
-        # Uso de Smooth IDF
-        idf[concept_idx] = math.log((N + 1) / (df + 1)) + 1.0
-    
-    # Aplicar IDF a la matriz TF
-    matrix_tfidf = matrix_tf.multiply(idf)
-    
-    # Liberar memoria
-    del matrix_tf
+    # Aplicar IDF a la matriz TF (la TF se conserva para updates incrementales)
+    matrix_tfidf = matrix_tf.copy()
+    matrix_tfidf.data *= idf[matrix_tfidf.indices]
     
     # PASO 3: Normalización L2 por filas (autores)
     print("Paso 3/3: Normalizando con L2...")
@@ -138,11 +216,22 @@ def train_model(files_dir):
     # Guardar author_ids y work counts
     np.save(
         os.path.join(files_dir, 'cb_author_ids.npy'),
-        np.array(author_ids, dtype=object),
+        np.array([a.decode('utf-8') for a in author_ids], dtype=object),
         allow_pickle=True
     )
     
     np.save(os.path.join(files_dir, 'cb_author_work_counts.npy'), np.array(author_work_counts, dtype=np.int32))
+
+    # Índice invertido concepto -> autores (CSC traspuesta) para que las
+    # consultas solo recorran las posting lists de los conceptos elegidos
+    save_npz(os.path.join(files_dir, 'cb_concept_postings.npz'), matrix_final.T.tocsr())
+
+    # Orden de autores por works (ascendente) para rankear analíticamente
+    # a los autores sin conceptos en común con la consulta
+    np.save(
+        os.path.join(files_dir, 'cb_work_count_order.npy'),
+        np.argsort(np.array(author_work_counts, dtype=np.int32), kind='stable')
+    )
     
     # Estadísticas (Resto del código de metadata...)
     work_counts_array = np.array(author_work_counts)
@@ -161,6 +250,24 @@ def train_model(files_dir):
     
     with open(os.path.join(files_dir, 'model_metadata.pkl'), 'wb') as f:
         pickle.dump(metadata, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # Artefacto versionado (mmap, sin pickle) que consume ContentBasedQueries
+    version = save_artifact(
+        files_dir,
+        concept_ids=concept_ids,
+        author_ids=author_ids,
+        author_matrix=matrix_final,
+        idf=idf,
+        work_counts=np.array(author_work_counts, dtype=np.int32),
+        tf_matrix=matrix_tf,
+        doc_freq=concept_doc_freq,
+        metadata=metadata,
+        ann_lists=ann_lists,
+        value_dtype=value_dtype,
+        ranking_top_n=ranking_top_n,
+        ranking_pairs=ranking_pairs,
+    )
+    print(f"Artefacto publicado: versión {version}")
     
     print("\n=== Entrenamiento completado ===")
     print(f"Total autores: {n_authors:,}")
@@ -172,4 +279,115 @@ def train_model(files_dir):
     print(f"Sparsity: {metadata['sparsity']*100:.2f}%")
     print(f"IDF promedio (Smooth): {metadata['mean_idf']:.4f}")
     print(f"IDF rango (Smooth): [{metadata['min_idf']:.4f}, {metadata['max_idf']:.4f}]")
-    print(f"Tamaño matriz: {matrix_final.data.nbytes / (1024**2):.2f} MB")
\ No newline at end of file
+    print(f"Tamaño matriz: {matrix_final.data.nbytes / (1024**2):.2f} MB")
+
+
+def save_artifact(files_dir, concept_ids, author_ids, author_matrix, idf, work_counts,
+                  tf_matrix=None, doc_freq=None, metadata=None, ann_lists=None, value_dtype=None,
+                  ranking_top_n=None, ranking_pairs=None):
+    """
+    Publica una nueva versión del artefacto content-based.
+
+    Guarda tablas de strings de ancho fijo y arreglos numéricos planos que
+    ContentBasedQueries abre con mmap. Si se entregan tf_matrix (TF
+    sublineal sin IDF) y doc_freq, el artefacto admite updates
+    incrementales (ver incremental.update_model). Con ann_lists se
+    construye además el índice IVF para búsqueda aproximada.
+
+    Con value_dtype la matriz de autores y las posting lists se guardan
+    como CompactCSR: índices de concepto uint16 y valores float32, float16
+    o uint8 (cuantizados con una escala por concepto).
+
+    Con ranking_top_n se precalcula el top-N de cada concepto y de los
+    pares de ranking_pairs (ver ranking_tables). Los autores se registran
+    en el diccionario global (author_global_ids). Retorna la versión
+    publicada.
+    """
+    author_matrix = author_matrix.tocsr().astype(np.float32)
+
+    writer = ArtifactWriter(artifact_dir(files_dir, ARTIFACT_NAME))
+    writer.add_strings('concept_ids', concept_ids)
+    writer.add_strings('author_ids', author_ids)
+    writer.add_array('author_global_ids', register_authors(files_dir, author_ids))
+    postings = author_matrix.T.tocsr()
+    if value_dtype is None:
+        writer.add_csr('author_matrix', author_matrix)
+        writer.add_csr('concept_postings', postings)
+    else:
+        postings = CompactCSR.from_csr(postings, value_dtype, scale_axis=0)
+        writer.add_compact_csr(
+            'author_matrix', CompactCSR.from_csr(author_matrix, value_dtype, scale_axis=1)
+        )
+        writer.add_compact_csr('concept_postings', postings)
+    writer.add_array('idf_vector', np.asarray(idf, dtype=np.float32))
+    writer.add_array('author_work_counts', np.asarray(work_counts, dtype=np.int32))
+    writer.add_array(
+        'work_count_order',
+        np.argsort(np.asarray(work_counts, dtype=np.int32), kind='stable').astype(np.int32)
+    )
+    if tf_matrix is not None:
+        writer.add_csr('tf_matrix', tf_matrix.tocsr().astype(np.float32))
+    if doc_freq is not None:
+        writer.add_array('doc_freq', np.asarray(doc_freq, dtype=np.int64))
+
+    # Masa por concepto (suma de columnas): permite calcular la similitud
+    # media de una consulta sin recorrer los autores
+    writer.add_array('concept_mass', np.asarray(author_matrix.sum(axis=0), dtype=np.float64).ravel())
+
+    # Índice IVF opcional para búsqueda aproximada
+    if ann_lists:
+        centroids, list_indptr, list_authors = build_ivf_index(author_matrix, n_lists=ann_lists)
+        writer.add_array('ann_centroids', centroids)
+        writer.add_array('ann_list_indptr', list_indptr)
+        writer.add_array('ann_list_authors', list_authors)
+
+    # Rankings precalculados para consultas de 1 o 2 conceptos (sobre las
+    # mismas posting lists que se sirven, compactas o no)
+    if ranking_top_n:
+        tables = build_ranking_tables(
+            postings, concept_ids, np.asarray(idf, dtype=np.float32), work_counts,
+            top_n=ranking_top_n, pairs=ranking_pairs
+        )
+        for name, array in tables.items():
+            writer.add_array(name, array)
+
+    writer.set_meta(**(metadata or {}))
+    writer.set_meta(ann_lists=ann_lists, value_dtype=value_dtype, ranking_top_n=ranking_top_n)
+    return writer.commit()
+
+
+def export_artifact(files_dir, ann_lists=None, value_dtype=None, ranking_top_n=None, ranking_pairs=None):
+    """
+    Convierte los archivos legacy (concept_mapping.pkl, cb_author_ids.npy,
+    author_concept_matrix.npz, ...) al formato de artefacto versionado.
+    """
+    with open(os.path.join(files_dir, 'concept_mapping.pkl'), 'rb') as f:
+        concept_to_index = pickle.load(f)
+
+    author_matrix = load_npz(os.path.join(files_dir, 'author_concept_matrix.npz'))
+    author_ids = np.load(os.path.join(files_dir, 'cb_author_ids.npy'), allow_pickle=True)
+
+    try:
+        work_counts = np.load(os.path.join(files_dir, 'cb_author_work_counts.npy'))
+    except FileNotFoundError:
+        work_counts = np.ones(len(author_ids), dtype=np.int32)
+
+    try:
+        idf = np.load(os.path.join(files_dir, 'cb_idf_vector.npy'))
+    except FileNotFoundError:
+        idf = np.ones(len(concept_to_index), dtype=np.float32)
+
+    version = save_artifact(
+        files_dir,
+        concept_ids=sorted(concept_to_index, key=concept_to_index.get),
+        author_ids=author_ids,
+        author_matrix=author_matrix,
+        idf=idf,
+        work_counts=work_counts,
+        ann_lists=ann_lists,
+        value_dtype=value_dtype,
+        ranking_top_n=ranking_top_n,
+        ranking_pairs=ranking_pairs,
+    )
+    print(f"Artefacto content-based exportado: versión {version}")
+    return version
@@ -0,0 +1,25 @@
+import os
+import numpy as np
+from recommender.graph_based.queries import ARTIFACT_NAME
+from recommender.matrix_factorization.load_data import export_factors
+
+
+def export_artifact(files_dir, factor_dtype='float32', ann_lists=None, neighbour_top_m=None, n_jobs=None):
+    """
+    Convierte los archivos de save_model (lightgcn_idx_to_author.npy,
+    lightgcn_embeddings.npy) al formato de artefacto versionado. Las
+    opciones son las mismas que las del artefacto MF (ver
+    matrix_factorization/load_data.export_artifact).
+    """
+    idx_to_author = np.load(
+        os.path.join(files_dir, "lightgcn_idx_to_author.npy"),
+        allow_pickle=True
+    ).item()
+    E = np.load(os.path.join(files_dir, "lightgcn_embeddings.npy")).astype(np.float32)
+    author_ids = [idx_to_author[i] for i in range(len(idx_to_author))]
+
+    version = export_factors(
+        files_dir, ARTIFACT_NAME, E, author_ids, factor_dtype, ann_lists, neighbour_top_m, n_jobs
+    )
+    print(f"Artefacto LightGCN exportado: versión {version}")
+    return version
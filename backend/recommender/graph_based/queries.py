@@ -0,0 +1,38 @@
+import os
+import numpy as np
+from recommender.artifacts import StringTable
+from recommender.matrix_factorization.queries import MFQueries
+
+ARTIFACT_NAME = 'lightgcn'
+
+
+class LightGCNQueries(MFQueries):
+    """
+    Recomendaciones por producto interno de los embeddings de LightGCN.
+
+    Los embeddings finales (promedio de capas) ya incorporan la
+    propagación por el grafo, así que servir es igual que con los factores
+    de MF: misma interfaz (get_top_k, get_recommendations, model_version,
+    global_ids) y mismas opciones de artefacto (factores compactos, índice
+    ANN y listas precalculadas).
+    """
+
+    # Cache propio (no se comparte con MFQueries)
+    _cache = None
+
+    ARTIFACT_NAME = ARTIFACT_NAME
+
+    @staticmethod
+    def _load_legacy_files(files_dir):
+        """Carga los embeddings desde los archivos .npy de save_model."""
+        idx_to_author = np.load(
+            os.path.join(files_dir, "lightgcn_idx_to_author.npy"),
+            allow_pickle=True
+        ).item()
+        return {
+            'version': 'legacy',
+            'author_to_idx': StringTable.from_strings(
+                [idx_to_author[i] for i in range(len(idx_to_author))]
+            ),
+            'U': np.load(os.path.join(files_dir, "lightgcn_embeddings.npy"))
+        }
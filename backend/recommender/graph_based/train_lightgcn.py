@@ -0,0 +1,469 @@
+"""
+Entrenamiento de LightGCN en CPU (NumPy + SciPy sparse), sin GPU ni torch.
+
+Reemplaza el notebook lightgcn/train.ipynb (torch_geometric en GPU):
+
+    1. Pares únicos de coautoría como índices de autor (desde la BD con
+       load_graph_data_efficient o desde archivos con
+       load_graph_data_from_files).
+    2. Split leave-one-out triple (train/val/test) igual al del notebook,
+       sobre los autores con >= 2 colaboraciones.
+    3. La adyacencia normalizada Â = D^-1/2 A D^-1/2 del grafo de train se
+       calcula una sola vez (CSR float32). Los embeddings finales son el
+       promedio de las capas E = (E0 + ÂE0 + ... + Â^L E0) / (L + 1), y
+       como Â es simétrica el gradiente respecto de E0 se obtiene
+       propagando el gradiente de E con las mismas L multiplicaciones.
+    4. Pérdida BPR con la regularización de torch_geometric (norma de los
+       embeddings de capa 0 de los nodos del batch) y Adam. Los tripletas
+       (autor, coautor, negativo) se muestrean vectorizados sobre la CSR;
+       las que no consiguen un negativo válido no entran en la pérdida.
+    5. Grid sobre embedding_dims × Ks (capas) × reg_lambdas con early
+       stopping sobre NDCG@K de validación, evaluado en una muestra de
+       sample_size autores (sample_size=None evalúa a todos).
+
+Archivos generados por save_model en output_dir (formato que carga
+LightGCNQueries):
+    lightgcn_embeddings.npy        embeddings finales float32 (autores × dim)
+    lightgcn_idx_to_author.npy     dict índice -> author_id
+    lightgcn_author_to_idx.npy     dict author_id -> índice
+    lightgcn_train_interactions.npz coautores de train de cada autor (CSR)
+"""
+
+import os
+import time
+from itertools import product
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix, diags, save_npz
+from scipy.special import expit
+from recommender.ItemKNN.trainer import (
+    build_csr, coverage_novelty, load_pairs, recall_ndcg_at_k, triple_loo_split
+)
+from recommender.matrix_factorization.training_test import load_author_ids, recommend_top_k
+
+
+# ===============================================================
+# 1. DATOS Y SPLIT
+# ===============================================================
+def _pair_indices(df, author_to_idx):
+    """Índices de autor de un DataFrame de pares (IDs de OpenAlex o índices)."""
+    pair_min, pair_max = df["pair_min"], df["pair_max"]
+    if pair_min.dtype == object:
+        pair_min, pair_max = pair_min.map(author_to_idx), pair_max.map(author_to_idx)
+    return pair_min.to_numpy(dtype=np.int64), pair_max.to_numpy(dtype=np.int64)
+
+
+def _pairs_frame(pair_min, pair_max):
+    return pd.DataFrame({
+        "pair_min": np.asarray(pair_min, dtype=np.int32),
+        "pair_max": np.asarray(pair_max, dtype=np.int32),
+    })
+
+
+def load_graph_data_from_files(files_dir):
+    """
+    Pares únicos guardados por build_author_knn_data (df_pairs_unique.pkl),
+    build_author_graph_out_of_core o load_graph_data_efficient
+    (pairs_unique.npz + author_ids.npy).
+
+    Returns:
+        Tupla (df_pairs_unique, author_to_idx, author_list); los pares
+        vienen como índices int32 (columnas pair_min, pair_max)
+    """
+    pair_min, pair_max, _ = load_pairs(files_dir)
+    author_list = load_author_ids(files_dir)
+    author_to_idx = {author_id: idx for idx, author_id in enumerate(author_list)}
+    print(f"Pares únicos: {len(pair_min):,} | Autores: {len(author_list):,}")
+    return _pairs_frame(pair_min, pair_max), author_to_idx, author_list
+
+
+def load_graph_data_efficient(files_dir=None, source=None, chunk_size=100000):
+    """
+    Lee los pares de coautoría desde la BD por bloques (IDs como bytes de
+    ancho fijo, sin objetos de Python por par) y los traduce a índices.
+    Con files_dir se guardan pairs_unique.npz y author_ids.npy para
+    volver a cargarlos con load_graph_data_from_files.
+
+    Returns:
+        Tupla (df_pairs_unique, author_to_idx, author_list)
+    """
+    # Django solo se importa al leer la BD
+    from recommender.ItemKNN.load_data import iter_coauthorships
+    if source is None:
+        from api.models import MvIaCoauthorshipLatam as source
+
+    first_chunks, second_chunks = [], []
+    n_rows = 0
+    for first, second, _ in iter_coauthorships(source, chunk_size=chunk_size):
+        keep = first != second
+        first_chunks.append(first[keep])
+        second_chunks.append(second[keep])
+        n_rows += len(first)
+        print(f"  Leídas {n_rows:,} filas...")
+
+    n_pairs = sum(len(chunk) for chunk in first_chunks)
+    authors, inverse = np.unique(np.concatenate(first_chunks + second_chunks), return_inverse=True)
+    del first_chunks, second_chunks
+    i, j = inverse[:n_pairs], inverse[n_pairs:]
+    pair_min, pair_max = np.minimum(i, j), np.maximum(i, j)
+
+    # Primera aparición de cada par, en el orden de lectura
+    n = np.int64(len(authors))
+    _, first_seen = np.unique(pair_min.astype(np.int64) * n + pair_max, return_index=True)
+    first_seen = np.sort(first_seen)
+    pair_min, pair_max = pair_min[first_seen], pair_max[first_seen]
+
+    if files_dir is not None:
+        os.makedirs(files_dir, exist_ok=True)
+        np.savez(os.path.join(files_dir, "pairs_unique.npz"), pair_min=pair_min, pair_max=pair_max)
+        np.save(os.path.join(files_dir, "author_ids.npy"), authors, allow_pickle=False)
+
+    author_list = [a.decode("utf-8") for a in authors]
+    author_to_idx = {author_id: idx for idx, author_id in enumerate(author_list)}
+    print(f"Pares únicos: {len(pair_min):,} | Autores: {len(author_list):,}")
+    return _pairs_frame(pair_min, pair_max), author_to_idx, author_list
+
+
+def leave_one_out_split(df_pairs_unique, author_to_idx, seed=42):
+    """
+    Filtra los autores con >= 2 colaboraciones y aplica el split LOO
+    triple del notebook (ver ItemKNN.trainer.triple_loo_split).
+
+    Returns:
+        Tupla (df_train, df_val, df_test) con pares como índices int32
+    """
+    pair_min, pair_max = _pair_indices(df_pairs_unique, author_to_idx)
+    degree = np.bincount(np.concatenate([pair_min, pair_max]), minlength=len(author_to_idx))
+    eligible = (degree[pair_min] >= 2) & (degree[pair_max] >= 2)
+    f_min, f_max = pair_min[eligible], pair_max[eligible]
+    print(f"Autores elegibles (>=2): {np.count_nonzero(degree >= 2):,}")
+    print(f"Pares tras filtrado: {len(f_min):,}")
+
+    train_idx, val_idx, test_idx = triple_loo_split(f_min, f_max, seed=seed)
+    return tuple(_pairs_frame(f_min[idx], f_max[idx]) for idx in (train_idx, val_idx, test_idx))
+
+
+def build_interaction_dict(df, author_to_idx):
+    """Dict índice de autor -> arreglo de coautores (índices) en df."""
+    pair_min, pair_max = _pair_indices(df, author_to_idx)
+    X = build_csr(pair_min, pair_max, len(author_to_idx))
+    return {
+        int(u): X.indices[X.indptr[u]:X.indptr[u + 1]].copy()
+        for u in np.flatnonzero(np.diff(X.indptr))
+    }
+
+
+# ===============================================================
+# 2. MODELO
+# ===============================================================
+def build_normalized_adjacency(X):
+    """Â = D^-1/2 A D^-1/2 de la matriz binaria simétrica X (CSR float32)."""
+    X = X.tocsr().astype(np.float32)
+    X.data[:] = 1.0
+    degree = np.asarray(X.sum(axis=1)).ravel()
+    inv_sqrt = np.zeros_like(degree)
+    inv_sqrt[degree > 0] = degree[degree > 0] ** -0.5
+    D = diags(inv_sqrt.astype(np.float32))
+    A_hat = (D @ X @ D).tocsr().astype(np.float32)
+    A_hat.sort_indices()
+    return A_hat
+
+
+def propagate(A_hat, E0, n_layers):
+    """Promedio de las capas E0, ÂE0, ..., Â^L E0 (también es el gradiente de E0)."""
+    layer = E0
+    total = E0.copy()
+    for _ in range(n_layers):
+        layer = A_hat @ layer
+        total += layer
+    return total / (n_layers + 1)
+
+
+def pair_keys(X):
+    """Claves fila * n_autores + columna de la CSR X (con índices ordenados), ordenadas."""
+    n_authors = X.shape[0]
+    return np.repeat(np.arange(n_authors, dtype=np.int64), np.diff(X.indptr)) * n_authors + X.indices
+
+
+def sample_bpr_batch(X, users, batch_size, rng, keys=None, max_rounds=5):
+    """
+    Tripletas (autor, coautor, negativo) vectorizadas: autor uniforme entre
+    users, coautor uniforme entre sus pares de X y negativo uniforme entre
+    todos los autores (se re-muestrea si es coautor o el mismo autor).
+
+    keys son las claves de pair_keys(X); conviene calcularlas una vez por
+    entrenamiento. Las tripletas cuyo negativo sigue siendo inválido tras
+    max_rounds se descartan, así que el batch puede quedar más corto.
+    """
+    n_authors = X.shape[0]
+    if keys is None:
+        keys = pair_keys(X)
+    u = users[rng.integers(0, len(users), size=batch_size)]
+    starts = X.indptr[u]
+    degree = X.indptr[u + 1] - starts
+    p = X.indices[starts + (rng.random(batch_size) * degree).astype(np.int64)]
+
+    def invalid_negatives(n):
+        query = u.astype(np.int64) * n_authors + n
+        pos = np.minimum(np.searchsorted(keys, query), len(keys) - 1)
+        return (keys[pos] == query) | (n == u)
+
+    n = rng.integers(0, n_authors, size=batch_size)
+    invalid = invalid_negatives(n)
+    for _ in range(max_rounds):
+        if not invalid.any():
+            break
+        n[invalid] = rng.integers(0, n_authors, size=np.count_nonzero(invalid))
+        invalid = invalid_negatives(n)
+
+    valid = ~invalid
+    return u[valid], p[valid], n[valid]
+
+
+def _bpr_step(A_hat, E0, n_layers, u, p, n, reg_lambda):
+    """Pérdida BPR + regularización y su gradiente respecto de E0."""
+    E = propagate(A_hat, E0, n_layers)
+    e_u, e_p, e_n = E[u], E[p], E[n]
+    x = np.einsum("ij,ij->i", e_u, e_p - e_n)
+
+    batch_size = len(u)
+    nodes = np.unique(np.concatenate([u, p, n]))
+    loss = float(np.logaddexp(0.0, -x).mean()) + reg_lambda * float((E0[nodes] ** 2).sum()) / batch_size
+
+    # dL/dx = -sigmoid(-x) / B
+    coef = (-expit(-x) / batch_size).astype(np.float32)[:, None]
+    grad_E = np.zeros_like(E0)
+    np.add.at(grad_E, u, coef * (e_p - e_n))
+    np.add.at(grad_E, p, coef * e_u)
+    np.add.at(grad_E, n, -coef * e_u)
+
+    grad = propagate(A_hat, grad_E, n_layers)
+    grad[nodes] += (2.0 * reg_lambda / batch_size) * E0[nodes]
+    return loss, grad
+
+
+def evaluate_embeddings(E, X_seen, X_target, authors, K=20):
+    """Recall, NDCG, coverage y novelty @K por producto interno (sin pares de X_seen)."""
+    indptr, ids = recommend_top_k(E, X_seen, authors, K)
+    recall, ndcg = recall_ndcg_at_k(indptr, ids, authors, X_target, K)
+    _, novelty = coverage_novelty(ids, indptr, X_seen, K)
+    coverage = len(np.unique(ids)) / X_seen.shape[0]
+    return {"recall": recall, "ndcg": ndcg, "coverage": coverage, "novelty": novelty}
+
+
+def train_lightgcn(
+    X_train,
+    embedding_dim=64,
+    n_layers=3,
+    reg_lambda=1e-5,
+    epochs=30,
+    batch_size=2048,
+    batches_per_epoch=200,
+    lr=1e-3,
+    seed=42,
+    X_val=None,
+    val_authors=None,
+    eval_K=20,
+    eval_every=5,
+    early_stopping_patience=3
+):
+    """
+    Entrena LightGCN sobre la matriz simétrica X_train.
+
+    Con X_val y val_authors se evalúa NDCG@eval_K cada eval_every épocas y
+    se conservan los embeddings de la mejor evaluación (early stopping tras
+    early_stopping_patience evaluaciones sin mejora).
+
+    Returns:
+        Dict con embeddings (E final float32), best_epoch, best_metrics e
+        history (loss media por época)
+    """
+    rng = np.random.default_rng(seed)
+    X_train = X_train.tocsr()
+    X_train.sort_indices()
+    n_authors = X_train.shape[0]
+    A_hat = build_normalized_adjacency(X_train)
+    users = np.flatnonzero(np.diff(X_train.indptr))
+    keys = pair_keys(X_train)
+
+    # Inicialización Xavier uniforme (como torch_geometric.nn.LightGCN)
+    bound = np.sqrt(6.0 / (n_authors + embedding_dim))
+    E0 = rng.uniform(-bound, bound, size=(n_authors, embedding_dim)).astype(np.float32)
+
+    # Adam
+    m, v = np.zeros_like(E0), np.zeros_like(E0)
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    step = 0
+
+    history = []
+    best = {"epoch": epochs, "metrics": None, "E": None}
+    stale = 0
+    for epoch in range(1, epochs + 1):
+        start = time.time()
+        losses = []
+        for _ in range(batches_per_epoch):
+            u, p, n = sample_bpr_batch(X_train, users, batch_size, rng, keys)
+            if len(u) == 0:
+                continue
+            loss, grad = _bpr_step(A_hat, E0, n_layers, u, p, n, reg_lambda)
+            losses.append(loss)
+
+            step += 1
+            m = beta1 * m + (1 - beta1) * grad
+            v = beta2 * v + (1 - beta2) * grad * grad
+            m_hat = m / (1 - beta1 ** step)
+            v_hat = v / (1 - beta2 ** step)
+            E0 -= (lr * m_hat / (np.sqrt(v_hat) + eps)).astype(np.float32)
+        history.append(float(np.mean(losses)) if losses else float("nan"))
+
+        if X_val is None or epoch % eval_every and epoch != epochs:
+            continue
+
+        E = propagate(A_hat, E0, n_layers)
+        metrics = evaluate_embeddings(E, X_train, X_val, val_authors, eval_K)
+        print(
+            f"    Época {epoch:3} | loss {history[-1]:.4f} | NDCG@{eval_K}: {metrics['ndcg']:.4f} "
+            f"| Recall@{eval_K}: {metrics['recall']:.4f} ({time.time() - start:.1f}s/época)"
+        )
+        if best["metrics"] is None or metrics["ndcg"] > best["metrics"]["ndcg"]:
+            best = {"epoch": epoch, "metrics": metrics, "E": E}
+            stale = 0
+        else:
+            stale += 1
+            if stale >= early_stopping_patience:
+                print(f"    Early stopping en la época {epoch} (mejor: {best['epoch']})")
+                break
+
+    E = best["E"] if best["E"] is not None else propagate(A_hat, E0, n_layers)
+    return {
+        "embeddings": E.astype(np.float32),
+        "best_epoch": best["epoch"],
+        "best_metrics": best["metrics"],
+        "history": history,
+    }
+
+
+# ===============================================================
+# 3. TUNING, TEST Y MODELO FINAL
+# ===============================================================
+def train_and_tune_lightgcn(
+    df_train,
+    df_val,
+    df_test,
+    author_to_idx,
+    embedding_dims=(32, 64),
+    Ks=(2, 3),
+    reg_lambdas=(1e-6, 1e-5),
+    epochs=30,
+    batch_size=2048,
+    batches_per_epoch=200,
+    lr=1e-3,
+    eval_K=20,
+    eval_every=5,
+    early_stopping_patience=3,
+    seed=42,
+    sample_size=10000
+):
+    """
+    Grid search sobre validación (evaluación muestreada con sample_size
+    autores), evaluación del mejor modelo en test entrenando con train +
+    val, y embeddings finales entrenados con todos los pares.
+
+    Returns:
+        Dict con best_params, grid (una fila por configuración), test
+        (métricas) y embeddings (modelo final)
+    """
+    start_time = time.time()
+    n_authors = len(author_to_idx)
+    train_min, train_max = _pair_indices(df_train, author_to_idx)
+    val_min, val_max = _pair_indices(df_val, author_to_idx)
+    test_min, test_max = _pair_indices(df_test, author_to_idx)
+
+    X_train = build_csr(train_min, train_max, n_authors)
+    X_val = build_csr(val_min, val_max, n_authors)
+    val_authors = np.flatnonzero(np.diff(X_val.indptr))
+    if sample_size is not None and sample_size < len(val_authors):
+        val_authors = np.sort(np.random.default_rng(seed).choice(val_authors, size=sample_size, replace=False))
+
+    train_kwargs = {
+        "epochs": epochs, "batch_size": batch_size, "batches_per_epoch": batches_per_epoch,
+        "lr": lr, "seed": seed,
+    }
+
+    # --- FASE 1: GRID SEARCH ---
+    print(f"\n--- FASE 1: Tuning con {len(val_authors):,} autores de validación ---")
+    grid = []
+    for embedding_dim, n_layers, reg_lambda in product(embedding_dims, Ks, reg_lambdas):
+        print(f"Dim: {embedding_dim} | Capas: {n_layers} | Reg: {reg_lambda}")
+        t0 = time.time()
+        result = train_lightgcn(
+            X_train, embedding_dim, n_layers, reg_lambda, X_val=X_val, val_authors=val_authors,
+            eval_K=eval_K, eval_every=eval_every, early_stopping_patience=early_stopping_patience,
+            **train_kwargs
+        )
+        metrics = result["best_metrics"]
+        grid.append({
+            "embedding_dim": embedding_dim, "n_layers": n_layers, "reg_lambda": reg_lambda,
+            "recall": metrics["recall"], "ndcg": metrics["ndcg"],
+            "best_epoch": result["best_epoch"], "seconds": time.time() - t0,
+        })
+        print(f"  -> NDCG@{eval_K}: {metrics['ndcg']:.4f} | Recall@{eval_K}: {metrics['recall']:.4f} "
+              f"| época {result['best_epoch']} ({time.time() - t0:.1f}s)")
+
+    best = max(grid, key=lambda row: row["ndcg"])
+    best_params = {
+        "embedding_dim": best["embedding_dim"], "n_layers": best["n_layers"],
+        "reg_lambda": best["reg_lambda"], "epochs": best["best_epoch"],
+    }
+
+    # --- FASE 2: EVALUACIÓN FINAL EN TEST ---
+    print(f"\n--- FASE 2: Evaluación final con parámetros {best_params} ---")
+    final_kwargs = {**train_kwargs, **best_params}
+    X_final_train = build_csr(
+        np.concatenate([train_min, val_min]), np.concatenate([train_max, val_max]), n_authors
+    )
+    X_test = build_csr(test_min, test_max, n_authors)
+    test_authors = np.flatnonzero(np.diff(X_test.indptr))
+    E = train_lightgcn(X_final_train, **final_kwargs)["embeddings"]
+    test_metrics = evaluate_embeddings(E, X_final_train, X_test, test_authors, eval_K)
+
+    print("\n" + "=" * 50)
+    print("RESULTADO FINAL LIGHTGCN EN TEST (LOO)")
+    print(f"Muestra Test: {len(test_authors):,} autores")
+    print(f"Recall@{eval_K}:   {test_metrics['recall']:.4f}")
+    print(f"NDCG@{eval_K}:     {test_metrics['ndcg']:.4f}")
+    print(f"Coverage:    {test_metrics['coverage']:.4f}")
+    print(f"Novelty:     {test_metrics['novelty']:.4f}")
+    print("=" * 50)
+
+    # --- Modelo final con todos los pares ---
+    X_full = build_csr(
+        np.concatenate([train_min, val_min, test_min]),
+        np.concatenate([train_max, val_max, test_max]),
+        n_authors
+    )
+    embeddings = train_lightgcn(X_full, **final_kwargs)["embeddings"]
+
+    print(f"LightGCN entrenado en {time.time() - start_time:.1f}s")
+    return {"best_params": best_params, "grid": grid, "test": test_metrics, "embeddings": embeddings}
+
+
+def save_model(results, author_to_idx, train_dict, output_dir):
+    """Guarda los embeddings finales y los mapeos (ver docstring del módulo)."""
+    os.makedirs(output_dir, exist_ok=True)
+    n_authors = len(author_to_idx)
+    idx_to_author = {idx: author_id for author_id, idx in author_to_idx.items()}
+
+    np.save(os.path.join(output_dir, "lightgcn_embeddings.npy"), results["embeddings"].astype(np.float32))
+    np.save(os.path.join(output_dir, "lightgcn_idx_to_author.npy"), idx_to_author)
+    np.save(os.path.join(output_dir, "lightgcn_author_to_idx.npy"), dict(author_to_idx))
+
+    rows = np.repeat(np.fromiter(train_dict.keys(), dtype=np.int64, count=len(train_dict)),
+                     [len(v) for v in train_dict.values()])
+    cols = np.concatenate(list(train_dict.values())) if train_dict else np.empty(0, dtype=np.int64)
+    save_npz(
+        os.path.join(output_dir, "lightgcn_train_interactions.npz"),
+        csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(n_authors, n_authors))
+    )
+    print(f"Modelo LightGCN guardado en {output_dir} (parámetros: {results['best_params']})")
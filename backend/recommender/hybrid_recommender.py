@@ -1,63 +1,285 @@
 # Contenido de recommender/hybrid_recommender.py (Modificado)
 
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import numpy as np
+from recommender.authors import AuthorDictionary, local_mask
 from recommender.content_based.queries import ContentBasedQueries
 from recommender.matrix_factorization.queries import MFQueries
 from recommender.ItemKNN.queries import ItemKNNQueries
+from recommender.topk import top_k_indices
+from recommender.threshold_fusion import CollaborativeStream, ContentBasedStream, threshold_top_k
+
+logger = logging.getLogger(__name__)
 
 class HybridRecommender:
+    # Fusión del modo híbrido: 'full' (puntúa y fusiona todos los autores)
+    # u, opcionalmente, 'threshold' (algoritmo de umbral, lee solo un
+    # prefijo de cada motor; ver benchmark_fusion antes de activarlo)
+    FUSION = os.getenv('HYBRID_FUSION', 'full')
+
+    # En el modo híbrido la rama CF corre en un pool de threads compartido
+    # (acotado a BRANCH_WORKERS) mientras la rama CB corre en el thread de
+    # la consulta; los kernels de NumPy/SciPy liberan el GIL. Si la rama CF
+    # tarda más de CF_TIMEOUT segundos se responde solo con CB (<= 0 = sin
+    # límite). Una rama que excede el timeout no se puede interrumpir y
+    # sigue ocupando su thread; mientras haya BRANCH_WORKERS ramas en curso
+    # las consultas nuevas no esperan en la cola y responden solo con CB
+    BRANCH_WORKERS = int(os.getenv('HYBRID_BRANCH_WORKERS', '4'))
+    CF_TIMEOUT = float(os.getenv('HYBRID_CF_TIMEOUT', '2.0'))
+    _executor = None
+    _executor_lock = threading.Lock()
+    _in_flight = 0
+
     @staticmethod
-    def get_recommendations(
+    def model_versions(user_input=None, author_id=None):
+        """
+        Versiones de los modelos que participan en una consulta.
+        Se usa para invalidar resultados cacheados al cambiar los artefactos.
+        """
+        versions = []
+        if user_input:
+            versions.append(('content_based', ContentBasedQueries.model_version()))
+        if author_id:
+            versions.append(('itemknn', ItemKNNQueries.model_version()))
+        return versions
+
+    @classmethod
+    def _branch_executor(cls):
+        """Pool de threads compartido por todas las consultas (se crea una vez)."""
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(
+                        max_workers=max(cls.BRANCH_WORKERS, 1),
+                        thread_name_prefix='hybrid-cf'
+                    )
+        return cls._executor
+
+    @classmethod
+    def _acquire_slot(cls):
+        """Reserva un thread del pool CF (False si todos tienen una rama en curso)."""
+        with cls._executor_lock:
+            if cls._in_flight >= max(cls.BRANCH_WORKERS, 1):
+                return False
+            cls._in_flight += 1
+            return True
+
+    @classmethod
+    def _release_slot(cls, _future=None):
+        with cls._executor_lock:
+            cls._in_flight -= 1
+
+    @classmethod
+    def _run_branches(cls, cb_branch, cf_branch):
+        """
+        Ejecuta ambas ramas en paralelo: CF en el pool, CB en el thread
+        actual. Retorna (cb, cf); cf es None si la rama CF excede CF_TIMEOUT
+        o si el pool está ocupado por ramas anteriores.
+        """
+        # Cargar el modelo CF antes de lanzar la rama, para que la primera
+        # consulta no agote el timeout leyendo los artefactos
+        ItemKNNQueries._initialize_cache()
+        if not cls._acquire_slot():
+            logger.warning(
+                "Pool CF ocupado (%d ramas en curso): se responde solo con content-based",
+                cls._in_flight
+            )
+            return cb_branch(), None
+        try:
+            future = cls._branch_executor().submit(cf_branch)
+        except BaseException:
+            cls._release_slot()
+            raise
+        # El thread se libera cuando la rama termina, aunque se haya descartado
+        future.add_done_callback(cls._release_slot)
+
+        cb = cb_branch()
+        try:
+            cf = future.result(timeout=cls.CF_TIMEOUT if cls.CF_TIMEOUT > 0 else None)
+        except FutureTimeoutError:
+            # La rama sigue corriendo en el pool pero su resultado se descarta
+            logger.warning("Rama CF excedió %ss: se responde solo con content-based", cls.CF_TIMEOUT)
+            cf = None
+        return cb, cf
+
+    @staticmethod
+    def _engine_mask(global_ids, allowed):
+        """Máscara por fila local de un motor con esos global_ids (None si no hay filtro)."""
+        return None if allowed is None else local_mask(allowed, global_ids)
+
+    @staticmethod
+    def _to_global(global_ids, local_ids, scores):
+        """
+        Traduce índices locales de un motor a ids globales (descarta los no
+        registrados). global_ids debe ser el de la versión que generó
+        local_ids (ver ContentBasedQueries.snapshot).
+        """
+        global_ids = global_ids[local_ids]
+        registered = global_ids >= 0
+        return global_ids[registered], np.asarray(scores, dtype=float)[registered]
+
+    @staticmethod
+    def get_top_k(
         user_input=None,
         author_id=None,
         k=30,
         alpha=0.5,
-        beta=0.5
+        beta=0.5,
+        candidate_budget=None,
+        fusion=None,
+        return_degraded=False,
+        allowed=None
     ):
+        """
+        Recomendaciones CB, CF o híbridas (alpha * cb + beta * cf) como
+        arreglos sobre el diccionario global de autores.
+
+        k se propaga a cada motor para que solo rankee sus k mejores.
+        En el modo híbrido, candidate_budget acota los candidatos que
+        aporta ItemKNN (None = todos los autores alcanzados, resultado exacto)
+        y fusion elige entre 'full' y 'threshold' (None = FUSION, 'full'
+        por defecto); ambos modos retornan el mismo top-k. Las ramas CB y CF se calculan en
+        paralelo; si CF excede CF_TIMEOUT el resultado es solo content-based.
+
+        allowed (máscara booleana sobre ids globales, ver AuthorAttributes)
+        restringe el top-k a los autores permitidos dentro de cada motor,
+        antes de seleccionarlo: el resultado no queda corto por el filtro.
+
+        Returns:
+            Tupla (ids, hybrid, cb, cf): ids int32 globales y sus scores,
+            ordenados por score híbrido descendente. Con return_degraded se
+            agrega un quinto elemento: True si se descartó la rama CF
+        """
+        result = HybridRecommender._get_top_k(
+            user_input, author_id, k, alpha, beta, candidate_budget, fusion, allowed
+        )
+        if return_degraded:
+            return result
+        return result[:4]
+
+    @staticmethod
+    def _get_top_k(user_input, author_id, k, alpha, beta, candidate_budget, fusion, allowed):
+        """get_top_k con el indicador de degradación a solo CB."""
         # Referencias directas a las clases (NO instancias)
         content = ContentBasedQueries
         colab = ItemKNNQueries
+        empty = np.empty(0, dtype=float)
 
         # -----------------------------------------------------
         # SOLO CONTENT-BASED
         # -----------------------------------------------------
         if user_input and not author_id:
-            recs = content.get_recommendations(user_input=user_input)
-            formatted = [(aid, cb_score, cb_score, 0.0) for aid, cb_score in recs]
-            return formatted[:k]
+            cb_cache = content.snapshot()
+            cb_global = content.global_ids(cb_cache)
+            ids, cb_scores = HybridRecommender._to_global(cb_global, *content.get_top_k(
+                user_input, k, allowed=HybridRecommender._engine_mask(cb_global, allowed), cache=cb_cache
+            ))
+            return ids, cb_scores, cb_scores, np.zeros_like(cb_scores), False
 
         # -----------------------------------------------------
         # SOLO COLLABORATIVE
         # -----------------------------------------------------
         if author_id and not user_input:
-            recs = colab.get_recommendations(author_id=author_id)
-            formatted = [(aid, cf_score, 0.0, cf_score) for aid, cf_score in recs]
-            return formatted[:k]
+            cf_global = colab.global_ids()
+            ids, cf_scores = HybridRecommender._to_global(cf_global, *colab.get_top_k(
+                author_id, n_recs=k, allowed=HybridRecommender._engine_mask(cf_global, allowed)
+            ))
+            return ids, cf_scores, np.zeros_like(cf_scores), cf_scores, False
 
         # Ninguna entrada
         if not user_input and not author_id:
-            return []
+            return np.empty(0, dtype=np.int32), empty, empty, empty, False
 
         # -----------------------------------------------------
         # HÍBRIDO
         # -----------------------------------------------------
-        recs_cb = content.get_recommendations(user_input=user_input)
-        recs_cf = colab.get_recommendations(author_id=author_id)
+        fusion = fusion or HybridRecommender.FUSION
+        if fusion == 'threshold' and k is not None and alpha >= 0 and beta >= 0:
+            return HybridRecommender._threshold_fusion(
+                user_input, author_id, k, alpha, beta, candidate_budget, allowed
+            )
 
-        if len(recs_cf) == 0:
-            formatted = [(aid, cb_score, cb_score, 0.0) for aid, cb_score in recs_cb]
-            return formatted[:k]
+        # Un solo snapshot CB para la máscara, el ranking y la traducción
+        cb_cache = content.snapshot()
+        cb_global = content.global_ids(cb_cache)
+        cf_global = colab.global_ids()
+        cb_mask = HybridRecommender._engine_mask(cb_global, allowed)
+        cf_mask = HybridRecommender._engine_mask(cf_global, allowed)
+        cb, cf = HybridRecommender._run_branches(
+            lambda: content.get_top_k(user_input, allowed=cb_mask, cache=cb_cache),
+            lambda: colab.get_top_k(author_id, n_recs=candidate_budget, allowed=cf_mask)
+        )
+        cb_ids, cb_scores = HybridRecommender._to_global(cb_global, *cb)
 
-        d_cb = {aid: cb_score for aid, cb_score in recs_cb}
-        d_cf = {aid: cf_score for aid, cf_score in recs_cf}
+        if cf is None or len(cf[0]) == 0:
+            cb_ids, cb_scores = cb_ids[:k], cb_scores[:k]
+            return cb_ids, cb_scores, cb_scores, np.zeros_like(cb_scores), cf is None
 
-        all_authors = set(d_cb.keys()) | set(d_cf.keys())
+        cf_ids, cf_scores = HybridRecommender._to_global(cf_global, *cf)
+        return HybridRecommender.fuse(cb_ids, cb_scores, cf_ids, cf_scores, k, alpha, beta) + (False,)
+
+    @staticmethod
+    def _threshold_fusion(user_input, author_id, k, alpha, beta, candidate_budget, allowed=None):
+        """Modo híbrido con el algoritmo de umbral (ver threshold_fusion)."""
+        cb_stream, cf_stream = HybridRecommender._run_branches(
+            lambda: ContentBasedStream(user_input, allowed),
+            lambda: CollaborativeStream(author_id, candidate_budget, allowed)
+        )
+
+        if cf_stream is None or len(cf_stream) == 0:
+            cb_ids, cb_scores = cb_stream.top(k)
+            registered = cb_ids >= 0
+            cb_ids, cb_scores = cb_ids[registered], cb_scores[registered]
+            return cb_ids, cb_scores, cb_scores, np.zeros_like(cb_scores), cf_stream is None
+
+        ids, hybrid, cb, cf, _ = threshold_top_k(cb_stream, cf_stream, k, alpha, beta)
+        return ids, hybrid, cb, cf, False
+
+    @staticmethod
+    def fuse(cb_ids, cb_scores, cf_ids, cf_scores, k, alpha=0.5, beta=0.5):
+        """
+        Fusión alpha * cb + beta * cf sobre arreglos alineados al índice
+        global de autores (0 para el motor que no aporta al autor), seguida
+        de selección parcial del top-k. Los empates se resuelven por id.
+        """
+        size = int(max(cb_ids.max(initial=-1), cf_ids.max(initial=-1))) + 1
+        cb = np.zeros(size)
+        cf = np.zeros(size)
+        present = np.zeros(size, dtype=bool)
+        cb[cb_ids] = cb_scores
+        cf[cf_ids] = cf_scores
+        present[cb_ids] = True
+        present[cf_ids] = True
 
-        fused = []
-        for aid in all_authors:
-            cb = d_cb.get(aid, 0.0)
-            cf = d_cf.get(aid, 0.0)
-            hybrid = alpha * cb + beta * cf
-            fused.append((aid, hybrid, cb, cf))
+        ids = np.flatnonzero(present)
+        cb, cf = cb[ids], cf[ids]
+        hybrid = alpha * cb + beta * cf
 
-        fused.sort(key=lambda x: x[1], reverse=True)
-        return fused[:k]
+        top = top_k_indices(hybrid, k)
+        return ids[top].astype(np.int32), hybrid[top], cb[top], cf[top]
+
+    @staticmethod
+    def get_recommendations(
+        user_input=None,
+        author_id=None,
+        k=30,
+        alpha=0.5,
+        beta=0.5,
+        candidate_budget=None,
+        fusion=None,
+        allowed=None
+    ):
+        """
+        Lista de tuplas (author_id, hybrid, cb, cf) ordenadas por score
+        híbrido (ver get_top_k). Solo se decodifican los strings de las
+        filas retornadas.
+        """
+        ids, hybrid, cb, cf = HybridRecommender.get_top_k(
+            user_input, author_id, k, alpha, beta, candidate_budget, fusion, allowed=allowed
+        )
+        return list(zip(
+            AuthorDictionary.keys_at(ids), hybrid.tolist(), cb.tolist(), cf.tolist()
+        ))
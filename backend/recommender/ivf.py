@@ -0,0 +1,128 @@
+"""
+Índice IVF (inverted file) con k-means esférico, compartido por el motor
+content-based (filas TF-IDF dispersas) y por MF (factores aumentados
+densos, ver matrix_factorization/ann.py).
+
+Las filas a indexar deben venir L2-normalizadas: así el centroide más
+cercano por producto punto es también el más cercano por coseno. El índice
+se guarda en el artefacto del motor como:
+
+    centroids     (n_lists, dim) float32, L2-normalizados
+    list_indptr   (n_lists + 1,) inicio de cada lista en list_authors
+    list_authors  índices de autor agrupados por lista
+"""
+
+import time
+import numpy as np
+from scipy.sparse import csr_matrix, issparse
+from sklearn.preprocessing import normalize
+
+
+def _dense(matrix):
+    """Arreglo denso float32 de una matriz densa o dispersa."""
+    if issparse(matrix):
+        matrix = matrix.toarray()
+    return np.asarray(matrix, dtype=np.float32)
+
+
+def _assign(matrix, centroids, block_size=50000):
+    """Asigna cada fila a su centroide más cercano (máximo producto punto)."""
+    labels = np.empty(matrix.shape[0], dtype=np.int32)
+    for start in range(0, matrix.shape[0], block_size):
+        block = matrix[start:start + block_size]
+        labels[start:start + block.shape[0]] = np.asarray(
+            (block @ centroids.T).argmax(axis=1)
+        ).ravel()
+    return labels
+
+
+def build_ivf_index(matrix, rows=None, n_lists=256, n_iter=10, sample_size=200000, seed=42, label="Índice IVF"):
+    """
+    Construye un índice IVF sobre las filas (ya L2-normalizadas) de matrix,
+    densa o CSR.
+
+    Args:
+        matrix: Filas a indexar
+        rows: Índices de las filas que se indexan (None = todas); el resto
+            no aparece en ninguna lista
+        n_lists: Número de listas (centroides)
+        n_iter: Iteraciones de k-means sobre la muestra
+        sample_size: Filas usadas para entrenar los centroides
+        seed: Semilla de la muestra y de la inicialización
+
+    Returns:
+        Tupla (centroids, list_indptr, list_authors)
+    """
+    start_time = time.time()
+    rng = np.random.default_rng(seed)
+    rows = np.arange(matrix.shape[0]) if rows is None else np.asarray(rows)
+    if len(rows) == 0:
+        return (
+            np.zeros((0, matrix.shape[1]), dtype=np.float32),
+            np.zeros(1, dtype=np.int64),
+            np.empty(0, dtype=np.int32),
+        )
+    n_lists = min(n_lists, len(rows))
+
+    # Entrenar centroides sobre una muestra
+    sample = rows
+    if len(sample) > sample_size:
+        sample = np.sort(rng.choice(rows, sample_size, replace=False))
+    sample_matrix = matrix[sample]
+
+    init = rng.choice(sample_matrix.shape[0], n_lists, replace=False)
+    centroids = _dense(sample_matrix[init])
+
+    for _ in range(n_iter):
+        labels = _assign(sample_matrix, centroids)
+        # Suma de filas por cluster: (one-hot)^T @ X
+        one_hot = csr_matrix(
+            (np.ones(len(labels), dtype=np.float32), (labels, np.arange(len(labels)))),
+            shape=(n_lists, len(labels))
+        )
+        sums = _dense(one_hot @ sample_matrix)
+
+        # Clusters vacíos se re-inicializan con una fila al azar
+        empty = np.flatnonzero(np.linalg.norm(sums, axis=1) == 0)
+        if len(empty):
+            sums[empty] = _dense(sample_matrix[rng.choice(sample_matrix.shape[0], len(empty))])
+        centroids = normalize(sums, norm='l2', axis=1)
+
+    # Asignar todas las filas indexadas
+    labels = _assign(matrix[rows], centroids)
+    order = np.argsort(labels, kind='stable')
+    list_authors = rows[order].astype(np.int32)
+    list_indptr = np.zeros(n_lists + 1, dtype=np.int64)
+    list_indptr[1:] = np.cumsum(np.bincount(labels, minlength=n_lists))
+
+    sizes = np.diff(list_indptr)
+    print(
+        f"{label}: {n_lists} listas, {len(list_authors):,} autores "
+        f"(lista media {sizes.mean():.0f}, máx {sizes.max()}) en {time.time() - start_time:.1f}s"
+    )
+    return centroids.astype(np.float32), list_indptr, list_authors
+
+
+def probe_lists(centroids, list_indptr, list_authors, query, n_probe, columns=None):
+    """
+    Candidatos de una consulta: autores de las n_probe listas cuyo
+    centroide tiene mayor producto punto con query.
+
+    Args:
+        query: Pesos de la consulta sobre columns (o sobre todas las
+            columnas de los centroides si columns es None)
+        columns: Columnas de los centroides a las que corresponde query
+            (índices o slice)
+    """
+    query = np.asarray(query, dtype=np.float32)
+    if len(query) == 0 or len(centroids) == 0:
+        return np.empty(0, dtype=np.int32)
+
+    selected = centroids if columns is None else centroids[:, columns]
+    centroid_scores = selected @ query
+    n_probe = min(n_probe, len(centroid_scores))
+    probed = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+
+    return np.concatenate([
+        list_authors[list_indptr[c]:list_indptr[c + 1]] for c in probed
+    ])
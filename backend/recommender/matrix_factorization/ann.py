@@ -0,0 +1,53 @@
+"""
+Índice IVF para búsqueda aproximada por producto interno máximo (MIPS)
+sobre los factores de autor de ALS.
+
+El producto interno no es una métrica, así que cada fila se aumenta con una
+coordenada extra (Bachrach et al., 2014):
+
+    x' = [x / M, sqrt(1 - ||x / M||^2)],   q' = [q / ||q||, 0]
+
+donde M es la norma máxima de las filas. Con eso q' . x' = q . x / (M ||q||),
+es decir el orden por producto interno coincide con el orden por coseno
+entre vectores aumentados (todos de norma 1), que se indexa con k-means
+esférico igual que el índice content-based.
+"""
+
+import numpy as np
+from recommender import ivf
+
+
+def augment(U):
+    """Filas aumentadas y L2-normalizadas (float32) para el k-means esférico."""
+    U = np.asarray(U, dtype=np.float32)
+    norms = np.linalg.norm(U, axis=1)
+    max_norm = norms.max(initial=0.0) or 1.0
+    extra = np.sqrt(np.clip(1.0 - (norms / max_norm) ** 2, 0.0, None))
+    return np.hstack([U / max_norm, extra[:, None]]).astype(np.float32)
+
+
+def build_ivf_index(U, n_lists=256, n_iter=10, sample_size=200000, seed=42):
+    """
+    Construye un índice IVF sobre las filas aumentadas de U (ver
+    recommender/ivf.py).
+
+    Returns:
+        Tupla (centroids, list_indptr, list_authors):
+            centroids: (n_lists, factors + 1) float32, L2-normalizados
+            list_indptr: (n_lists + 1,) inicio de cada lista en list_authors
+            list_authors: índices de autor agrupados por lista
+    """
+    return ivf.build_ivf_index(
+        augment(U), n_lists=n_lists, n_iter=n_iter, sample_size=sample_size, seed=seed,
+        label="Índice IVF (MIPS)"
+    )
+
+
+def probe_lists(centroids, list_indptr, list_authors, query, n_probe):
+    """
+    Candidatos de un vector de consulta: autores de las n_probe listas
+    cuyo centroide tiene mayor producto punto con la consulta aumentada
+    [q, 0] (la coordenada extra no aporta, y la escala de q no cambia el
+    orden).
+    """
+    return ivf.probe_lists(centroids, list_indptr, list_authors, query, n_probe, columns=slice(0, -1))
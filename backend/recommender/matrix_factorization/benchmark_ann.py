@@ -0,0 +1,54 @@
+"""
+Benchmark de la búsqueda aproximada (IVF por producto interno) de
+MFQueries contra la búsqueda exacta: recall@k y latencia para distintos
+n_probe.
+
+Uso (desde backend/):
+    python -m recommender.matrix_factorization.benchmark_ann
+"""
+
+from recommender.benchmarking import recall_at_k, sample_authors, timed
+from recommender.matrix_factorization.queries import MFQueries
+
+
+def run_benchmark(k=50, n_probes=(1, 2, 4, 8, 16, 32), n_authors=200, seed=42):
+    """
+    Compara recall@k y latencia media de la búsqueda aproximada frente a la
+    exacta. Retorna una lista de dicts (una fila por n_probe).
+    """
+    MFQueries._initialize_cache()
+    if 'ann_centroids' not in MFQueries._cache:
+        raise ValueError(
+            "El artefacto MF no tiene índice ANN: "
+            "ejecuta export_artifact(files_dir, ann_lists=...)"
+        )
+
+    authors = sample_authors(MFQueries._cache['author_to_idx'], n_authors=n_authors, seed=seed)
+    exact, exact_ms = timed(
+        lambda a: MFQueries.get_top_k(a, k, approximate=False, precomputed=False)[0], authors
+    )
+
+    print(f"Búsqueda exacta: {exact_ms:.3f} ms/consulta (k={k}, {len(authors)} autores)")
+    print(f"{'n_probe':>8} | {'recall@k':>8} | {'ms/consulta':>11} | {'speedup':>7}")
+
+    rows = []
+    for n_probe in n_probes:
+        approx, approx_ms = timed(
+            lambda a: MFQueries.get_top_k(
+                a, k, approximate=True, n_probe=n_probe, precomputed=False
+            )[0], authors
+        )
+        recall = recall_at_k(approx, exact)
+        speedup = exact_ms / approx_ms if approx_ms > 0 else float('inf')
+        print(f"{n_probe:>8} | {recall:>8.4f} | {approx_ms:>11.3f} | {speedup:>6.1f}x")
+        rows.append({
+            'n_probe': n_probe,
+            'recall': float(recall),
+            'latency_ms': approx_ms,
+            'exact_latency_ms': exact_ms,
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,80 @@
+"""
+Reporte de memoria, latencia y fidelidad del ranking MF con factores
+compactos (float16, int8 con escala por fila) frente a los factores
+float32 originales.
+
+Para cada factor_dtype se cuantiza en memoria la matriz U cargada y se
+comparan los top-k de MFQueries.get_top_k sobre autores de muestra con la
+referencia float32 (ranking completo con argsort, como el camino original).
+
+Uso (desde backend/):
+    python -m recommender.matrix_factorization.benchmark_quantized
+"""
+
+import numpy as np
+from recommender.benchmarking import recall_at_k, sample_authors, timed
+from recommender.matrix_factorization.factors import FactorMatrix
+from recommender.matrix_factorization.queries import MFQueries
+
+
+def _top_k_all(authors, k):
+    return timed(lambda author_id: MFQueries.get_top_k(author_id, k, precomputed=False), authors)
+
+
+def run_report(k=50, factor_dtypes=('float32', 'float16', 'int8'), n_authors=200, seed=42):
+    """
+    Compara memoria, recall@k, orden y error de score de cada factor_dtype
+    contra el ranking float32 completo. Retorna una lista de dicts (una
+    fila por factor_dtype).
+    """
+    MFQueries._initialize_cache()
+    base_cache = MFQueries._cache
+    if isinstance(base_cache['U'], FactorMatrix):
+        raise ValueError(
+            "El modelo cargado ya es compacto: el reporte necesita el artefacto float32 "
+            "como referencia (export_artifact sin factor_dtype)"
+        )
+
+    U = np.asarray(base_cache['U'], dtype=np.float32)
+    authors = sample_authors(base_cache['author_to_idx'], n_authors=n_authors, seed=seed)
+
+    # Referencia: camino original (todos los autores, argsort completo)
+    exact, exact_ms = _top_k_all(authors, None)
+    exact = [(indices[:k], scores[:k]) for indices, scores in exact]
+
+    print(f"Referencia float32: {U.nbytes / 1024**2:.2f} MB, {exact_ms:.3f} ms/consulta "
+          f"(ranking completo, {len(authors)} autores)")
+    print(f"{'dtype':>8} | {'MB':>8} | {'ratio':>6} | {'recall@k':>8} | "
+          f"{'mismo orden':>11} | {'Δscore máx':>10} | {'ms/consulta':>11}")
+
+    rows = []
+    for factor_dtype in factor_dtypes:
+        factors = FactorMatrix.from_dense(U, factor_dtype)
+        MFQueries._cache = {**base_cache, 'U': factors}
+        try:
+            approx, approx_ms = _top_k_all(authors, k)
+        finally:
+            MFQueries._cache = base_cache
+
+        recall = recall_at_k([a[0] for a in approx], [e[0] for e in exact])
+        same_order = np.mean([np.array_equal(a[0], e[0]) for a, e in zip(approx, exact)])
+        score_error = max(
+            (float(np.abs(a[1] - e[1]).max(initial=0.0)) for a, e in zip(approx, exact)), default=0.0
+        )
+
+        print(f"{factor_dtype:>8} | {factors.nbytes / 1024**2:>8.2f} | {factors.nbytes / U.nbytes:>6.2f} | "
+              f"{recall:>8.4f} | {same_order:>11.3f} | {score_error:>10.2e} | {approx_ms:>11.3f}")
+        rows.append({
+            'factor_dtype': factor_dtype,
+            'bytes': int(factors.nbytes),
+            'ratio': factors.nbytes / U.nbytes,
+            'recall': float(recall),
+            'same_order': float(same_order),
+            'max_score_error': score_error,
+            'latency_ms': approx_ms,
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    run_report()
@@ -0,0 +1,110 @@
+"""
+Matriz de factores ALS compacta y búsqueda top-k por producto interno.
+
+Los factores de autor (cf_U_als.npy) se pueden guardar como float32,
+float16 o int8; en int8 cada fila se cuantiza con su propia escala
+(valor ~= data * scale[fila]). Los scores U[autor] @ U.T se calculan por
+bloques de filas en float32 manteniendo solo un top-k parcial y el
+mínimo/máximo global (para el Min-Max), sin materializar ni ordenar el
+arreglo completo de scores.
+"""
+
+import numpy as np
+
+
+class FactorMatrix:
+    """Factores de autor en float32, float16 o int8 con escala por fila."""
+
+    FACTOR_DTYPES = ('float32', 'float16', 'int8')
+
+    def __init__(self, data, scale=None):
+        self.data = data
+        self.scale = scale
+        self.shape = data.shape
+
+    @classmethod
+    def from_dense(cls, U, factor_dtype='float32'):
+        if factor_dtype not in cls.FACTOR_DTYPES:
+            raise ValueError(f"factor_dtype debe ser uno de {cls.FACTOR_DTYPES}, no '{factor_dtype}'")
+
+        U = np.asarray(U, dtype=np.float32)
+        if factor_dtype != 'int8':
+            return cls(U.astype(factor_dtype))
+
+        # Escala = máximo absoluto de la fila / 127 (simétrica, sin offset)
+        max_abs = np.abs(U).max(axis=1)
+        scale = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+        data = np.rint(U / scale[:, None]).clip(-127, 127).astype(np.int8)
+        return cls(data, scale)
+
+    @property
+    def factor_dtype(self):
+        return self.data.dtype.name
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + (self.scale.nbytes if self.scale is not None else 0)
+
+    def rows(self, lo, hi):
+        """Filas [lo, hi) descuantizadas a float32."""
+        block = np.asarray(self.data[lo:hi], dtype=np.float32)
+        if self.scale is not None:
+            block *= self.scale[lo:hi, None]
+        return block
+
+    def take(self, indices):
+        """Filas arbitrarias descuantizadas a float32."""
+        block = np.asarray(self.data[indices], dtype=np.float32)
+        if self.scale is not None:
+            block *= self.scale[indices, None]
+        return block
+
+    def to_dense(self):
+        return self.rows(0, self.shape[0])
+
+
+def top_k_inner_product(factors, row, k=None, block_size=65536):
+    """
+    Top-k de factors[row] @ factors.T excluyendo la propia fila.
+
+    Returns:
+        Tupla (indices, scores, min_score, max_score): los k mejores
+        ordenados descendente (todos si k es None) y el mínimo/máximo de
+        los scores de todas las demás filas
+    """
+    n_rows = factors.shape[0]
+    if k is not None and k <= 0:
+        k = 0
+    query = factors.rows(row, row + 1)[0]
+
+    best_indices = np.empty(0, dtype=np.int64)
+    best_scores = np.empty(0, dtype=np.float32)
+    min_score, max_score = np.inf, -np.inf
+
+    for lo in range(0, n_rows, block_size):
+        hi = min(lo + block_size, n_rows)
+        scores = factors.rows(lo, hi) @ query
+        indices = np.arange(lo, hi)
+        if lo <= row < hi:
+            keep = indices != row
+            indices, scores = indices[keep], scores[keep]
+        if len(scores) == 0:
+            continue
+
+        min_score = min(min_score, float(scores.min()))
+        max_score = max(max_score, float(scores.max()))
+
+        # Top-k parcial del bloque unido al top-k acumulado
+        if k == 0:
+            continue
+        if k is not None and len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            indices, scores = indices[top], scores[top]
+        best_indices = np.concatenate([best_indices, indices])
+        best_scores = np.concatenate([best_scores, scores])
+        if k is not None and len(best_scores) > k:
+            top = np.argpartition(-best_scores, k - 1)[:k]
+            best_indices, best_scores = best_indices[top], best_scores[top]
+
+    order = np.argsort(-best_scores, kind='stable')
+    return best_indices[order], best_scores[order].astype(float), min_score, max_score
@@ -0,0 +1,67 @@
+import os
+import numpy as np
+from recommender.artifacts import ArtifactWriter, artifact_dir
+from recommender.authors import register_authors
+from recommender.matrix_factorization.queries import ARTIFACT_NAME
+from recommender.matrix_factorization.factors import FactorMatrix
+from recommender.matrix_factorization.ann import build_ivf_index
+from recommender.matrix_factorization.neighbours import build_neighbour_lists
+
+
+def export_artifact(files_dir, factor_dtype='float32', ann_lists=None, neighbour_top_m=None, n_jobs=None):
+    """
+    Convierte los archivos de producción de MF (cf_idx_to_author.npy,
+    cf_U_als.npy) al formato de artefacto versionado.
+
+    factor_dtype='float16' o 'int8' (escala por fila) guarda los factores
+    compactos; ver benchmark_quantized para la fidelidad del ranking.
+    Con ann_lists se agrega un índice IVF por producto interno (ver ann.py),
+    construido sobre los factores tal como se sirven.
+    Con neighbour_top_m se precalcula el top-N de cada autor (ver
+    neighbours.py) en n_jobs procesos (None = todos los núcleos).
+    """
+    idx_to_author = np.load(
+        os.path.join(files_dir, "cf_idx_to_author.npy"),
+        allow_pickle=True
+    ).item()
+    U = np.load(os.path.join(files_dir, "cf_U_als.npy")).astype(np.float32)
+    author_ids = [idx_to_author[i] for i in range(len(idx_to_author))]
+
+    version = export_factors(
+        files_dir, ARTIFACT_NAME, U, author_ids, factor_dtype, ann_lists, neighbour_top_m, n_jobs
+    )
+    print(f"Artefacto MF exportado: versión {version}")
+    return version
+
+
+def export_factors(files_dir, artifact_name, U, author_ids, factor_dtype='float32', ann_lists=None,
+                   neighbour_top_m=None, n_jobs=None):
+    """
+    Publica una matriz de embeddings de autor (filas alineadas con
+    author_ids) como artefacto de factores que carga MFQueries (o una
+    subclase con otro ARTIFACT_NAME). Retorna la versión publicada.
+    """
+    U = np.asarray(U, dtype=np.float32)
+    writer = ArtifactWriter(artifact_dir(files_dir, artifact_name))
+    writer.add_strings("author_ids", author_ids)
+    writer.add_array("author_global_ids", register_authors(files_dir, author_ids))
+    factors = FactorMatrix.from_dense(U, factor_dtype)
+    writer.add_array("U", factors.data)
+    if factors.scale is not None:
+        writer.add_array("U_scale", factors.scale)
+    if ann_lists:
+        centroids, list_indptr, list_authors = build_ivf_index(factors.to_dense(), n_lists=ann_lists)
+        writer.add_array("ann_centroids", centroids)
+        writer.add_array("ann_list_indptr", list_indptr)
+        writer.add_array("ann_list_authors", list_authors)
+    if neighbour_top_m:
+        neighbours = build_neighbour_lists(
+            factors.to_dense(), top_m=neighbour_top_m, n_jobs=n_jobs, work_dir=files_dir
+        )
+        for name, array in neighbours.items():
+            writer.add_array(name, array)
+    writer.set_meta(
+        n_authors=int(U.shape[0]), factors=int(U.shape[1]), factor_dtype=factor_dtype,
+        neighbour_top_m=neighbour_top_m
+    )
+    return writer.commit()
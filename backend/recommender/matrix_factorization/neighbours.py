@@ -0,0 +1,109 @@
+"""
+Listas de recomendados precalculadas para MF.
+
+Los scores U[autor] @ U.T solo cambian al reentrenar los factores, así que
+se calculan offline para todos los autores con productos matriz-matriz por
+bloques (U[lo:hi] @ U.T) y se guarda el top_m de cada autor (sin el propio
+autor) en el mismo formato que las listas de vecinos de ItemKNN:
+
+    neighbour_indptr  (n_autores + 1,)  inicio de la fila de cada autor
+    neighbour_ids     (nnz,)            índices de autor recomendados
+    neighbour_scores  (nnz,)            producto interno
+    neighbour_min / neighbour_max       estadísticas Min-Max sobre TODOS
+                                        los demás autores (no solo top_m)
+
+Cada bloque materializa block_size × n_autores scores float32, por lo
+que block_size acota la memoria de cada worker.
+"""
+
+import os
+import time
+import numpy as np
+from threadpoolctl import threadpool_limits
+from recommender.batch_topk import assemble_rows, open_shared, run_blocks, shared_arrays
+
+# Factores del worker (los fija _init_worker o build_neighbour_lists)
+_worker = None
+
+
+def _neighbour_block(lo, hi, top_m):
+    """
+    Top-top_m por producto interno de las filas [lo, hi), excluyendo al
+    propio autor.
+
+    Returns:
+        Tupla (lengths, ids, scores, row_min, row_max)
+    """
+    U = _worker["U"]
+    n_rows = hi - lo
+    scores = np.asarray(U[lo:hi], dtype=np.float32) @ np.asarray(U, dtype=np.float32).T
+
+    rows = np.arange(n_rows)
+    if scores.shape[1] <= 1 or top_m == 0:
+        zeros = np.zeros(n_rows, dtype=np.float32)
+        return np.zeros(n_rows, dtype=np.int64), np.empty(0, dtype=np.int32), zeros[:0], zeros, zeros
+
+    # Min-Max sobre todos los demás autores
+    scores[rows, lo + rows] = np.inf
+    row_min = scores.min(axis=1)
+    scores[rows, lo + rows] = -np.inf
+    row_max = scores.max(axis=1)
+
+    # Orden dentro de cada fila: score descendente, índice ascendente
+    top = np.argpartition(-scores, top_m - 1, axis=1)[:, :top_m]
+    top.sort(axis=1)
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind="stable")
+    ids = np.take_along_axis(top, order, axis=1)
+
+    return (
+        np.full(n_rows, top_m, dtype=np.int64),
+        ids.ravel().astype(np.int32),
+        np.take_along_axis(scores, ids, axis=1).ravel(),
+        row_min,
+        row_max,
+    )
+
+
+def _init_worker(work_dir):
+    """Abre vía mmap los factores que escribió el proceso principal."""
+    global _worker
+    # Un thread de BLAS por proceso: el paralelismo lo da el pool
+    threadpool_limits(1, "blas")
+    _worker = {"U": open_shared(work_dir, "U")}
+
+
+def build_neighbour_lists(U, top_m=200, block_size=1000, n_jobs=1, work_dir=None):
+    """
+    Materializa los top_m autores con mayor producto interno de cada autor.
+
+    Con n_jobs > 1 (None = todos los núcleos) los bloques de filas se
+    reparten en un pool de procesos que abre U vía mmap desde work_dir
+    (ver recommender/batch_topk.py). Cada worker limita BLAS a un thread.
+
+    Returns:
+        Dict nombre -> arreglo (neighbour_indptr, neighbour_ids,
+        neighbour_scores, neighbour_min, neighbour_max)
+    """
+    global _worker
+    start_time = time.time()
+    U = np.ascontiguousarray(U, dtype=np.float32)
+    n_authors = U.shape[0]
+    top_m = max(0, min(top_m, n_authors - 1))
+    n_jobs = n_jobs or os.cpu_count() or 1
+
+    if n_jobs == 1:
+        _worker = {"U": U}
+        results = run_blocks(_neighbour_block, n_authors, top_m, block_size, label="Vecinos MF")
+    else:
+        with shared_arrays({"U": U}, work_dir, prefix="mf_neighbours_") as tmp_dir:
+            results = run_blocks(
+                _neighbour_block, n_authors, top_m, block_size, n_jobs=n_jobs,
+                initializer=_init_worker, initargs=(tmp_dir,), label="Vecinos MF"
+            )
+
+    neighbours = assemble_rows(results, n_authors)
+    print(
+        f"Listas de vecinos MF: top-{top_m}, {neighbours['neighbour_indptr'][-1]:,} entradas "
+        f"en {time.time() - start_time:.1f}s"
+    )
+    return neighbours
@@ -2,11 +2,29 @@
 
 import numpy as np
 import os
+from recommender.artifacts import Artifact, StringTable, artifact_dir
+from recommender.authors import AuthorDictionary
+from recommender.topk import top_k_indices, min_max_normalize
+from recommender.matrix_factorization.factors import FactorMatrix, top_k_inner_product
+from recommender.matrix_factorization.ann import probe_lists
+
+ARTIFACT_NAME = 'mf'
 
 
 class MFQueries:
     # Cache estático a nivel de clase
     _cache = None
+
+    # Artefacto de factores que sirve la clase (ver LightGCNQueries)
+    ARTIFACT_NAME = ARTIFACT_NAME
+
+    # Filas de factores puntuadas por bloque en la búsqueda top-k
+    BLOCK_SIZE = int(os.getenv('MF_BLOCK_SIZE', '65536'))
+
+    # Búsqueda aproximada (IVF por producto interno) opcional: requiere un
+    # artefacto con índice ANN (export_artifact(..., ann_lists=N))
+    ANN_ENABLED = os.getenv('MF_ANN_ENABLED', '0') == '1'
+    ANN_N_PROBE = int(os.getenv('MF_ANN_N_PROBE', '16'))
     
     @classmethod
     def _initialize_cache(cls):
@@ -19,34 +37,122 @@ class MFQueries:
             "files"
         )
         
-        # Cargar todo una sola vez
-        cls._cache = {
-            'author_to_idx': np.load(
-                os.path.join(files_dir, "cf_author_to_idx.npy"), 
-                allow_pickle=True
-            ).item(),
-            'idx_to_author': np.load(
-                os.path.join(files_dir, "cf_idx_to_author.npy"), 
-                allow_pickle=True
-            ).item(),
+        # Preferir el artefacto versionado (mmap, sin pickle); si no existe
+        # se cargan los archivos legacy
+        try:
+            cls._cache = cls._load_artifact(artifact_dir(files_dir, cls.ARTIFACT_NAME))
+        except FileNotFoundError:
+            cls._cache = cls._load_legacy_files(files_dir)
+
+    @classmethod
+    def model_version(cls):
+        """Versión del modelo cargado ('legacy' si viene de los archivos originales)"""
+        cls._initialize_cache()
+        return cls._cache['version']
+
+    @classmethod
+    def global_ids(cls):
+        """Ids del diccionario global de autores para cada fila local (int32)"""
+        cls._initialize_cache()
+        if 'global_ids' not in cls._cache:
+            cls._cache['global_ids'] = AuthorDictionary.ids_of_table(cls._cache['author_to_idx'])
+        return cls._cache['global_ids']
+
+    @staticmethod
+    def _load_artifact(root_dir):
+        """Carga los factores desde el artefacto versionado (U vía mmap)."""
+        artifact = Artifact.open(root_dir)
+        cache = {
+            'version': artifact.version,
+            'author_to_idx': artifact.strings('author_ids'),
+            'U': artifact.array('U'),
+        }
+        # Factores compactos (float16, o int8 con escala por fila)
+        if artifact.has('U_scale') or cache['U'].dtype != np.float32:
+            cache['U'] = FactorMatrix(
+                cache['U'], artifact.array('U_scale') if artifact.has('U_scale') else None
+            )
+
+        # Índice ANN (opcional)
+        if artifact.has('ann_centroids'):
+            for name in ('ann_centroids', 'ann_list_indptr', 'ann_list_authors'):
+                cache[name] = artifact.array(name)
+        # Listas de recomendados precalculadas (opcionales)
+        if artifact.has('neighbour_indptr'):
+            for name in ('neighbour_indptr', 'neighbour_ids', 'neighbour_scores',
+                         'neighbour_min', 'neighbour_max'):
+                cache[name] = artifact.array(name)
+            cache['neighbour_top_m'] = int(artifact.meta['neighbour_top_m'])
+        # Fila local -> id del diccionario global de autores
+        if artifact.has('author_global_ids'):
+            cache['global_ids'] = artifact.array('author_global_ids')
+        return cache
+
+    @staticmethod
+    def _load_legacy_files(files_dir):
+        """Carga los factores desde los archivos .npy originales."""
+        idx_to_author = np.load(
+            os.path.join(files_dir, "cf_idx_to_author.npy"), 
+            allow_pickle=True
+        ).item()
+        return {
+            'version': 'legacy',
+            'author_to_idx': StringTable.from_strings(
+                [idx_to_author[i] for i in range(len(idx_to_author))]
+            ),
             'U': np.load(os.path.join(files_dir, "cf_U_als.npy"))
         }
 
     @classmethod
-    def get_recommendations(cls, author_id):
+    def get_top_k(cls, author_id, k=None, approximate=None, n_probe=None, precomputed=True):
+        """
+        Índices locales de todos los autores (menos el propio) ordenados por
+        score de factores, con su score Min-Max.
+
+        Con k (o con factores compactos) los scores se calculan por bloques
+        de BLOCK_SIZE filas manteniendo solo el top-k; el Min-Max usa igual
+        el mínimo y máximo de todos los autores.
+
+        En modo aproximado (índice IVF, requiere k) solo se puntúan los
+        autores de las n_probe listas más cercanas y el Min-Max se calcula
+        sobre esos candidatos.
+
+        Si el artefacto trae listas precalculadas y k no excede su largo,
+        se responde con un corte de la fila del autor (mismo resultado que
+        la búsqueda exacta); precomputed=False fuerza el cálculo.
+
+        Returns:
+            Tupla (indices, scores_norm); arreglos vacíos si el autor no existe
+        """
         # Inicializar cache si es necesario
         cls._initialize_cache()
         
         # Usar datos del cache
         author_to_idx = cls._cache['author_to_idx']
-        idx_to_author = cls._cache['idx_to_author']
         U = cls._cache['U']
         
         if author_id not in author_to_idx:
             print(f"Autor {author_id} no encontrado")
-            return []
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=float)
         
         author_idx = author_to_idx[author_id]
+
+        # 🔹 Lectura de la lista precalculada (si alcanza)
+        if precomputed:
+            stored = cls._lookup_neighbours(author_idx, k)
+            if stored is not None:
+                return stored
+
+        use_ann = cls.ANN_ENABLED if approximate is None else approximate
+        if use_ann and k is not None and 'ann_centroids' in cls._cache:
+            return cls._approximate_top_k(author_idx, k, n_probe or cls.ANN_N_PROBE)
+
+        if k is not None or isinstance(U, FactorMatrix):
+            factors = U if isinstance(U, FactorMatrix) else FactorMatrix(U)
+            indices, scores, min_score, max_score = top_k_inner_product(
+                factors, author_idx, k, cls.BLOCK_SIZE
+            )
+            return indices, min_max_normalize(scores, min_score, max_score)
         
         # Calcular scores: U[author_idx] @ U^T
         predicted_scores = U[author_idx] @ U.T
@@ -90,11 +196,63 @@ class MFQueries:
         # Ordenar todos los autores por score normalizado min-max (mayor a menor)
         sorted_indices = np.argsort(-predicted_scores_norm)
         
-        # Construir toda la lista de recomendaciones: (author_id, score_min_max, z_score)
+        valid_indices = sorted_indices[predicted_scores_norm[sorted_indices] != -np.inf] # Excluir el autor mismo
+        return valid_indices, predicted_scores_norm[valid_indices]
+
+    @classmethod
+    def _lookup_neighbours(cls, author_idx, k):
+        """Top-k precalculado del autor (None si no hay listas o k excede su largo)."""
+        if k is None or 'neighbour_indptr' not in cls._cache or k > cls._cache['neighbour_top_m']:
+            return None
+
+        start = cls._cache['neighbour_indptr'][author_idx]
+        end = min(start + k, cls._cache['neighbour_indptr'][author_idx + 1])
+        return (
+            np.array(cls._cache['neighbour_ids'][start:end], dtype=np.int64),
+            min_max_normalize(
+                cls._cache['neighbour_scores'][start:end],
+                float(cls._cache['neighbour_min'][author_idx]),
+                float(cls._cache['neighbour_max'][author_idx])
+            )
+        )
+
+    @classmethod
+    def _approximate_top_k(cls, author_idx, k, n_probe):
+        """Top-k por producto interno entre los autores de las listas IVF revisadas."""
+        U = cls._cache['U']
+        factors = U if isinstance(U, FactorMatrix) else FactorMatrix(U)
+        query = factors.take([author_idx])[0]
+
+        candidates = probe_lists(
+            cls._cache['ann_centroids'],
+            cls._cache['ann_list_indptr'],
+            cls._cache['ann_list_authors'],
+            query,
+            n_probe
+        )
+        candidates = candidates[candidates != author_idx]
+        if len(candidates) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=float)
+
+        scores = factors.take(candidates) @ query
+        top = top_k_indices(scores, k)
+        return (
+            candidates[top].astype(np.int64),
+            min_max_normalize(scores[top], scores.min(), scores.max())
+        )
+
+    @classmethod
+    def get_recommendations(cls, author_id, k=None):
+        """Lista de tuplas (author_id, score_min_max) ordenadas descendente (ver get_top_k)"""
+        valid_indices, scores_norm = cls.get_top_k(author_id, k)
+
+        # Construir toda la lista de recomendaciones: (author_id, score_min_max)
         recommendations = [
-            (idx_to_author[idx], float(predicted_scores_norm[idx]))
-            for idx in sorted_indices
-            if predicted_scores_norm[idx] != -np.inf # Excluir el autor mismo
+            (aid, float(score))
+            for aid, score in zip(
+                cls._cache['author_to_idx'].keys_at(valid_indices),
+                scores_norm
+            )
         ]
         
         return recommendations
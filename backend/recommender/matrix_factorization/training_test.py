@@ -0,0 +1,419 @@
+"""
+Entrenamiento de MF (ALS implícito) y grid search dentro del repo.
+
+Reemplaza el notebook matrix_factorization/train.ipynb en CPU:
+
+    1. Se leen los pares únicos de coautoría (mismos archivos que usa el
+       trainer de ItemKNN) y se filtran los autores con >= 2 colaboraciones.
+    2. Split leave-one-out triple (train/val/test) igual al del notebook.
+    3. Cada configuración (factors × regularization × alpha) se entrena en
+       un proceso nuevo (hasta n_jobs a la vez). La matriz de train se
+       publica una sola vez en memoria compartida
+       (multiprocessing.shared_memory), así no se serializa a cada worker.
+       El fit de implicit igual crea copias privadas en cada worker
+       (alpha * X y su transpuesta CSR): cada configuración ocupa ~2 veces
+       la matriz de train además de la parte compartida. Se reporta el
+       tiempo y la memoria pico de cada configuración.
+    4. El mejor NDCG@K de validación se evalúa en test entrenando con
+       train + val y se reentrena con todos los pares.
+
+Los factores de autor son (P + Q) / 2 normalizados por fila, como en el
+notebook (la matriz es simétrica, así que ambos lados representan autores).
+
+Archivos generados en save_dir (formato que carga MFQueries):
+    cf_U_als.npy           factores float32 (autores × factors)
+    cf_idx_to_author.npy   dict índice -> author_id
+    cf_author_to_idx.npy   dict author_id -> índice
+"""
+
+import multiprocessing
+import os
+import resource
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import product
+from multiprocessing import shared_memory
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from threadpoolctl import threadpool_limits
+from implicit.als import AlternatingLeastSquares
+from recommender.ItemKNN.trainer import (
+    build_csr, coverage_novelty, load_pairs, recall_ndcg_at_k, triple_loo_split
+)
+
+# Matriz de train del worker (la fija _init_worker)
+_worker = None
+
+# Memoria del bloque denso de scores de recommend_top_k (bytes)
+SCORE_BLOCK_BYTES = 256 * 1024**2
+
+
+def load_author_ids(files_dir):
+    """IDs de OpenAlex de los autores en orden de índice."""
+    ids_path = os.path.join(files_dir, "author_ids.npy")
+    if os.path.exists(ids_path):
+        # Salida de build_author_graph_out_of_core
+        author_ids = np.load(ids_path, allow_pickle=False)
+        if author_ids.dtype.kind == "S":
+            return [a.decode("utf-8") for a in author_ids]
+        return [str(a) for a in author_ids]
+
+    # Salida de build_author_knn_data
+    author_to_idx = np.load(os.path.join(files_dir, "author_to_idx.npy"), allow_pickle=True).item()
+    author_ids = [None] * len(author_to_idx)
+    for author_id, idx in author_to_idx.items():
+        author_ids[idx] = author_id
+    return author_ids
+
+
+def train_als(R, factors, reg, alpha, iterations=15, random_state=42, num_threads=0, use_gpu=False):
+    """
+    Entrena ALS implícito sobre la matriz autor × autor R y retorna los
+    factores de autor (P + Q) / 2 normalizados por fila (float32).
+    """
+    model = AlternatingLeastSquares(
+        factors=factors,
+        regularization=reg,
+        alpha=alpha,
+        iterations=iterations,
+        random_state=random_state,
+        num_threads=num_threads,
+        use_gpu=use_gpu,
+    )
+    model.fit(R, show_progress=False)
+
+    P, Q = model.user_factors, model.item_factors
+    if not isinstance(P, np.ndarray):
+        P, Q = P.to_numpy(), Q.to_numpy()
+
+    U = (P + Q) / 2.0
+    norms = np.linalg.norm(U, axis=1, keepdims=True)
+    norms[norms == 0] = 1e-10
+    return (U / norms).astype(np.float32)
+
+
+def recommend_top_k(U, X_train, authors, k=20, batch_size=None):
+    """
+    Top-k por producto interno de cada autor, excluyendo a sí mismo y a
+    sus coautores de train (mismo formato que ItemKNN.trainer.recommend_top_k).
+
+    Los scores se calculan en bloques densos de batch_size × n_autores;
+    con batch_size None el bloque se acota a SCORE_BLOCK_BYTES.
+
+    Returns:
+        Tupla (indptr, ids)
+    """
+    X_train = X_train.tocsr()
+    ids = np.empty((len(authors), k), dtype=np.int64)
+    if batch_size is None:
+        row_bytes = U.shape[0] * np.result_type(U.dtype, np.float32).itemsize
+        batch_size = max(1, SCORE_BLOCK_BYTES // max(row_bytes, 1))
+
+    for start in range(0, len(authors), batch_size):
+        batch = authors[start:start + batch_size]
+        scores = U[batch] @ U.T
+
+        # Filtro: ya vistos y el propio autor
+        seen = X_train[batch]
+        scores[np.repeat(np.arange(len(batch)), np.diff(seen.indptr)), seen.indices] = -np.inf
+        scores[np.arange(len(batch)), batch] = -np.inf
+
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind="stable")
+        ids[start:start + len(batch)] = np.take_along_axis(top, order, axis=1)
+
+    indptr = np.arange(0, len(authors) * k + 1, k, dtype=np.int64)
+    return indptr, ids.ravel()
+
+
+def _share_csr(matrix):
+    """Publica los arreglos de una CSR en memoria compartida."""
+    segments, spec = [], {"shape": matrix.shape}
+    for name in ("data", "indices", "indptr"):
+        array = getattr(matrix, name)
+        segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[:] = array
+        segments.append(segment)
+        spec[name] = (segment.name, array.shape, array.dtype.str)
+    return segments, spec
+
+
+def _init_worker(spec, X_val, val_sample):
+    """
+    Abre la matriz de train compartida y fija los datos de validación.
+    Los arreglos se leen de la memoria compartida sin copiarlos, pero el
+    fit de implicit crea sus propias copias escaladas y transpuestas.
+    """
+    global _worker
+    segments, arrays = [], {}
+    for name in ("data", "indices", "indptr"):
+        segment_name, shape, dtype = spec[name]
+        segment = shared_memory.SharedMemory(name=segment_name)
+        segments.append(segment)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+
+    _worker = {
+        "segments": segments,
+        "X_train": csr_matrix(
+            (arrays["data"], arrays["indices"], arrays["indptr"]), shape=spec["shape"], copy=False
+        ),
+        "X_val": X_val,
+        "val_sample": val_sample,
+    }
+
+
+def _evaluate_config(factors, reg, alpha, iterations, K, random_state, num_threads):
+    """Entrena una configuración en el worker y la evalúa en validación."""
+    start = time.time()
+    # implicit paraleliza con sus propios threads: BLAS en 1 thread
+    with threadpool_limits(1, "blas"):
+        U = train_als(
+            _worker["X_train"], factors, reg, alpha, iterations, random_state, num_threads
+        )
+    train_seconds = time.time() - start
+
+    indptr, ids = recommend_top_k(U, _worker["X_train"], _worker["val_sample"], K)
+    recall, ndcg = recall_ndcg_at_k(indptr, ids, _worker["val_sample"], _worker["X_val"], K)
+
+    # Cada worker atiende una sola configuración: el pico es de esa configuración
+    max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {
+        "factors": factors,
+        "reg": reg,
+        "alpha": alpha,
+        "recall": recall,
+        "ndcg": ndcg,
+        "train_seconds": train_seconds,
+        "seconds": time.time() - start,
+        "max_rss_mb": max_rss_mb,
+    }
+
+
+def grid_search(
+    X_train,
+    X_val,
+    val_sample,
+    factors_list,
+    reg_list,
+    alpha_list=(40.0,),
+    iterations=15,
+    K=20,
+    random_state=42,
+    num_threads=0,
+    n_jobs=None
+):
+    """
+    Evalúa cada configuración factors × reg × alpha en un proceso propio
+    (hasta n_jobs a la vez) que abre X_train desde memoria compartida.
+
+    Cada configuración usa un pool de un solo proceso que se cierra al
+    terminarla, así el RSS pico reportado es solo de esa configuración (sin
+    depender de max_tasks_per_child, que requiere Python >= 3.11).
+
+    num_threads son los threads de ALS por configuración (0 = repartir los
+    núcleos entre los n_jobs procesos).
+
+    Returns:
+        Lista de dicts (una fila por configuración, en el orden del grid)
+    """
+    grid = list(product(factors_list, reg_list, alpha_list))
+    cpu_count = os.cpu_count() or 1
+    if n_jobs is None:
+        n_jobs = min(len(grid), max(1, cpu_count // max(num_threads, 1)))
+    threads = num_threads or max(1, cpu_count // n_jobs)
+
+    X_train = X_train.tocsr().astype(np.float32)
+    segments, spec = _share_csr(X_train)
+    shared_mb = sum(segment.size for segment in segments) / 1024**2
+    print(
+        f"Grid: {len(grid)} configuraciones en {n_jobs} procesos x {threads} threads "
+        f"(train compartido: {shared_mb:.1f} MB; ~{2 * shared_mb:.1f} MB más por "
+        f"proceso en las copias de implicit)"
+    )
+
+    context = multiprocessing.get_context("spawn")
+    initargs = (spec, X_val.tocsr(), val_sample)
+
+    def submit(factors, reg, alpha):
+        executor = ProcessPoolExecutor(
+            max_workers=1, mp_context=context, initializer=_init_worker, initargs=initargs
+        )
+        future = executor.submit(
+            _evaluate_config, factors, reg, alpha, iterations, K, random_state, threads
+        )
+        # El proceso termina al completar su única configuración
+        executor.shutdown(wait=False)
+        return future
+
+    results = {}
+    pending = {}
+    try:
+        remaining = iter(grid)
+        while True:
+            for config in remaining:
+                pending[submit(*config)] = config
+                if len(pending) >= n_jobs:
+                    break
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                row = future.result()
+                results[pending.pop(future)] = row
+                print(
+                    f"Factors: {row['factors']} | Reg: {row['reg']} | Alpha: {row['alpha']} -> "
+                    f"NDCG@{K}: {row['ndcg']:.4f} | Recall@{K}: {row['recall']:.4f} | "
+                    f"{row['seconds']:.1f}s | RSS pico {row['max_rss_mb']:.0f} MB"
+                )
+    finally:
+        # Ante un error se espera a los procesos que siguen usando la memoria compartida
+        wait(pending)
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+
+    return [results[config] for config in grid]
+
+
+def _split(files_dir, random_state):
+    """Pares filtrados (>= 2 colaboraciones) y split LOO triple."""
+    pair_min, pair_max, n_authors = load_pairs(files_dir)
+    degree = np.bincount(np.concatenate([pair_min, pair_max]), minlength=n_authors)
+    eligible = (degree[pair_min] >= 2) & (degree[pair_max] >= 2)
+    f_min, f_max = pair_min[eligible], pair_max[eligible]
+    train_idx, val_idx, test_idx = triple_loo_split(f_min, f_max, seed=random_state)
+    return pair_min, pair_max, n_authors, f_min, f_max, train_idx, val_idx, test_idx
+
+
+def _evaluate_test(U, X_train, X_test, K):
+    """Recall, NDCG, coverage y novelty @K de U sobre todos los autores de test."""
+    test_authors = np.flatnonzero(np.diff(X_test.indptr))
+    indptr, ids = recommend_top_k(U, X_train, test_authors, K)
+    recall, ndcg = recall_ndcg_at_k(indptr, ids, test_authors, X_test, K)
+    # Coverage sobre todos los autores, como en el notebook (ALS también
+    # recomienda autores sin pares de train)
+    _, novelty = coverage_novelty(ids, indptr, X_train, K)
+    coverage = len(np.unique(ids)) / X_train.shape[0]
+    return len(test_authors), {"recall": recall, "ndcg": ndcg, "coverage": coverage, "novelty": novelty}
+
+
+def _print_test(n_authors, metrics, K):
+    print("\n" + "=" * 50)
+    print("RESULTADOS FINALES EN TEST (LOO)")
+    print(f"Muestra Test: {n_authors:,} autores")
+    print(f"Recall@{K}:   {metrics['recall']:.4f}")
+    print(f"NDCG@{K}:     {metrics['ndcg']:.4f}")
+    print(f"Coverage:    {metrics['coverage']:.4f}")
+    print(f"Novelty:     {metrics['novelty']:.4f}")
+    print("=" * 50)
+
+
+def run_full_recommendation_system(
+    factors_list=(128, 256),
+    reg_list=(0.01, 0.1, 1.0),
+    iterations=15,
+    K=20,
+    sample_users_eval=20000,
+    random_state=42,
+    save_dir=None,
+    num_threads=0,
+    use_gpu=False,
+    alpha_list=(40.0,),
+    n_jobs=None,
+    final_iterations=30
+):
+    """
+    Grid search, evaluación en test y modelo final (ver docstring del
+    módulo). Lee los pares y escribe los archivos cf_* en save_dir.
+
+    Con use_gpu el grid corre en un solo proceso (la GPU no se comparte
+    entre workers).
+
+    Returns:
+        Dict con best_params, filas del grid y métricas de test
+    """
+    start_time = time.time()
+    (pair_min, pair_max, n_authors, f_min, f_max,
+     train_idx, val_idx, test_idx) = _split(save_dir, random_state)
+    print(f"Pares únicos: {len(pair_min):,} | Autores: {n_authors:,} | Pares tras filtrado: {len(f_min):,}")
+
+    X_train = build_csr(f_min[train_idx], f_max[train_idx], n_authors)
+    X_val = build_csr(f_min[val_idx], f_max[val_idx], n_authors)
+    val_authors = np.flatnonzero(np.diff(X_val.indptr))
+    val_sample = np.sort(np.random.default_rng(random_state).choice(
+        val_authors, size=min(sample_users_eval, len(val_authors)), replace=False
+    ))
+
+    # --- FASE 1: GRID SEARCH ---
+    print(f"\n--- FASE 1: Tuning con {len(val_sample):,} autores de validación ---")
+    if use_gpu:
+        grid = []
+        for factors, reg, alpha in product(factors_list, reg_list, alpha_list):
+            t0 = time.time()
+            U = train_als(X_train, factors, reg, alpha, iterations, random_state, use_gpu=True)
+            indptr, ids = recommend_top_k(U, X_train, val_sample, K)
+            recall, ndcg = recall_ndcg_at_k(indptr, ids, val_sample, X_val, K)
+            grid.append({
+                "factors": factors, "reg": reg, "alpha": alpha,
+                "recall": recall, "ndcg": ndcg, "seconds": time.time() - t0,
+            })
+            print(f"Factors: {factors} | Reg: {reg} | Alpha: {alpha} -> NDCG@{K}: {ndcg:.4f} "
+                  f"| Recall@{K}: {recall:.4f} ({time.time() - t0:.1f}s)")
+    else:
+        grid = grid_search(
+            X_train, X_val, val_sample, factors_list, reg_list, alpha_list,
+            iterations, K, random_state, num_threads, n_jobs
+        )
+
+    best = max(grid, key=lambda row: row["ndcg"])
+    best_params = {"factors": best["factors"], "reg": best["reg"], "alpha": best["alpha"]}
+
+    # --- FASE 2: EVALUACIÓN FINAL EN TEST ---
+    print(f"\n--- FASE 2: Evaluación final con parámetros {best_params} ---")
+    final_idx = np.sort(np.concatenate([train_idx, val_idx]))
+    X_final_train = build_csr(f_min[final_idx], f_max[final_idx], n_authors)
+    X_test = build_csr(f_min[test_idx], f_max[test_idx], n_authors)
+
+    U = train_als(
+        X_final_train, **best_params, iterations=final_iterations,
+        random_state=random_state, num_threads=num_threads, use_gpu=use_gpu
+    )
+    n_test, test_metrics = _evaluate_test(U, X_final_train, X_test, K)
+    _print_test(n_test, test_metrics, K)
+
+    # --- Modelo de producción con todos los pares ---
+    X_full = build_csr(pair_min, pair_max, n_authors)
+    U_final = train_als(
+        X_full, **best_params, iterations=final_iterations,
+        random_state=random_state, num_threads=num_threads, use_gpu=use_gpu
+    )
+    author_ids = load_author_ids(save_dir)
+    np.save(os.path.join(save_dir, "cf_U_als.npy"), U_final)
+    np.save(os.path.join(save_dir, "cf_idx_to_author.npy"), dict(enumerate(author_ids)))
+    np.save(
+        os.path.join(save_dir, "cf_author_to_idx.npy"),
+        {author_id: idx for idx, author_id in enumerate(author_ids)}
+    )
+
+    print(f"Modelo guardado en {save_dir} ({time.time() - start_time:.1f}s)")
+    return {"best_params": best_params, "grid": grid, "test": test_metrics}
+
+
+def evaluate_final_full(U_final, files_dir, K=20, random_state=42):
+    """
+    Evalúa factores ya entrenados sobre el split de test (los pares de
+    train + val se excluyen de las recomendaciones). Si U_final se entrenó
+    con todos los pares el resultado es optimista: los pares de test
+    también estaban en el entrenamiento.
+    """
+    (_, _, n_authors, f_min, f_max,
+     train_idx, val_idx, test_idx) = _split(files_dir, random_state)
+
+    final_idx = np.sort(np.concatenate([train_idx, val_idx]))
+    X_seen = build_csr(f_min[final_idx], f_max[final_idx], n_authors)
+    X_test = build_csr(f_min[test_idx], f_max[test_idx], n_authors)
+
+    n_test, metrics = _evaluate_test(np.asarray(U_final, dtype=np.float32), X_seen, X_test, K)
+    _print_test(n_test, metrics, K)
+    return metrics
@@ -0,0 +1,216 @@
+"""
+Fusión híbrida top-k con el algoritmo de umbral (Fagin / TA).
+
+Cada motor se consume como un stream de autores en orden descendente de
+score (acceso ordenado) que además permite consultar el score de un autor
+cualquiera (acceso aleatorio). En cada ronda se leen los primeros `depth`
+autores de cada stream, se calcula el score exacto alpha * cb + beta * cf
+de los autores vistos y se compara el k-ésimo mejor con la cota
+
+    umbral = alpha * (último score CB leído) + beta * (último score CF leído)
+
+que acota el score de cualquier autor aún no visto. Si el k-ésimo supera
+estrictamente el umbral el top-k es exacto (los mismos scores que la fusión
+completa; entre autores empatados en el borde puede elegir otros); si no,
+depth se duplica.
+
+Requiere alpha y beta no negativos (la función de fusión debe ser
+monótona). Con una máscara de autores permitidos cada stream solo entrega
+autores permitidos, por lo que el top-k es el exacto entre ellos.
+"""
+
+import numpy as np
+from recommender.authors import local_mask
+from recommender.content_based.queries import ContentBasedQueries
+from recommender.ItemKNN.queries import ItemKNNQueries
+from recommender.topk import first_allowed, top_k_indices, min_max_normalize
+
+
+def _lookup(local_ids, global_ids):
+    """Fila local de cada id global (-1 si el motor no tiene al autor)."""
+    global_ids = np.asarray(global_ids, dtype=np.int64)
+    result = np.full(len(global_ids), -1, dtype=np.int64)
+    in_range = global_ids < len(local_ids)
+    result[in_range] = local_ids[global_ids[in_range]]
+    return result
+
+
+class ContentBasedStream:
+    """
+    Ranking content-based de una consulta (mismo score que
+    ContentBasedQueries.get_top_k con k=None) sin ordenar todos los autores.
+
+    La similitud y el smoothing se calculan una sola vez sobre los autores
+    que comparten conceptos; los demás (similitud 0) tienen score
+    decreciente en su cantidad de works, por lo que se leen en el orden
+    precalculado por works saltando a los ya puntuados.
+
+    allowed es una máscara sobre ids globales (None = todos los autores).
+    Todo el stream usa un único snapshot del modelo, aunque se publique
+    otra versión mientras se consume.
+    """
+
+    def __init__(self, user_input, allowed=None):
+        content = ContentBasedQueries
+        cache = content.snapshot()
+
+        user_vector = content.create_user_vector(
+            user_input, cache['n_concepts'], cache['concept_to_index'], cache['idf_vector']
+        )
+        self.work_counts = cache['author_work_counts']
+        self.order = cache['work_count_order']
+        self.n_authors = len(self.work_counts)
+        self.touched, self.similarities = content._accumulate_postings(
+            cache['concept_postings'], user_vector.indices, user_vector.data
+        )
+        self.mean_similarity = self.similarities.sum() / self.n_authors
+        self.global_ids = content.global_ids(cache)
+        self.local_ids = content.local_ids(cache)
+
+        self.smoothed = self._smooth(self.similarities, self.touched)
+
+        # Autores que el stream puede entregar: los puntuados permitidos y,
+        # en el orden por works, los no puntuados permitidos
+        permitted = (
+            np.ones(self.n_authors, dtype=bool) if allowed is None
+            else local_mask(allowed, self.global_ids)
+        )
+        self.n_permitted = int(np.count_nonzero(permitted))
+        self.candidates = np.flatnonzero(permitted[self.touched])
+        self.untouched = permitted
+        self.untouched[self.touched] = False
+        _, _, self.min_score, self.max_score = content._select_candidates(
+            self.touched, self.similarities, self.mean_similarity, 1, self.work_counts, self.order
+        )
+
+    def _smooth(self, similarities, authors):
+        return ContentBasedQueries.apply_bayesian_smoothing(
+            similarities,
+            self.work_counts[authors],
+            confidence_param=ContentBasedQueries.CONFIDENCE_PARAM,
+            mean_similarity=self.mean_similarity
+        )
+
+    def __len__(self):
+        return self.n_permitted
+
+    def top(self, depth):
+        """Primeros depth autores del ranking: (ids globales, scores Min-Max)."""
+        best_touched = self.candidates[top_k_indices(self.smoothed[self.candidates], depth)]
+        untouched = first_allowed(self.order, self.untouched, depth)
+        candidates = np.concatenate([self.touched[best_touched], untouched])
+        scores = np.concatenate([
+            self.smoothed[best_touched], self._smooth(np.zeros(len(untouched)), untouched)
+        ])
+        top = top_k_indices(scores, depth)
+        return (
+            self.global_ids[candidates[top]],
+            min_max_normalize(scores[top], self.min_score, self.max_score),
+        )
+
+    def scores_of(self, global_ids):
+        """Score Min-Max de autores arbitrarios (0 si no están en el modelo)."""
+        local = _lookup(self.local_ids, global_ids)
+        known = local >= 0
+
+        similarities = np.zeros(np.count_nonzero(known))
+        if len(self.touched):
+            pos = np.minimum(np.searchsorted(self.touched, local[known]), len(self.touched) - 1)
+            is_touched = self.touched[pos] == local[known]
+            similarities[is_touched] = self.similarities[pos[is_touched]]
+
+        smoothed = self._smooth(similarities, local[known])
+        scores = np.zeros(len(local))
+        scores[known] = min_max_normalize(smoothed, self.min_score, self.max_score)
+        return scores
+
+
+class CollaborativeStream:
+    """
+    Ranking ItemKNN de un autor (mismo score que ItemKNNQueries.get_top_k).
+    Con candidate_budget solo se consideran sus candidate_budget mejores
+    autores, igual que en la fusión completa. allowed es una máscara sobre
+    ids globales (None = todos los autores).
+    """
+
+    def __init__(self, author_id, candidate_budget=None, allowed=None):
+        colab = ItemKNNQueries
+        colab._initialize_cache()
+        self.ids = np.empty(0, dtype=np.int32)
+        self.scores = np.empty(0, dtype=float)
+
+        self.global_ids = colab.global_ids()
+        self.local_ids = colab.local_ids()
+        permitted = None if allowed is None else local_mask(allowed, self.global_ids)
+
+        author_idx = colab._cache["author_to_idx"].get(author_id)
+        if author_idx is not None and candidate_budget is not None:
+            # Mismos candidatos que la fusión completa (listas de vecinos o
+            # top-k), ordenados por índice para el acceso aleatorio
+            ids, scores = colab.get_top_k(author_id, n_recs=candidate_budget, allowed=permitted)
+            by_index = np.argsort(ids)
+            self.ids, self.scores = ids[by_index], np.asarray(scores, dtype=float)[by_index]
+        elif author_idx is not None:
+            ids, scores = colab._score_neighbours(author_idx)
+            if len(scores):
+                self.ids = ids
+                self.scores = min_max_normalize(scores, scores.min(), scores.max())
+                if permitted is not None:
+                    keep = permitted[ids]
+                    self.ids, self.scores = self.ids[keep], self.scores[keep]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def top(self, depth):
+        """Primeros depth autores del ranking: (ids globales, scores Min-Max)."""
+        top = top_k_indices(self.scores, depth)
+        return self.global_ids[self.ids[top]], self.scores[top]
+
+    def scores_of(self, global_ids):
+        """Score Min-Max de autores arbitrarios (0 si el autor no fue alcanzado)."""
+        local = _lookup(self.local_ids, global_ids)
+        scores = np.zeros(len(local))
+        if len(self.ids):
+            pos = np.minimum(np.searchsorted(self.ids, local), len(self.ids) - 1)
+            reached = (local >= 0) & (self.ids[pos] == local)
+            scores[reached] = self.scores[pos[reached]]
+        return scores
+
+
+def threshold_top_k(cb_stream, cf_stream, k, alpha=0.5, beta=0.5):
+    """
+    Top-k exacto de alpha * cb + beta * cf leyendo solo un prefijo de cada
+    stream (ver docstring del módulo).
+
+    Returns:
+        Tupla (ids, hybrid, cb, cf, depth): ids int32 globales ordenados
+        por score híbrido descendente y la profundidad leída de cada stream
+    """
+    if alpha < 0 or beta < 0:
+        raise ValueError("La fusión por umbral requiere alpha y beta no negativos")
+
+    depth = max(k, 1)
+    while True:
+        cb_ids, cb_top = cb_stream.top(depth)
+        cf_ids, cf_top = cf_stream.top(depth)
+
+        # Autores vistos por cualquiera de los dos streams (ordenados por id)
+        seen = np.union1d(cb_ids, cf_ids)
+        seen = seen[seen >= 0]
+        cb = cb_stream.scores_of(seen)
+        cf = cf_stream.scores_of(seen)
+        hybrid = alpha * cb + beta * cf
+        top = top_k_indices(hybrid, k)
+
+        # Un stream agotado aporta 0 a los autores que no contiene
+        cb_exhausted = depth >= len(cb_stream)
+        cf_exhausted = depth >= len(cf_stream)
+        threshold = (
+            alpha * (0.0 if cb_exhausted else cb_top[-1]) +
+            beta * (0.0 if cf_exhausted else cf_top[-1])
+        )
+
+        if (cb_exhausted and cf_exhausted) or (len(top) == k and hybrid[top[-1]] > threshold):
+            return seen[top].astype(np.int32), hybrid[top], cb[top], cf[top], depth
+        depth *= 2
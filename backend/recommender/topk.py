@@ -0,0 +1,53 @@
+import numpy as np
+
+
+def top_k_indices(scores, k=None):
+    """
+    Índices de los k mayores scores, ordenados de mayor a menor.
+
+    Usa selección parcial (argpartition) y solo ordena los k ganadores,
+    por lo que el costo es O(n + k log k) en lugar de O(n log n).
+    Si k es None o mayor que el largo del arreglo se ordena todo.
+    """
+    scores = np.asarray(scores)
+    n = scores.shape[0]
+
+    if k is None or k >= n:
+        return np.argsort(-scores, kind='stable')
+
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    order = np.argsort(-scores[candidates], kind='stable')
+    return candidates[order]
+
+
+def first_allowed(order, allowed, k):
+    """
+    Primeros k elementos de order cuya máscara allowed es verdadera.
+
+    Revisa prefijos crecientes de order, por lo que con filtros poco
+    selectivos solo se lee el comienzo del arreglo.
+    """
+    size = max(2 * k, 1)
+    while True:
+        prefix = order[:size]
+        selected = prefix[allowed[prefix]]
+        if len(selected) >= k or size >= len(order):
+            return selected[:k]
+        size *= 2
+
+
+def min_max_normalize(scores, min_score, max_score, epsilon=1e-8):
+    """
+    Normalización Min-Max usando estadísticas (min, max) ya calculadas.
+
+    Permite normalizar solo los k ganadores sin volver a recorrer
+    el arreglo completo de scores.
+    """
+    scores = np.asarray(scores, dtype=float)
+    if (max_score - min_score) > epsilon:
+        return (scores - min_score) / (max_score - min_score)
+    # Caso para evitar división por cero (si todos los scores son iguales)
+    return np.zeros_like(scores)